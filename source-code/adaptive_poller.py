@@ -0,0 +1,181 @@
+import math
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import CHECK_INTERVAL, ADAPTIVE_MIN_INTERVAL, ADAPTIVE_DAILY_BUDGET
+
+logger = logging.getLogger(__name__)
+
+# 窗口开始前这么久以内出现的上传，算作本窗口的上传（早报每天只上传一次）
+_SAME_UPLOAD_LEAD = 12 * 3600
+
+class UploadProfile:
+    """按一天中的时刻（tz 时区）统计的历史发布时间直方图
+    
+    上传窗口为覆盖 coverage 比例样本的最短时段（可跨零点），两侧各加一个分箱作为余量；
+    样本不足 min_samples 或窗口宽于 max_width 分钟（上传时间不规律）时没有窗口。
+    """
+    
+    def __init__(self, tz, bin_minutes: int = 10, max_samples: int = 60, coverage: float = 0.8,
+                 min_samples: int = 5, max_width: int = 360):
+        self.tz = tz
+        self.bin_minutes = bin_minutes
+        self.bins = 1440 // bin_minutes
+        self.coverage = coverage
+        self.min_samples = min_samples
+        self.max_width = max_width
+        self._samples = deque(maxlen=max_samples)
+        self._known = set()
+        self._window: Optional[Tuple[int, int]] = None
+        self._dirty = True
+    
+    def __len__(self):
+        return len(self._samples)
+    
+    def add(self, pubdate: Optional[int]) -> bool:
+        """加入一个发布时间，重复的时间戳忽略"""
+        if not pubdate or pubdate in self._known:
+            return False
+        if len(self._samples) == self._samples.maxlen:
+            self._known.discard(self._samples[0])
+        self._samples.append(pubdate)
+        self._known.add(pubdate)
+        self._dirty = True
+        return True
+    
+    def histogram(self) -> List[int]:
+        counts = [0] * self.bins
+        for pubdate in self._samples:
+            local = datetime.fromtimestamp(pubdate, self.tz)
+            counts[(local.hour * 60 + local.minute) // self.bin_minutes] += 1
+        return counts
+    
+    def window(self) -> Optional[Tuple[int, int]]:
+        """学到的上传窗口 (一天中的起始分钟, 宽度分钟)"""
+        if self._dirty:
+            self._window = self._compute_window()
+            self._dirty = False
+        return self._window
+    
+    def _compute_window(self) -> Optional[Tuple[int, int]]:
+        if len(self._samples) < self.min_samples:
+            return None
+        counts = self.histogram()
+        needed = math.ceil(len(self._samples) * self.coverage)
+        best = None
+        for start in range(self.bins):
+            covered = 0
+            for width in range(1, self.bins + 1):
+                covered += counts[(start + width - 1) % self.bins]
+                if covered >= needed:
+                    if best is None or width < best[1]:
+                        best = (start, width)
+                    break
+        start, width = best[0] - 1, best[1] + 2
+        if width * self.bin_minutes > self.max_width:
+            return None
+        return (start % self.bins) * self.bin_minutes, width * self.bin_minutes
+    
+    def current_window(self, now: datetime) -> Optional[Tuple[datetime, datetime]]:
+        """包含 now 的窗口，或 now 之后最近的窗口"""
+        window = self.window()
+        if window is None:
+            return None
+        start_minute, width = window
+        at = datetime.min.time().replace(hour=start_minute // 60, minute=start_minute % 60)
+        for days in (-1, 0, 1):
+            start = self.tz.localize(datetime.combine(now.date() + timedelta(days=days), at))
+            end = start + timedelta(minutes=width)
+            if end > now:
+                return start, end
+        return None
+
+class AdaptivePoller:
+    """根据学到的上传时段决定下一次检查的时间
+    
+    窗口内且本窗口的视频尚未出现时，每 min_interval 秒检查一次；其他时间从 min_interval 起指数退避，
+    最长 max_interval，但不短于把剩余预算均匀分到今天结束的间隔，且不会睡过下一个窗口的开始。每天（tz 日期）最多检查 daily_budget 次，
+    窗口外的检查会为今天剩余的窗口预留预算。没有学到窗口时按 max_interval 固定间隔检查。
+    """
+    
+    def __init__(self, tz, min_interval: float = ADAPTIVE_MIN_INTERVAL * 60,
+                 max_interval: float = CHECK_INTERVAL * 60, daily_budget: int = ADAPTIVE_DAILY_BUDGET,
+                 profile: Optional[UploadProfile] = None):
+        self.tz = tz
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.daily_budget = max(1, daily_budget)
+        self.profile = profile or UploadProfile(tz)
+        self.polls_today = 0
+        self.total_polls = 0
+        self.last_delay = 0.0
+        self._day = None
+        self._backoff = min_interval
+        self._latest_upload: Optional[int] = None
+    
+    def observe(self, pubdates: Iterable[Optional[int]]):
+        """记录检查到的视频的发布时间"""
+        for pubdate in pubdates:
+            if not pubdate:
+                continue
+            self.profile.add(pubdate)
+            if self._latest_upload is None or pubdate > self._latest_upload:
+                self._latest_upload = pubdate
+    
+    def next_delay(self, now: Optional[datetime] = None) -> float:
+        """记录刚完成的一次检查，返回距下一次检查的秒数"""
+        now = now.astimezone(self.tz) if now is not None else datetime.now(self.tz)
+        if now.date() != self._day:
+            self._day = now.date()
+            self.polls_today = 0
+        self.polls_today += 1
+        self.total_polls += 1
+        self.last_delay = self._next_delay(now)
+        return self.last_delay
+    
+    def _next_delay(self, now: datetime) -> float:
+        day_end = self.tz.localize(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+        budget_left = self.daily_budget - self.polls_today
+        if budget_left <= 0:
+            logger.info("Daily polling budget used up, next check tomorrow")
+            return (day_end - now).total_seconds()
+        
+        window = self.profile.current_window(now)
+        if window is None:
+            return max(self.max_interval, (day_end - now).total_seconds() / budget_left)
+        
+        start, end = window
+        uploaded = self._latest_upload is not None and self._latest_upload >= start.timestamp() - _SAME_UPLOAD_LEAD
+        if start <= now < end and not uploaded:
+            # 预算不够覆盖剩余窗口时拉长间隔，保证窗口结束前一直在检查
+            self._backoff = self.min_interval
+            return max(self.min_interval, (min(end, day_end) - now).total_seconds() / budget_left)
+        
+        if start <= now:
+            # 本窗口的视频已经出现，下一个窗口在明天
+            start, end = start + timedelta(days=1), end + timedelta(days=1)
+        self._backoff = min(self._backoff * 2, self.max_interval)
+        until_window = (start - now).total_seconds()
+        
+        # 为今天剩余的窗口时段预留检查次数，预算只够窗口使用时直接等到窗口开始
+        reserve = 0
+        if start < day_end:
+            reserve = math.ceil((min(end, day_end) - start).total_seconds() / self.min_interval)
+        if budget_left <= reserve:
+            return until_window
+        # 与没有窗口时相同，剩余预算至少均匀覆盖到今天结束，不会在上传后几分钟内用完
+        spread = (day_end - now).total_seconds() / budget_left
+        return max(0.0, min(max(self._backoff, spread), until_window))
+    
+    def get_stats(self) -> Dict:
+        window = self.profile.window()
+        return {
+            'samples': len(self.profile),
+            'window': f"{window[0] // 60:02d}:{window[0] % 60:02d}+{window[1]}min" if window else None,
+            'polls_today': self.polls_today,
+            'daily_budget': self.daily_budget,
+            'total_polls': self.total_polls,
+            'last_delay_minutes': round(self.last_delay / 60, 1)
+        }
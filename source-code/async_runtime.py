@@ -0,0 +1,334 @@
+import time
+import signal
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from bilibili_monitor import BilibiliMonitor
+from config import CHECK_INTERVAL, ASYNC_WORKERS
+from http_transport import AsyncHttpTransport
+from scheduler import AINewsScheduler, polling_description, prewarm_time
+from snapshot_diff import added_videos
+from sources import BilibiliSource
+from timer_scheduler import next_daily_run
+from video import Video
+from wechat_notifier import WeChatNotifier
+
+logger = logging.getLogger(__name__)
+
+class AsyncBilibiliMonitor:
+    """BilibiliMonitor 的 asyncio 版本
+    
+    视频详情直接走 AsyncHttpTransport：多个详情并发请求，限流在事件循环中等待，相同 bvid 只请求一次。
+    投稿列表的逐页遍历（熔断、WBI签名、列表缓存）由 AsyncAINewsScheduler 在有界线程池中调用信息源插件完成。
+    """
+    
+    def __init__(self, monitor: BilibiliMonitor, http: AsyncHttpTransport):
+        self.monitor = monitor
+        self.http = http
+        self._details: Dict[str, asyncio.Task] = {}
+    
+    async def get_video_detail(self, bvid: str) -> Optional[Dict]:
+        """获取视频详细信息（优先使用详情缓存，并发的相同请求共享一次调用）"""
+        cached_detail = self.monitor.detail_cache.get(bvid)
+        if cached_detail is not None:
+            logger.debug(f"Detail cache hit for video: {bvid}")
+            return cached_detail
+        
+        task = self._details.get(bvid)
+        if task is None:
+            task = asyncio.ensure_future(self._request_video_detail(bvid))
+            self._details[bvid] = task
+            task.add_done_callback(lambda _: self._details.pop(bvid, None))
+        else:
+            logger.debug(f"Coalesced detail request {bvid}")
+        # 某个调用方被取消时不影响其他等待同一请求的调用方
+        return await asyncio.shield(task)
+    
+    async def _request_video_detail(self, bvid: str) -> Optional[Dict]:
+        try:
+            url, params, headers = self.monitor._video_detail_request(bvid)
+            response = await self.http.get(url, params=params, headers=headers)
+            return self.monitor._handle_video_detail(bvid, response)
+        except Exception as e:
+            logger.error(f"Error fetching video detail: {e}")
+            return None
+    
+    async def get_video_details(self, bvids: List[str]) -> List[Optional[Dict]]:
+        """并发获取多个视频的详情，结果与 bvids 顺序一致"""
+        return list(await asyncio.gather(*(self.get_video_detail(bvid) for bvid in bvids)))
+
+class AsyncWeChatNotifier:
+    """企业微信通知的 asyncio 版本
+    
+    消息在独立的单线程执行器中按提交顺序发送，相邻两条至少间隔 min_interval 秒（等待发生在事件循环中），
+    webhook 响应慢只会推迟后续通知，不会阻塞B站轮询。
+    """
+    
+    def __init__(self, notifier: WeChatNotifier, min_interval: float = 2.0):
+        self.notifier = notifier
+        self.min_interval = min_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='wechat')
+        self._lock: Optional[asyncio.Lock] = None
+        self._last_sent = float('-inf')
+    
+    async def _send(self, method: Callable[..., bool], *args) -> bool:
+        # 锁需在事件循环中创建（Python 3.9 的 asyncio.Lock 会绑定创建时的事件循环）
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            wait = self._last_sent + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._executor, partial(method, *args))
+            finally:
+                self._last_sent = time.monotonic()
+    
+    async def send_text_message(self, content: str) -> bool:
+        return await self._send(self.notifier.send_text_message, content)
+    
+    async def send_ai_news_notification(self, summary: str, is_new: bool = True) -> bool:
+        return await self._send(self.notifier.send_ai_news_notification, summary, is_new)
+    
+    async def send_error_notification(self, error_message: str) -> bool:
+        return await self._send(self.notifier.send_error_notification, error_message)
+    
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+class AsyncAINewsScheduler:
+    """--mode run-async：实时检查与每日定时推送作为协程运行在同一个事件循环中
+    
+    复用 AINewsScheduler 的数据管理、摘要生成和推送窗口计算；
+    同一批视频的详情并发获取，通知按顺序发送。
+    """
+    
+    def __init__(self, scheduler: Optional[AINewsScheduler] = None, workers: int = ASYNC_WORKERS):
+        self.scheduler = scheduler or AINewsScheduler()
+        self.data_manager = self.scheduler.data_manager
+        self.content_summarizer = self.scheduler.content_summarizer
+        self.china_tz = self.scheduler.china_tz
+        self.subscription = self.scheduler.subscription
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bilibili')
+        self.http = AsyncHttpTransport(self.scheduler.bilibili_monitor.transport, workers)
+        self.monitor = AsyncBilibiliMonitor(self.scheduler.bilibili_monitor, self.http)
+        self.notifier = AsyncWeChatNotifier(self.scheduler.wechat_notifier)
+        self.is_running = False
+        self._stop: Optional[asyncio.Event] = None
+    
+    async def check_for_new_videos(self) -> List[Video]:
+        """实时检查新视频并发送通知（避免与定时推送重复），返回本次处理的新视频"""
+        try:
+            logger.info("Checking for new AI news videos...")
+            
+            # 只处理与上一次拉取相比新增的视频；列表没有变化时跳过详情和摘要
+            since = int(self.scheduler._today_start().timestamp())
+            loop = asyncio.get_running_loop()
+            events = await loop.run_in_executor(self._executor, self.scheduler.source.poll_changes, since,
+                                                self.subscription.matches)
+            if events is None:
+                logger.warning("Failed to fetch the video list, skipping this check")
+                return []
+            if not events:
+                logger.info("Video list unchanged since the last check")
+                return []
+            ai_videos = added_videos(events)
+            
+            if not ai_videos:
+                logger.info("No AI news videos found")
+                return []
+            
+            new_videos = self.data_manager.get_new_videos(ai_videos)
+            if not new_videos:
+                logger.info("No new videos to process today")
+                return []
+            
+            logger.info(f"Found {len(new_videos)} new videos published today")
+            await self._process_videos(new_videos)
+            self.data_manager.mark_videos_as_processed(new_videos)
+            return new_videos
+        
+        except Exception as e:
+            logger.error(f"Error in check_for_new_videos: {e}")
+            self.scheduler.source.changes.reset()
+            await self.notifier.send_error_notification(str(e))
+            return []
+    
+    async def daily_push_check(self):
+        """每日定时推送检查"""
+        try:
+            china_now = datetime.now(self.china_tz)
+            today_str = china_now.strftime('%Y-%m-%d')
+            logger.info(f"Starting daily push check for {today_str}")
+            
+            if self.scheduler._is_daily_push_done_today():
+                logger.info(f"Daily push already completed for {today_str}")
+                return
+            
+            # 预热暂存的消息直接发送，只补查预热之后发布的视频
+            window_start, target = self.scheduler._get_daily_push_window()
+            self.scheduler._begin_push_report(target)
+            ai_videos = await self._fetch_videos(int(window_start.timestamp()))
+            
+            staged = self.scheduler._staged_videos()
+            late = [video for video in self.scheduler._get_videos_for_daily_push(ai_videos)
+                    if not self.data_manager.is_video_processed(video.bvid) and video.bvid not in self.scheduler._staged]
+            pending = late + staged
+            if not pending:
+                logger.info("No new videos found for today's daily push")
+                self.scheduler._mark_daily_push_done()
+                self.scheduler._end_push_report(0, 0)
+                return
+            
+            logger.info(f"Found {len(pending)} videos for daily push ({len(staged)} pre-warmed, {len(late)} late)")
+            push_count = await self._process_videos(pending, daily=True)
+            self.scheduler._mark_daily_push_done(push_count)
+            report = self.scheduler._end_push_report(len(staged), len(late))
+            
+            if push_count > 0:
+                await self.notifier.send_text_message(self.scheduler._daily_push_message(push_count, china_now, report))
+                logger.info(f"Daily push completed: {push_count} videos sent")
+        
+        except Exception as e:
+            logger.error(f"Error in daily_push_check: {e}")
+            self.scheduler._push_target = None
+    
+    async def _fetch_videos(self, since: int) -> List[Video]:
+        """在线程池中拉取信息源，到达 since 即停止（推送窗口内更早的视频可能未处理，遇到已处理的视频不停止）"""
+        loop = asyncio.get_running_loop()
+        poll = partial(self.scheduler.source.poll, since=since, predicate=self.subscription.matches)
+        try:
+            return await loop.run_in_executor(self._executor, poll)
+        except Exception as e:
+            logger.error(f"Error fetching videos from {self.scheduler.source!r}: {e}")
+            return []
+    
+    async def _get_details(self, videos: List[Video]) -> List[Optional[Dict]]:
+        """B站视频详情走异步传输层并发获取，其他信息源在线程池中调用插件"""
+        if isinstance(self.scheduler.source, BilibiliSource):
+            return await self.monitor.get_video_details([video.bvid for video in videos])
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*(
+            loop.run_in_executor(self._executor, self.scheduler.source.get_detail, video) for video in videos
+        )))
+    
+    async def _process_videos(self, videos: List[Video], daily: bool = False) -> int:
+        """并发获取详情，再按顺序生成摘要并发送通知，返回处理的视频数
+        
+        预热已生成摘要的视频直接发送；daily 为真时记录每条消息相对推送时间的延迟。
+        """
+        fetch = [video for video in videos if video.bvid not in self.scheduler._staged]
+        details = dict(zip((video.bvid for video in fetch), await self._get_details(fetch)))
+        processed = 0
+        for video in videos:
+            try:
+                logger.info(f"Processing video: {video.bvid}")
+                summary = self.scheduler._take_staged_summary(video.bvid)
+                if summary is None:
+                    summary = self.content_summarizer.generate_summary(video, details.get(video.bvid))
+                if await self.notifier.send_ai_news_notification(summary, is_new=True):
+                    if daily:
+                        self.scheduler._record_push_latency()
+                    logger.info(f"Successfully sent notification for video: {video.bvid}")
+                else:
+                    logger.warning(f"Failed to send notification for video: {video.bvid}")
+                processed += 1
+            except Exception as e:
+                logger.error(f"Error processing video {video.bvid}: {e}")
+        return processed
+    
+    def _seconds_until(self, time_str: str) -> float:
+        """距离下一次（中国时区）time_str 的秒数"""
+        now = datetime.now(self.china_tz)
+        return (next_daily_run(time_str, self.china_tz, now) - now).total_seconds()
+    
+    async def _sleep(self, seconds: float) -> bool:
+        """等待 seconds 秒，期间收到停止信号时提前返回 True"""
+        try:
+            await asyncio.wait_for(self._stop.wait(), timeout=seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def _interval_loop(self):
+        poller = self.scheduler.poller
+        if poller is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self.scheduler._seed_poller)
+        while True:
+            new_videos = await self.check_for_new_videos()
+            if poller is not None:
+                poller.observe(video.pubdate for video in new_videos)
+                delay = poller.next_delay()
+                logger.info(f"Next check in {delay / 60:.1f} minutes")
+            else:
+                delay = CHECK_INTERVAL * 60
+            if await self._sleep(delay):
+                return
+    
+    async def _daily_loop(self):
+        push_time = self.subscription.push_time
+        prewarm_at = prewarm_time(push_time)
+        loop = asyncio.get_running_loop()
+        while True:
+            # 推送前提前拉取并生成摘要（启动时已过预热时刻则本次不预热）
+            if prewarm_at and self._seconds_until(prewarm_at) < self._seconds_until(push_time):
+                if await self._sleep(self._seconds_until(prewarm_at)):
+                    return
+                await loop.run_in_executor(self._executor, self.scheduler.prewarm_daily_push)
+            if await self._sleep(self._seconds_until(push_time)):
+                return
+            await self.daily_push_check()
+    
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+    
+    async def run(self):
+        """启动事件循环中的调度任务，直到收到 SIGINT/SIGTERM"""
+        loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):  # Windows 或非主线程
+                pass
+        
+        try:
+            logger.info(f"Starting async AI News Scheduler with {polling_description()}")
+            if not await loop.run_in_executor(self._executor, self.scheduler._validate_configuration):
+                logger.error("Configuration validation failed. Please check your settings.")
+                return
+            
+            await self.notifier.send_text_message(self.scheduler._startup_message())
+            self.is_running = True
+            
+            tasks = [asyncio.ensure_future(self._interval_loop())]
+            if self.subscription.daily_push:
+                tasks.append(asyncio.ensure_future(self._daily_loop()))
+                logger.info(f"Daily push scheduled at {self.subscription.push_time} China time")
+            
+            await self._stop.wait()
+            logger.info("Received stop signal")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        except Exception as e:
+            logger.error(f"Error in async scheduler: {e}")
+        finally:
+            if self.is_running:
+                self.is_running = False
+                logger.info("Stopping async AI News Scheduler...")
+                await self.notifier.send_text_message(self.scheduler._shutdown_message())
+            self.close()
+    
+    def close(self):
+        self.notifier.close()
+        self.http.close()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+响应解码基准测试：旧路径（json.loads 整个响应 + 手工探测嵌套字典） vs 契约解码器
+
+载荷按 api-contracts 中的结构和线上响应的典型体积构造（详情含 owner、rights、staff、
+subtitle、honor_reply 等未使用的子树；列表为一页 30 条投稿及 tlist）。
+
+用法: python benchmark_decoders.py [--rounds 2000]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import response_decoders
+from response_decoders import ARC_SEARCH, VIDEO_DETAIL
+
+def _user(mid):
+    return {
+        'mid': mid, 'name': f'用户{mid}', 'face': f'https://i0.hdslb.com/bfs/face/{mid:032x}.jpg', 'follower': 123456,
+        'vip': {'type': 2, 'status': 1, 'due_date': 1758758400000, 'vip_pay_type': 0, 'theme_type': 0,
+                'label': {'path': '', 'text': '年度大会员', 'label_theme': 'annual_vip', 'text_color': '#FFFFFF',
+                          'bg_style': 1, 'bg_color': '#FB7299', 'border_color': ''}},
+        'official': {'role': 0, 'title': '', 'desc': '', 'type': -1}
+    }
+
+def view_payload() -> bytes:
+    """一条视频详情响应"""
+    description = '\n'.join(f"{i:02d}:00 第{i}条AI资讯：某公司发布了新模型，在多个基准上取得了领先成绩。" for i in range(1, 16))
+    data = {
+        'bvid': 'BV1N3n4zpEk2', 'aid': 113000000000001, 'videos': 1, 'tid': 201, 'tname': '科学科普',
+        'copyright': 1, 'pic': 'https://i0.hdslb.com/bfs/archive/xxx.jpg', 'title': '【AI 早报 2025-09-25】示例标题',
+        'pubdate': 1758758400, 'ctime': 1758758000, 'desc': description, 'state': 0, 'duration': 420,
+        'rights': {key: 0 for key in ('bp', 'elec', 'download', 'movie', 'pay', 'hd5', 'no_reprint', 'autoplay',
+                                      'ugc_pay', 'is_cooperation', 'ugc_pay_preview', 'no_background', 'clean_mode',
+                                      'is_stein_gate', 'is_360', 'no_share', 'arc_pay', 'free_watch')},
+        'owner': {'mid': 285286947, 'name': '橘鸦Juya', 'face': 'https://i0.hdslb.com/bfs/face/xxx.jpg'},
+        'stat': {'aid': 113000000000001, 'view': 120000, 'danmaku': 300, 'reply': 450, 'favorite': 2000,
+                 'coin': 1500, 'share': 300, 'now_rank': 0, 'his_rank': 0, 'like': 8000, 'dislike': 0,
+                 'evaluation': '', 'vt': 0},
+        'dynamic': '', 'cid': 26000000001,
+        'dimension': {'width': 1920, 'height': 1080, 'rotate': 0},
+        'pages': [{'cid': 26000000001, 'page': 1, 'from': 'vupload', 'part': 'AI早报', 'duration': 420,
+                   'vid': '', 'weblink': '', 'dimension': {'width': 1920, 'height': 1080, 'rotate': 0},
+                   'first_frame': 'https://i0.hdslb.com/bfs/storyff/xxx.jpg'}],
+        'subtitle': {'allow_submit': False, 'list': [
+            {'id': i, 'lan': 'ai-zh', 'lan_doc': '中文（自动生成）', 'is_lock': False,
+             'subtitle_url': f'https://aisubtitle.hdslb.com/bfs/ai_subtitle/{i:032x}.json', 'type': 1,
+             'id_str': str(i), 'ai_type': 0, 'ai_status': 2, 'author': _user(1000 + i)} for i in range(2)]},
+        'staff': [_user(2000 + i) for i in range(4)],
+        'honor_reply': {'honor': [{'aid': 113000000000001, 'type': 7, 'desc': '热门收录', 'weekly_recommend_num': 0}]},
+        'like_icon': '', 'argue_info': {'argue_msg': '', 'argue_type': 0, 'argue_link': ''},
+        'user_garb': {'url_image_ani_cut': ''}, 'desc_v2': [{'raw_text': description, 'type': 1, 'biz_id': 0}]
+    }
+    return json.dumps({'code': 0, 'message': '0', 'ttl': 1, 'data': data}, ensure_ascii=False).encode('utf-8')
+
+def list_payload(count: int = 30) -> bytes:
+    """一页投稿列表响应"""
+    vlist = [{
+        'comment': 120 + i, 'typeid': 201, 'play': 100000 + i, 'pic': f'https://i0.hdslb.com/bfs/archive/{i:032x}.jpg',
+        'subtitle': '', 'description': f"第{i}期AI早报，汇总今日人工智能领域的重要新闻。" * 3, 'copyright': '1',
+        'title': f'【AI 早报 2025-09-{i:02d}】示例标题', 'review': 0, 'author': '橘鸦Juya', 'mid': 285286947,
+        'created': 1758758400 - i * 86400, 'length': '07:00', 'video_review': 300, 'aid': 113000000000001 + i,
+        'bvid': f'BV1N3n4zp{i:03d}', 'hide_click': False, 'is_pay': 0, 'is_union_video': 0,
+        'is_steins_gate': 0, 'is_live_playback': 0, 'is_lesson_video': 0, 'is_lesson_finished': 0,
+        'lesson_update_info': '', 'jump_url': '', 'meta': None, 'is_avoided': 0, 'season_id': 0,
+        'attribute': 16512, 'is_charging_arc': False, 'elec_arc_type': 0, 'vt': 0, 'enable_vt': 0,
+        'vt_display': '', 'playback_position': 0, 'is_self_view': False
+    } for i in range(count)]
+    data = {
+        'list': {'tlist': {str(tid): {'tid': tid, 'count': 10, 'name': f'分区{tid}'} for tid in range(1, 12)},
+                 'vlist': vlist, 'slist': []},
+        'page': {'pn': 1, 'ps': count, 'count': 800},
+        'episodic_button': {'text': '播放全部', 'uri': '//www.bilibili.com/medialist/play/285286947'},
+        'is_risk': False, 'gaia_res_type': 0, 'gaia_data': None
+    }
+    return json.dumps({'code': 0, 'message': '0', 'ttl': 1, 'data': data}, ensure_ascii=False).encode('utf-8')
+
+def legacy_view(content):
+    """旧路径：response.json() 后保留整个 data（详情缓存中存的就是它）"""
+    data = json.loads(content)
+    if data.get('code') != 0:
+        return None
+    return data.get('data')
+
+def legacy_list(content):
+    """旧路径：response.json() 后手工探测 data.list.vlist"""
+    data = json.loads(content)
+    if data.get('code') != 0:
+        raise ValueError(data.get('message', 'Unknown error'))
+    video_data = data.get('data', {})
+    if 'list' in video_data and 'vlist' in video_data['list']:
+        return video_data['list']['vlist']
+    raise ValueError("Unexpected API response structure")
+
+def new_view(content):
+    return VIDEO_DETAIL.decode(content)[2]
+
+def new_list(content):
+    return ARC_SEARCH.decode(content)[2]['list']['vlist']
+
+def _time_per_call(func, content, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(content)
+    return (time.perf_counter() - start) / rounds
+
+def _memory(func, content):
+    """返回 (解码过程峰值, 保留结果占用) 字节数"""
+    tracemalloc.start()
+    result = func(content)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+def run(name, content, legacy, new, rounds):
+    print(f"\n📊 {name}（{len(content):,} 字节）")
+    print("-" * 60)
+    legacy_time = _time_per_call(legacy, content, rounds)
+    new_time = _time_per_call(new, content, rounds)
+    legacy_peak, legacy_retained = _memory(legacy, content)
+    new_peak, new_retained = _memory(new, content)
+    print(f"  旧路径   : {legacy_time * 1e6:8.1f} µs/次  峰值 {legacy_peak / 1024:7.1f} KiB  保留 {legacy_retained / 1024:7.1f} KiB")
+    print(f"  契约解码 : {new_time * 1e6:8.1f} µs/次  峰值 {new_peak / 1024:7.1f} KiB  保留 {new_retained / 1024:7.1f} KiB")
+    print(f"  加速 {legacy_time / new_time:.1f}x，保留内存减少 {legacy_retained / max(new_retained, 1):.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='响应解码基准测试')
+    parser.add_argument('--rounds', type=int, default=2000)
+    args = parser.parse_args()
+    
+    print(f"🚀 响应解码基准测试（JSON后端: {response_decoders.JSON_BACKEND}）")
+    run('视频详情 /x/web-interface/view', view_payload(), legacy_view, new_view, args.rounds)
+    run('投稿列表 /x/space/wbi/arc/search', list_payload(), legacy_list, new_list, args.rounds)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+去重索引基准测试：旧的文本集合加载路径 vs AvidIndex（mmap镜像）
+
+用法: python benchmark_dedup_index.py [--sizes 100000 1000000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bvid_codec import av_to_bv
+from dedup_index import AvidIndex
+
+def legacy_load_processed_videos(path):
+    """旧版 DataManager.load_processed_videos：每次重新解析整个文本文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(line.strip() for line in f if line.strip())
+
+def legacy_is_video_processed(path, video_id):
+    """旧版 DataManager.is_video_processed：每次查询都重新加载"""
+    return video_id in legacy_load_processed_videos(path)
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def _peak_memory(func, *args):
+    tracemalloc.start()
+    result = func(*args)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def run(size, lookups=10000):
+    print(f"\n📊 记录数: {size:,}")
+    print("-" * 60)
+    aids = random.sample(range(1, 1 << 40), size)
+    bvids = [av_to_bv(aid) for aid in aids]
+    probes = random.sample(bvids, min(lookups // 2, size)) + [av_to_bv(aid) for aid in random.sample(range(1 << 40, 1 << 41), lookups // 2)]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        text_file = os.path.join(tmp, 'processed_videos.txt')
+        image_file = os.path.join(tmp, 'processed_videos.idx')
+        with open(text_file, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{bvid}\n" for bvid in bvids))
+        
+        # 旧路径：解析文本为 set[str]
+        legacy_set, legacy_load = _timed(legacy_load_processed_videos, text_file)
+        _, legacy_bytes = _peak_memory(legacy_load_processed_videos, text_file)
+        _, legacy_lookup = _timed(lambda: [legacy_is_video_processed(text_file, p) for p in probes[:3]])
+        legacy_lookup /= 3
+        del legacy_set
+        
+        # 新路径：构建一次镜像，之后每次启动mmap加载
+        index = AvidIndex()
+        index.update(bvids)
+        index.save(image_file)
+        index.close()
+        loaded, index_load = _timed(AvidIndex.load, image_file)
+        _, index_lookup = _timed(lambda: [p in loaded for p in probes])
+        index_lookup /= len(probes)
+        index_bytes = loaded.nbytes()
+        loaded.close()
+        
+        # mmap加载时的Python堆分配（映射页由内核按需加载）
+        reloaded, load_alloc = _peak_memory(AvidIndex.load, image_file)
+        reloaded.close()
+    
+    print(f"{'':24}{'旧路径 set[str]':>18}{'AvidIndex':>18}")
+    print(f"{'启动加载':24}{legacy_load * 1000:>16.1f}ms{index_load * 1000:>16.3f}ms")
+    print(f"{'单次查询':24}{legacy_lookup * 1000:>16.1f}ms{index_lookup * 1e6:>16.2f}µs")
+    print(f"{'常驻内存':24}{legacy_bytes / 1e6:>16.1f}MB{index_bytes / 1e6:>16.1f}MB")
+    print(f"{'加载时堆分配':22}{legacy_bytes / 1e6:>18.1f}MB{load_alloc / 1e6:>16.3f}MB")
+    print(f"内存缩减: {legacy_bytes / max(index_bytes, 1):.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='Dedup index benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+    
+    print("🚀 去重索引基准测试")
+    print("=" * 60)
+    for size in args.sizes:
+        run(size)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+描述清理基准测试：原逐步清理（每次调用编译emoji正则、7次 re.sub、15次 str.replace） vs 预编译的清理引擎
+
+描述按线上AI早报的结构构造：每条资讯一行，夹有时间、链接、emoji、BV号和少量无用短语；
+分别测试典型长度（约15条）和超长描述（重复拼接）。
+
+用法: python benchmark_description_cleaning.py [--rounds 500]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from content_summarizer import clean_description_text
+from test_description_cleaning import legacy_clean
+
+def make_description(items: int) -> str:
+    lines = ["【AI 早报】今日要点 🚀"]
+    for i in range(items):
+        lines.append(
+            f"⬛ 第{i}条 某公司发布新模型: {i % 24:02d}:{i % 60:02d} 在多个基准上取得领先成绩，"
+            f"论文与代码见 https://example.com/paper/{i}?ref=bilibili 🎉 相关视频 BV1N3n4zp{i:03d}"
+        )
+        if i % 5 == 0:
+            lines.append("详情：www.example.com/news 点击查看 复制链接")
+    lines.append("关注我们，订阅频道获取更多精彩内容！联系 contact@example.com")
+    return '\n'.join(lines)
+
+def _time_per_call(func, text, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(text)
+    return (time.perf_counter() - start) / rounds
+
+def run(name, text, rounds):
+    assert clean_description_text(text) == legacy_clean(text)
+    legacy_time = _time_per_call(legacy_clean, text, rounds)
+    new_time = _time_per_call(clean_description_text, text, rounds)
+    size_mb = len(text.encode('utf-8')) / 1e6
+    print(f"\n📊 {name}（{len(text):,} 字符）")
+    print("-" * 60)
+    print(f"  原实现   : {legacy_time * 1e6:9.1f} µs/次  {size_mb / legacy_time:6.1f} MB/s")
+    print(f"  清理引擎 : {new_time * 1e6:9.1f} µs/次  {size_mb / new_time:6.1f} MB/s")
+    print(f"  加速 {legacy_time / new_time:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='描述清理基准测试')
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+    
+    print("🚀 描述清理基准测试")
+    run('典型描述（15条）', make_description(15), args.rounds)
+    run('长描述（150条）', make_description(150), max(1, args.rounds // 10))
+    run('超长描述（1500条）', make_description(1500), max(1, args.rounds // 100))
+
+if __name__ == '__main__':
+    main()
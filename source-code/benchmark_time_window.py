@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+发布时间窗口筛选基准测试：逐条构造 datetime 比较（旧实现） vs 预先计算边界的批量筛选
+
+两种场景：
+  当天筛选 — 旧 DataManager.is_video_published_today（每条 datetime.fromtimestamp + date 比较）
+  推送窗口 — 旧 _get_videos_for_daily_push（每条按中国时区构造 datetime 与窗口边界比较）
+批量筛选按预先计算的整数边界比较，不为每条视频构造 datetime。
+
+用法: python benchmark_time_window.py [--sizes 1000 100000 1000000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import pytz
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CHINA_TIMEZONE
+from time_window import day_bounds, select_in_window
+from video import Video
+
+CHINA_TZ = pytz.timezone(CHINA_TIMEZONE)
+
+def make_videos(count: int, now: datetime):
+    """最近30天内随机发布的视频，约1%缺少发布时间"""
+    rng = random.Random(count)
+    latest = int(now.timestamp())
+    return [Video(f'BV{i:010d}', pubdate=None if rng.random() < 0.01 else latest - rng.randrange(30 * 86400))
+            for i in range(count)]
+
+def legacy_today(videos, today):
+    return [video for video in videos if video.pubdate and datetime.fromtimestamp(video.pubdate).date() == today]
+
+def legacy_window(videos, start_time, end_time):
+    daily_videos = []
+    for video in videos:
+        if video.pubdate:
+            video_dt = datetime.fromtimestamp(video.pubdate, tz=CHINA_TZ)
+            if start_time <= video_dt <= end_time:
+                daily_videos.append(video)
+    return daily_videos
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def run(count: int):
+    now = datetime.now(CHINA_TZ)
+    videos = make_videos(count, now)
+    # 旧实现按主机时区判断“今天”，与批量筛选对比时把主机时区固定为中国时区
+    today = now.date()
+    today_start, today_end = day_bounds(today, CHINA_TZ)
+    push_start = CHINA_TZ.localize(datetime.combine(today - timedelta(days=1), datetime.min.time()).replace(hour=18))
+    push_end = CHINA_TZ.localize(datetime.combine(today, datetime.min.time()).replace(hour=9, minute=30))
+    
+    print(f"\n📊 {count:,} 条视频")
+    print("-" * 60)
+    cases = [
+        ('当天筛选', lambda: legacy_today(videos, today),
+         lambda: select_in_window(videos, today_start, today_end)),
+        ('推送窗口', lambda: legacy_window(videos, push_start, push_end),
+         lambda: select_in_window(videos, int(push_start.timestamp()), int(push_end.timestamp()), True))
+    ]
+    for name, legacy, new in cases:
+        legacy_time, expected = _timed(legacy)
+        new_time, result = _timed(new)
+        assert result == expected, f"{name}: batch filter differs from the legacy loop"
+        print(f"  {name}: 旧实现 {legacy_time * 1000:9.1f} ms  批量筛选 {new_time * 1000:8.1f} ms "
+              f"({legacy_time / new_time:4.1f}x)  选中 {len(expected):,} 条")
+
+def main():
+    parser = argparse.ArgumentParser(description='发布时间窗口筛选基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+    
+    os.environ['TZ'] = CHINA_TIMEZONE
+    if hasattr(time, 'tzset'):
+        time.tzset()
+    print("🚀 发布时间窗口筛选基准测试")
+    for count in args.sizes:
+        run(count)
+
+if __name__ == '__main__':
+    main()
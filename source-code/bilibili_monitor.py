@@ -1,274 +1,450 @@
-import requests
-import json
+import copy
 import logging
 import time
-import random
-import os
-from typing import List, Dict, Optional
-from config import BILIBILI_UP_UID, BILIBILI_API_BASE, HEADERS
+from typing import List, Dict, Optional, Callable, Iterator
+from config import (BILIBILI_UP_UID, BILIBILI_API_BASE, LIST_CACHE_FILE, LIST_CACHE_TTL,
+                    DETAIL_CACHE_TTL, DETAIL_CACHE_SIZE, DETAIL_CACHE_FILE, WBI_KEYS_FILE, WBI_KEY_TTL,
+                    BILIBILI_SEASON_ID, BILIBILI_SERIES_ID, AI_NEWS_KEYWORDS, AI_NEWS_KEYWORD_FALLBACK,
+                    BILIBILI_RATE_LIMIT, BILIBILI_RATE_BURST, RATE_LIMIT_FILE,
+                    CIRCUIT_BREAKER_FILE, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+from circuit_breaker import CircuitBreakerRegistry
+from single_flight import SingleFlight
+from video import Video
+from response_decoders import ARC_SEARCH, COLLECTION, VIDEO_DETAIL
+from detail_cache import DetailCache
+from list_cache import ListCache
+from rate_limiter import TokenBucket
+from http_transport import HttpTransport, get_transport
+from wbi_signer import WbiSigner, SIGNATURE_ERROR_CODES
 
 logger = logging.getLogger(__name__)
 
+# 投稿列表接口，按默认优先级排列（主接口需要WBI签名）
+LIST_ENDPOINTS = ['primary', 'alternative']
+
+# 预先构建的请求头（User-Agent、Accept-Encoding 等公共请求头由传输层的会话提供）
+API_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache'
+}
+
+class VideoListError(RuntimeError):
+    """视频列表的某一页拉取失败（与列表为空区分）"""
+
 class BilibiliMonitor:
     """监控Bilibili UP主的视频更新"""
     
-    def __init__(self, up_uid: str = BILIBILI_UP_UID):
+    def __init__(self, up_uid: str = BILIBILI_UP_UID, api_base: str = BILIBILI_API_BASE,
+                 season_id: str = BILIBILI_SEASON_ID, series_id: str = BILIBILI_SERIES_ID,
+                 transport: Optional[HttpTransport] = None):
         self.up_uid = up_uid
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
-        self.last_request_time = 0
-        self.min_request_interval = 3  # 最小请求间隔3秒
-        self.cache_file = 'data/video_cache.json'
-        self.cache_duration = 300  # 缓存5分钟
+        self.api_base = api_base
+        self.season_id = season_id
+        self.series_id = series_id
+        self.keyword_fallback = AI_NEWS_KEYWORD_FALLBACK
+        # 所有B站请求（包括nav、详情和合集接口）共享同一个跨进程令牌桶；传输层已绑定时沿用已有的
+        self.transport = transport or get_transport()
+        self.rate_limiter = self.transport.set_rate_limiter(
+            self.api_base, TokenBucket(BILIBILI_RATE_LIMIT, BILIBILI_RATE_BURST, RATE_LIMIT_FILE))
+        self.space_headers = self._build_space_headers()
+        self.list_cache = ListCache(LIST_CACHE_FILE, LIST_CACHE_TTL)
+        self.detail_cache = DetailCache(DETAIL_CACHE_TTL, DETAIL_CACHE_SIZE, DETAIL_CACHE_FILE)
+        self.wbi_signer = WbiSigner(self.transport, self.api_base, WBI_KEYS_FILE, WBI_KEY_TTL)
+        self.breakers = CircuitBreakerRegistry(CIRCUIT_BREAKER_FILE, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+        # 定时推送与间隔检查等并发的相同请求只发出一次
+        self.single_flight = SingleFlight()
         
-    def _ensure_data_dir(self):
-        """确保data目录存在"""
-        os.makedirs('data', exist_ok=True)
+    def _build_space_headers(self) -> Dict[str, str]:
+        """投稿列表和合集接口使用的浏览器请求头（Referer 随UP主变化，每个来源构建一次）"""
+        return {
+            'Accept': 'application/json, text/plain, */*',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Referer': f'https://space.bilibili.com/{self.up_uid}',
+            'Origin': 'https://space.bilibili.com',
+            'Sec-Fetch-Dest': 'empty',
+            'Sec-Fetch-Mode': 'cors',
+            'Sec-Fetch-Site': 'same-site'
+        }
     
-    def _wait_for_rate_limit(self):
-        """等待请求间隔以避免频率限制"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            wait_time = self.min_request_interval - time_since_last + random.uniform(0.5, 1.5)
-            logger.debug(f"Rate limiting: waiting {wait_time:.2f} seconds")
-            time.sleep(wait_time)
-        self.last_request_time = time.time()
+    def for_source(self, up_uid: str, season_id: str = '', series_id: str = '') -> 'BilibiliMonitor':
+        """返回监控另一个来源的监控器
+        
+        新监控器与当前监控器共享传输层、令牌桶、熔断器、WBI签名器、列表/详情缓存和请求合并，
+        因此多个来源的请求仍受同一个预算约束，缓存文件也不会被多个实例互相覆盖。
+        """
+        monitor = copy.copy(self)
+        monitor.up_uid = str(up_uid)
+        monitor.season_id = season_id
+        monitor.series_id = series_id
+        monitor.space_headers = monitor._build_space_headers()
+        return monitor
     
-    def _load_cache(self) -> Optional[List[Dict]]:
-        """加载缓存的视频数据"""
+    def get_latest_videos(self, page_size: int = 10) -> List[Video]:
+        """获取UP主最新的视频列表"""
+        # 首先尝试从缓存加载（按UID和分页参数区分）
+        cache_key = ListCache.make_key('list', self.up_uid, 1, page_size)
+        cached_videos = self.list_cache.get(cache_key)
+        if cached_videos:
+            logger.info(f"Loaded {len(cached_videos)} videos from cache")
+            return [Video.from_json(video) for video in cached_videos]
+        
         try:
-            if not os.path.exists(self.cache_file):
-                return None
-            
-            # 检查缓存是否过期
-            cache_age = time.time() - os.path.getmtime(self.cache_file)
-            if cache_age > self.cache_duration:
-                logger.debug("Cache expired")
-                return None
-                
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
-                logger.info(f"Loaded {len(cached_data)} videos from cache")
-                return cached_data
+            videos, endpoint = self._request_list_page(1, page_size)
         except Exception as e:
-            logger.warning(f"Failed to load cache: {e}")
-            return None
+            logger.error(f"All list APIs failed: {e}")
+            return self._fallback_to_cache_or_mock(cache_key)
+        
+        formatted_videos = self._format_videos(videos)
+        # 保存到缓存
+        if formatted_videos:
+            self.list_cache.put(cache_key, [video.to_json() for video in formatted_videos])
+        
+        logger.info(f"Successfully fetched {len(videos)} videos from {endpoint} API")
+        return formatted_videos
     
-    def _save_cache(self, videos: List[Dict]):
-        """保存视频数据到缓存"""
-        try:
-            self._ensure_data_dir()
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(videos, f, ensure_ascii=False, indent=2)
-            logger.debug(f"Cached {len(videos)} videos")
-        except Exception as e:
-            logger.warning(f"Failed to save cache: {e}")
+    def _request_list_page(self, page: int, page_size: int):
+        """请求一页投稿列表，返回 (原始视频列表, 接口名)；并发的相同请求合并为一次"""
+        key = ('list', self.up_uid, page, page_size)
+        return self.single_flight.do(key, self._try_list_endpoints, page, page_size)
     
-    def get_latest_videos(self, page_size: int = 10) -> List[Dict]:
-        """获取UP主最新的视频列表"""
-        # 首先尝试从缓存加载
-        cached_videos = self._load_cache()
-        if cached_videos:
-            return cached_videos[:page_size]
+    def _try_list_endpoints(self, page: int, page_size: int):
+        """按熔断器健康度依次尝试投稿列表接口，返回 (原始视频列表, 接口名)
         
-        try:
-            # 等待避免频率限制
-            self._wait_for_rate_limit()
-            
-            # 使用官方API规范中的接口
-            url = f"{BILIBILI_API_BASE}/x/space/wbi/arc/search"
-            params = {
-                'mid': self.up_uid,
-                'ps': min(page_size, 30),  # API限制最大30
-                'tid': 0,
-                'pn': 1,
-                'keyword': '',
-                'order': 'pubdate'
-            }
+        已熔断的接口直接跳过，不再为其付出超时和限流等待；全部失败时抛出异常。
+        """
+        requesters = {'primary': self._request_primary_page, 'alternative': self._request_alternative_page}
+        errors = []
+        for endpoint in self.breakers.order(LIST_ENDPOINTS):
+            breaker = self.breakers.get(endpoint)
+            if not breaker.allow_request():
+                logger.debug(f"Circuit for {endpoint} API is open, skipping")
+                errors.append(f"{endpoint}: circuit open")
+                continue
             
-            # 添加标准请求头
-            headers = {
-                **HEADERS,
-                'Accept': 'application/json',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache'
-            }
+            start = time.time()
+            try:
+                videos = requesters[endpoint](page, page_size)
+            except Exception as e:
+                breaker.record_failure(time.time() - start)
+                self.breakers.save()
+                logger.warning(f"Error with {endpoint} API on page {page}: {e}")
+                errors.append(f"{endpoint}: {e}")
+                continue
             
-            response = self.session.get(url, params=params, headers=headers, timeout=10)
+            breaker.record_success(time.time() - start)
+            self.breakers.save()
+            return videos, endpoint
+        
+        raise RuntimeError('; '.join(errors))
+    
+    def _request_primary_page(self, page: int, page_size: int) -> List[Dict]:
+        """请求主接口（WBI签名）的一页投稿，失败时抛出异常"""
+        # 使用官方API规范中的接口
+        url = f"{self.api_base}/x/space/wbi/arc/search"
+        params = {
+            'mid': self.up_uid,
+            'ps': min(page_size, 30),  # API限制最大30
+            'tid': 0,
+            'pn': page,
+            'keyword': '',
+            'order': 'pubdate'
+        }
+        
+        response = self.transport.get(url, params=self.wbi_signer.sign(params), headers=API_HEADERS)
+        response.raise_for_status()
+        
+        code, message, data = ARC_SEARCH.decode(response.content)
+        if code in SIGNATURE_ERROR_CODES:
+            # WBI密钥可能已轮换，刷新后重新签名重试一次
+            logger.info("WBI signature rejected, refreshing keys")
+            self.wbi_signer.invalidate()
+            response = self.transport.get(url, params=self.wbi_signer.sign(params), headers=API_HEADERS)
             response.raise_for_status()
+            code, message, data = ARC_SEARCH.decode(response.content)
+        
+        if code != 0:
+            raise ValueError(message or 'Unknown error')
+        
+        # 按契约解码，结构不符时已抛出 DecodeError
+        return data['list']['vlist']
+    
+    def _request_alternative_page(self, page: int, page_size: int) -> List[Dict]:
+        """请求备用接口的一页投稿，失败时抛出异常"""
+        # 使用简化的用户投稿接口
+        url = f"{self.api_base}/x/space/arc/search"
+        params = {
+            'mid': self.up_uid,
+            'ps': min(page_size, 20),  # 限制数量
+            'pn': page,
+            'order': 'pubdate'
+        }
+        
+        # 使用更完整的浏览器请求头
+        response = self.transport.get(url, params=params, headers=self.space_headers)
+        response.raise_for_status()
+        
+        code, message, data = ARC_SEARCH.decode(response.content)
+        if code != 0:
+            raise ValueError(message or 'Unknown error')
+        return data['list']['vlist']
+    
+    def iter_videos(self, is_known: Optional[Callable[[str], bool]] = None, since: Optional[int] = None,
+                    page_size: int = 10, max_pages: int = 50,
+                    predicate: Optional[Callable[[Video], bool]] = None) -> Iterator[Video]:
+        """按发布时间倒序逐页惰性产出格式化后的视频
+        
+        遇到已处理的视频（is_known(bvid) 为真）或发布时间早于 since 时立即停止，
+        因此常规轮询只请求一页，停机后追赶也只请求恰好需要的页数。
+        predicate 用于跳过不关心的视频（例如非AI早报投稿），被跳过的视频不会触发停止。
+        某一页拉取失败时抛出 VideoListError，调用方可以区分接口故障和空列表。
+        配置了合集时拉取合集成员；合集第一页失败或为空且启用了关键词回退时，
+        与 get_ai_news_videos 一样改为拉取投稿列表，只保留标题含AI早报关键词的视频。
+        """
+        collection = bool(self.season_id or self.series_id)
+        keyword_fallback = False
+        for page in range(1, max_pages + 1):
+            can_fall_back = page == 1 and collection and self.keyword_fallback
+            try:
+                videos = self._fetch_video_page(page, page_size, collection)
+            except VideoListError:
+                if not can_fall_back:
+                    raise
+                videos = []
+            if not videos and can_fall_back:
+                logger.warning("Collection fetch returned nothing, falling back to keyword filter")
+                collection = False
+                keyword_fallback = True
+                videos = self._fetch_video_page(page, page_size, collection)
+            if not videos:
+                return
             
-            data = response.json()
-            if data.get('code') != 0:
-                logger.warning(f"Primary API failed: {data.get('message', 'Unknown error')}")
-                return self._try_alternative_api(page_size)
-            
-            # 根据API规范解析响应数据
-            video_data = data.get('data', {})
-            if 'list' in video_data and 'vlist' in video_data['list']:
-                videos = video_data['list']['vlist']
-            else:
-                logger.warning("Unexpected API response structure")
-                return self._try_alternative_api(page_size)
-            
-            formatted_videos = self._format_videos(videos)
-            # 保存到缓存
-            self._save_cache(formatted_videos)
-            
-            logger.info(f"Successfully fetched {len(videos)} videos from primary API")
-            return formatted_videos
+            for video in videos:
+                if since is not None and video.pubdate is not None and video.pubdate < since:
+                    logger.debug(f"Reached cutoff at video {video.bvid}, stopping")
+                    return
+                if keyword_fallback and not self._matches_keywords(video):
+                    continue
+                if predicate and not predicate(video):
+                    continue
+                if is_known and is_known(video.bvid):
+                    logger.debug(f"Reached known video {video.bvid} on page {page}, stopping")
+                    return
+                yield video
             
-        except Exception as e:
-            logger.warning(f"Error with primary API: {e}")
-            return self._try_alternative_api(page_size)
+            if len(videos) < page_size:
+                return
+    
+    def iter_ai_news_videos(self, is_known: Optional[Callable[[str], bool]] = None, since: Optional[int] = None,
+                            page_size: int = 10, max_pages: int = 50) -> Iterator[Video]:
+        """惰性产出AI早报视频（合集成员，或按标题关键词筛选的投稿）"""
+        predicate = None if (self.season_id or self.series_id) else self._matches_keywords
+        return self.iter_videos(is_known, since, page_size, max_pages, predicate)
     
-    def _try_alternative_api(self, page_size: int) -> List[Dict]:
-        """尝试备用API"""
+    def _fetch_video_page(self, page: int, page_size: int, collection: bool) -> List[Video]:
+        """请求一页视频（合集或投稿列表），投稿列表按熔断器健康度选择接口；失败时抛出 VideoListError"""
+        if collection:
+            archives, _ = self._fetch_collection_page(page, page_size)
+            if archives is None:
+                raise VideoListError(f"Collection page {page} unavailable")
+            return self._format_videos(archives)
+        
         try:
-            # 等待避免频率限制
-            self._wait_for_rate_limit()
-            
-            # 使用简化的用户投稿接口
-            url = f"{BILIBILI_API_BASE}/x/space/arc/search"
-            params = {
-                'mid': self.up_uid,
-                'ps': min(page_size, 20),  # 限制数量
-                'pn': 1,
-                'order': 'pubdate'
-            }
-            
-            # 添加更完整的浏览器headers
-            headers = {
-                **HEADERS,
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Referer': f'https://space.bilibili.com/{self.up_uid}',
-                'Origin': 'https://space.bilibili.com',
-                'Sec-Fetch-Dest': 'empty',
-                'Sec-Fetch-Mode': 'cors',
-                'Sec-Fetch-Site': 'same-site'
-            }
-            
-            response = self.session.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get('code') == 0:
-                # 处理不同的响应结构
-                video_data = data.get('data', {})
-                if 'list' in video_data and 'vlist' in video_data['list']:
-                    videos = video_data['list']['vlist']
-                elif 'vlist' in video_data:
-                    videos = video_data['vlist']
-                else:
-                    videos = []
-                
-                formatted_videos = self._format_videos(videos)
-                # 保存到缓存
-                if formatted_videos:
-                    self._save_cache(formatted_videos)
-                
-                logger.info(f"Alternative API succeeded, got {len(videos)} videos")
-                return formatted_videos
-            else:
-                logger.error(f"Alternative API failed: {data.get('message', 'Unknown error')}")
-                return self._fallback_to_cache_or_mock(page_size)
-                
+            videos, _ = self._request_list_page(page, page_size)
         except Exception as e:
-            logger.error(f"Alternative API error: {e}")
-            return self._fallback_to_cache_or_mock(page_size)
+            logger.error(f"All list APIs failed on page {page}: {e}")
+            raise VideoListError(f"Video list page {page} unavailable: {e}") from e
+        return self._format_videos(videos)
     
-    def _fallback_to_cache_or_mock(self, page_size: int) -> List[Dict]:
+    def _fallback_to_cache_or_mock(self, cache_key: str) -> List[Video]:
         """回退到缓存或模拟数据"""
         # 尝试加载过期的缓存
-        try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cached_data = json.load(f)
-                    logger.info(f"Using expired cache with {len(cached_data)} videos")
-                    return cached_data[:page_size]
-        except Exception as e:
-            logger.warning(f"Failed to load expired cache: {e}")
+        cached_videos = self.list_cache.get(cache_key, allow_stale=True)
+        if cached_videos:
+            logger.info(f"Using expired cache with {len(cached_videos)} videos")
+            return [Video.from_json(video) for video in cached_videos]
         
         logger.warning("All API attempts failed. Returning empty list.")
         return []
     
-    def get_ai_news_videos(self) -> List[Dict]:
-        """获取AI早报相关的视频"""
-        videos = self.get_latest_videos(20)  # 获取更多视频以筛选AI早报
-        ai_news_videos = []
+    def get_ai_news_videos(self) -> List[Video]:
+        """获取AI早报相关的视频
         
-        for video in videos:
-            title = video.get('title', '').lower()
-            if any(keyword in title for keyword in ['ai早报', 'ai 早报', 'ai日报', 'ai简报', 'ai资讯']):
-                ai_news_videos.append(video)
+        配置了合集（season_id）或系列（series_id）时直接拉取合集成员；
+        未配置或合集接口失败时，回退到按标题关键词筛选最新投稿。
+        """
+        if self.season_id or self.series_id:
+            videos = self.get_collection_videos(20)
+            if videos or not self.keyword_fallback:
+                return videos
+            logger.warning("Collection fetch returned nothing, falling back to keyword filter")
         
-        return ai_news_videos
+        return self._filter_by_keywords(self.get_latest_videos(20))  # 获取更多视频以筛选AI早报
     
-    def get_video_detail(self, bvid: str) -> Optional[Dict]:
-        """获取视频详细信息"""
+    def _filter_by_keywords(self, videos: List[Video]) -> List[Video]:
+        """按标题关键词筛选AI早报视频"""
+        return [video for video in videos if self._matches_keywords(video)]
+    
+    def _matches_keywords(self, video: Video) -> bool:
+        """标题是否包含AI早报关键词"""
+        title = video.title.lower()
+        return any(keyword in title for keyword in AI_NEWS_KEYWORDS)
+    
+    def get_collection_videos(self, page_size: int = 20, max_pages: int = 1) -> List[Video]:
+        """获取合集/系列中的视频（按发布时间倒序），支持分页"""
+        collected = []
+        for page in range(1, max_pages + 1):
+            archives, total = self._fetch_collection_page(page, page_size)
+            if archives is None:
+                break
+            collected.extend(archives)
+            if not archives or page * page_size >= total:
+                break
+        
+        formatted_videos = self._format_videos(collected)
+        if formatted_videos:
+            logger.info(f"Fetched {len(formatted_videos)} videos from collection")
+        return formatted_videos
+    
+    def _fetch_collection_page(self, page: int, page_size: int):
+        """请求合集/系列的一页，返回 (标准化后的视频列表, 总数)；并发的相同请求合并为一次"""
+        key = ('collection', self.up_uid, self.season_id, self.series_id, page, page_size)
+        return self.single_flight.do(key, self._request_collection_page, page, page_size)
+    
+    def _request_collection_page(self, page: int, page_size: int):
+        """请求合集/系列的一页，返回 (标准化后的视频列表, 总数)，失败或已熔断时返回 (None, 0)"""
+        breaker = self.breakers.get('collection')
+        if not breaker.allow_request():
+            logger.debug("Circuit for collection API is open, skipping")
+            return None, 0
+        
+        start = time.time()
         try:
-            # 使用官方API规范中的视频详情接口
-            url = f"{BILIBILI_API_BASE}/x/web-interface/view"
-            params = {'bvid': bvid}
-            
-            # 按照API文档要求添加请求头
-            headers = {
-                **HEADERS,
-                'Accept': 'application/json',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Cache-Control': 'no-cache',
-                'Referer': f'https://www.bilibili.com/video/{bvid}',
-                'Origin': 'https://www.bilibili.com'
-            }
+            if self.season_id:
+                url = f"{self.api_base}/x/polymer/web-space/seasons_archives_list"
+                params = {
+                    'mid': self.up_uid,
+                    'season_id': self.season_id,
+                    'sort_reverse': 'true',  # 最新的在前
+                    'page_num': page,
+                    'page_size': min(page_size, 100)
+                }
+            else:
+                url = f"{self.api_base}/x/series/archives"
+                params = {
+                    'mid': self.up_uid,
+                    'series_id': self.series_id,
+                    'only_normal': 'true',
+                    'sort': 'desc',
+                    'pn': page,
+                    'ps': min(page_size, 100)
+                }
             
-            response = self.session.get(url, params=params, headers=headers, timeout=10)
+            response = self.transport.get(url, params=params, headers=self.space_headers)
             response.raise_for_status()
             
-            data = response.json()
-            if data.get('code') != 0:
-                logger.error(f"Error getting video detail: {data.get('message', 'Unknown error')}")
-                return None
+            code, message, data = COLLECTION.decode(response.content)
+            if code != 0:
+                raise ValueError(message or 'Unknown error')
             
-            video_info = data.get('data')
-            if video_info:
-                logger.debug(f"Successfully fetched detail for video: {bvid}")
-            return video_info
+            total = data.get('page', {}).get('total', 0)
+            archives = [self._archive_to_vlist_item(archive) for archive in data.get('archives', [])]
             
+        except Exception as e:
+            breaker.record_failure(time.time() - start)
+            self.breakers.save()
+            logger.warning(f"Error fetching collection page {page}: {e}")
+            return None, 0
+        
+        breaker.record_success(time.time() - start)
+        self.breakers.save()
+        return archives, total
+    
+    def _archive_to_vlist_item(self, archive: Dict) -> Dict:
+        """将合集接口的 archive 条目转换为投稿列表（vlist）的字段格式"""
+        duration = archive.get('duration') or 0
+        return {
+            'bvid': archive.get('bvid'),
+            'aid': archive.get('aid'),
+            'title': archive.get('title', ''),
+            'description': archive.get('desc', ''),
+            'created': archive.get('pubdate'),
+            'length': f"{duration // 60:02d}:{duration % 60:02d}",
+            'play': (archive.get('stat') or {}).get('view', 0),
+            'pic': archive.get('pic', ''),
+            'mid': self.up_uid
+        }
+    
+    def get_video_detail(self, bvid: str) -> Optional[Dict]:
+        """获取视频详细信息（优先使用详情缓存）"""
+        cached_detail = self.detail_cache.get(bvid)
+        if cached_detail is not None:
+            logger.debug(f"Detail cache hit for video: {bvid}")
+            return cached_detail
+        
+        return self.single_flight.do(('detail', bvid), self._request_video_detail, bvid)
+    
+    def _request_video_detail(self, bvid: str) -> Optional[Dict]:
+        """请求视频详情接口，成功时写入详情缓存"""
+        try:
+            url, params, headers = self._video_detail_request(bvid)
+            response = self.transport.get(url, params=params, headers=headers)
+            return self._handle_video_detail(bvid, response)
         except Exception as e:
             logger.error(f"Error fetching video detail: {e}")
             return None
     
-    def _format_videos(self, videos: List[Dict]) -> List[Dict]:
-        """格式化视频信息，基于API规范"""
+    def _video_detail_request(self, bvid: str):
+        """构建视频详情请求，返回 (url, params, headers)"""
+        # 使用官方API规范中的视频详情接口
+        url = f"{self.api_base}/x/web-interface/view"
+        params = {'bvid': bvid}
+        
+        # 按照API文档要求添加请求头（只有 Referer 随视频变化）
+        headers = {
+            **API_HEADERS,
+            'Referer': f'https://www.bilibili.com/video/{bvid}',
+            'Origin': 'https://www.bilibili.com'
+        }
+        return url, params, headers
+    
+    def _handle_video_detail(self, bvid: str, response) -> Optional[Dict]:
+        """解码视频详情响应并写入详情缓存"""
+        response.raise_for_status()
+        
+        # 只保留用到的字段（不含 owner、rights、honor_reply 等），缓存也随之变小
+        code, message, video_info = VIDEO_DETAIL.decode(response.content)
+        if code != 0:
+            logger.error(f"Error getting video detail: {message or 'Unknown error'}")
+            return None
+        
+        if video_info:
+            logger.debug(f"Successfully fetched detail for video: {bvid}")
+            self.detail_cache.put(bvid, video_info)
+        return video_info
+    
+    def get_stats(self) -> Dict:
+        """获取监控器运行统计"""
+        return {
+            'detail_cache': self.detail_cache.get_stats(),
+            'list_cache': self.list_cache.get_stats(),
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'circuit_breakers': self.breakers.get_stats(),
+            'single_flight': self.single_flight.get_stats(),
+            'http': self.transport.get_stats(),
+            'wbi_key_fetches': self.wbi_signer.key_fetches
+        }
+    
+    def _format_videos(self, videos: List[Dict]) -> List[Video]:
+        """将接口返回的投稿条目转换为 Video，基于API规范"""
         formatted_videos = []
         for video in videos:
             # 确保必要字段存在
-            bvid = video.get('bvid')
-            if not bvid:
+            if not video.get('bvid'):
                 logger.warning(f"Video missing bvid, skipping: {video}")
                 continue
-                
-            formatted_video = {
-                'bvid': bvid,
-                'aid': video.get('aid'),  # 添加aid字段
-                'title': video.get('title', ''),
-                'description': video.get('description', ''),
-                'created': video.get('created'),
-                'length': video.get('length', ''),
-                'play': video.get('play', 0),
-                'video_url': f"https://www.bilibili.com/video/{bvid}",
-                'pic': video.get('pic', ''),
-                'author': video.get('author', ''),  # UP主名称
-                'mid': video.get('mid', self.up_uid),  # UP主ID
-                'typeid': video.get('typeid'),  # 分区ID
-                'typename': video.get('typename', ''),  # 分区名称
-                'pubdate': video.get('created'),  # 发布时间戳
-                'comment': video.get('comment', 0),  # 评论数
-                'review': video.get('review', 0)  # 弹幕数
-            }
-            formatted_videos.append(formatted_video)
+            formatted_videos.append(Video.from_api(video, self.up_uid))
         
         logger.debug(f"Formatted {len(formatted_videos)} videos")
         return formatted_videos
@@ -0,0 +1,54 @@
+"""
+BV号与AV号互转（本地计算，无需请求API）
+"""
+
+from typing import Optional
+
+XOR_CODE = 23442827791579
+MASK_CODE = 2251799813685247
+MAX_AID = 1 << 51
+BASE = 58
+ALPHABET = 'FcwAPNKTMug3GV5Lj7EJnHpWsx4tb8haYeviqBz6rkCy12mUSDQX9RdoZf'
+_ALPHABET_INDEX = {char: index for index, char in enumerate(ALPHABET)}
+BVID_LENGTH = 12
+
+def av_to_bv(aid: int) -> str:
+    """将AV号编码为BV号"""
+    if not 0 < aid < MAX_AID:
+        raise ValueError(f"aid out of range: {aid}")
+    chars = list('BV1000000000')
+    index = BVID_LENGTH - 1
+    tmp = (MAX_AID | aid) ^ XOR_CODE
+    while tmp > 0:
+        chars[index] = ALPHABET[tmp % BASE]
+        tmp //= BASE
+        index -= 1
+    chars[3], chars[9] = chars[9], chars[3]
+    chars[4], chars[7] = chars[7], chars[4]
+    return ''.join(chars)
+
+def bv_to_av(bvid: str) -> int:
+    """将BV号解码为AV号，格式不合法时抛出ValueError"""
+    if len(bvid) != BVID_LENGTH or not bvid.startswith('BV1'):
+        raise ValueError(f"invalid bvid: {bvid}")
+    chars = list(bvid)
+    chars[3], chars[9] = chars[9], chars[3]
+    chars[4], chars[7] = chars[7], chars[4]
+    tmp = 0
+    for char in chars[3:]:
+        try:
+            tmp = tmp * BASE + _ALPHABET_INDEX[char]
+        except KeyError:
+            raise ValueError(f"invalid bvid: {bvid}") from None
+    return (tmp & MASK_CODE) ^ XOR_CODE
+
+def try_bv_to_av(bvid: str) -> Optional[int]:
+    """解码BV号，无法解码（例如测试用的伪造ID）时返回None"""
+    try:
+        aid = bv_to_av(bvid)
+    except (ValueError, TypeError):
+        return None
+    # 只接受能无损往返的ID，避免不同写法映射到同一个AV号
+    if not 0 < aid < MAX_AID or av_to_bv(aid) != bvid:
+        return None
+    return aid
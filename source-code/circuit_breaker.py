@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """单个接口的熔断器：滚动窗口记录成功率和延迟
+    
+    连续失败达到 failure_threshold 次后熔断（open），期间直接跳过该接口；
+    熔断 reset_timeout 秒后进入半开（half_open），放行一次探测请求，
+    探测成功则恢复（closed），失败则重新熔断。
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 900, window: int = 20):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.outcomes = deque(maxlen=window)  # (成功与否, 延迟秒数)
+        self.skipped = 0
+    
+    @property
+    def probe_due(self) -> bool:
+        """熔断已超时，可以发送探测请求"""
+        return self.state != CLOSED and time.time() - self.opened_at >= self.reset_timeout
+    
+    def allow_request(self) -> bool:
+        """是否应向该接口发出请求；熔断超时后转为半开并放行一次探测"""
+        if self.state == CLOSED:
+            return True
+        if self.probe_due:
+            logger.info(f"Circuit for {self.name} API half-open, sending probe")
+            # 探测期间重新计时，避免并发请求同时探测；探测中断也会在下次超时后重试
+            self.state = HALF_OPEN
+            self.opened_at = time.time()
+            return True
+        self.skipped += 1
+        return False
+    
+    def record_success(self, latency: float):
+        if self.state != CLOSED:
+            # 探测成功：接口已恢复，丢弃故障期间的样本重新统计
+            logger.info(f"Circuit for {self.name} API closed")
+            self.outcomes.clear()
+        self.outcomes.append((True, latency))
+        self.consecutive_failures = 0
+        self.state = CLOSED
+    
+    def record_failure(self, latency: float):
+        self.outcomes.append((False, latency))
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(f"Circuit for {self.name} API opened after {self.consecutive_failures} failures")
+            self.state = OPEN
+            self.opened_at = time.time()
+    
+    @property
+    def success_rate(self) -> float:
+        """滚动窗口内的成功率，没有样本时视为1"""
+        if not self.outcomes:
+            return 1.0
+        return sum(1 for ok, _ in self.outcomes if ok) / len(self.outcomes)
+    
+    @property
+    def avg_latency(self) -> float:
+        latencies = [latency for ok, latency in self.outcomes if ok]
+        return sum(latencies) / len(latencies) if latencies else 0.0
+    
+    def to_dict(self) -> Dict:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'opened_at': self.opened_at,
+            'outcomes': [[ok, round(latency, 3)] for ok, latency in self.outcomes],
+            'skipped': self.skipped
+        }
+    
+    def load_dict(self, data: Dict):
+        self.state = data.get('state', CLOSED)
+        self.consecutive_failures = data.get('consecutive_failures', 0)
+        self.opened_at = data.get('opened_at', 0.0)
+        self.outcomes.extend((bool(ok), float(latency)) for ok, latency in data.get('outcomes', []))
+        self.skipped = data.get('skipped', 0)
+    
+    def get_stats(self) -> Dict:
+        stats = {
+            'state': self.state,
+            'success_rate': round(self.success_rate, 3),
+            'avg_latency_ms': round(self.avg_latency * 1000),
+            'samples': len(self.outcomes),
+            'consecutive_failures': self.consecutive_failures,
+            'skipped': self.skipped
+        }
+        if self.state != CLOSED:
+            stats['retry_in'] = max(0, round(self.opened_at + self.reset_timeout - time.time()))
+        return stats
+
+class CircuitBreakerRegistry:
+    """按接口名管理熔断器，状态持久化到磁盘以便 check/run/status 各进程共享"""
+    
+    def __init__(self, state_file: Optional[str] = None, failure_threshold: int = 3,
+                 reset_timeout: float = 900, window: int = 20):
+        self.state_file = state_file or None
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.window = window
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._saved_state: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self._saved_state = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load circuit breaker state: {e}")
+    
+    def save(self):
+        """原子地写出所有熔断器状态"""
+        if not self.state_file:
+            return
+        try:
+            with self._lock:
+                state = {**self._saved_state, **{name: b.to_dict() for name, b in self._breakers.items()}}
+            os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.warning(f"Failed to save circuit breaker state: {e}")
+    
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, self.failure_threshold, self.reset_timeout, self.window)
+                if name in self._saved_state:
+                    breaker.load_dict(self._saved_state[name])
+                self._breakers[name] = breaker
+            return breaker
+    
+    def order(self, names: List[str]) -> List[str]:
+        """按健康度排序，相同时保持给定的优先顺序
+        
+        到期的探测排在最前（只需一次请求即可确认是否恢复），
+        其次是未熔断的接口，仍在熔断期的排在最后。
+        未熔断的接口不按成功率重排，以免优先级高的接口在偶发失败后再也得不到流量。
+        """
+        def score(name):
+            breaker = self.get(name)
+            if breaker.probe_due:
+                return 0
+            return 1 if breaker.state == CLOSED else 2
+        return sorted(names, key=score)
+    
+    def get_stats(self) -> Dict:
+        names = sorted(set(self._saved_state) | set(self._breakers))
+        return {name: self.get(name).get_stats() for name in names}
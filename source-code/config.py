@@ -8,7 +8,21 @@ WECHAT_WEBHOOK_URL = os.getenv('WECHAT_WEBHOOK_URL')
 
 # Bilibili Configuration
 BILIBILI_UP_UID = os.getenv('BILIBILI_UP_UID', '285286947')  # 橘鸦Juya的UID
-BILIBILI_API_BASE = 'https://api.bilibili.com'
+BILIBILI_API_BASE = os.getenv('BILIBILI_API_BASE', 'https://api.bilibili.com')
+# 「AI早报」合集(season)或系列(series) ID，配置后直接拉取合集成员
+BILIBILI_SEASON_ID = os.getenv('BILIBILI_SEASON_ID', '')
+BILIBILI_SERIES_ID = os.getenv('BILIBILI_SERIES_ID', '')
+# 未配置合集或合集接口失败时，按标题关键词筛选最新投稿
+AI_NEWS_KEYWORDS = ['ai早报', 'ai 早报', 'ai日报', 'ai简报', 'ai资讯']
+AI_NEWS_KEYWORD_FALLBACK = os.getenv('AI_NEWS_KEYWORD_FALLBACK', 'true').lower() == 'true'
+
+# Multi-tenant subscriptions (sources -> webhooks); when the file is missing, the variables above form a single subscription
+SUBSCRIPTIONS_FILE = os.getenv('SUBSCRIPTIONS_FILE', 'subscriptions.json')
+
+# Source plugins, polled concurrently on a bounded thread pool shared by all sources
+SOURCE_TIMEOUT = float(os.getenv('SOURCE_TIMEOUT', 120))  # seconds a source may take per cycle before it is skipped
+SOURCE_WORKERS = int(os.getenv('SOURCE_WORKERS', 8))  # threads polling sources
+FEED_RATE_LIMIT = float(os.getenv('FEED_RATE_LIMIT', 1))  # requests per second per RSS/JSON source
 
 # Application Configuration
 CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', 360))  # minutes
@@ -18,11 +32,60 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 DAILY_PUSH_TIME = os.getenv('DAILY_PUSH_TIME', '09:30')  # Daily push time in China timezone
 CHINA_TIMEZONE = 'Asia/Shanghai'  # China timezone UTC+8
 ENABLE_DAILY_PUSH = os.getenv('ENABLE_DAILY_PUSH', 'true').lower() == 'true'
+DAILY_PUSH_PREWARM = int(os.getenv('DAILY_PUSH_PREWARM', 10))  # minutes before the push to fetch and summarize; 0 disables
+
+# Adaptive polling (opt-in): dense checks inside the learned upload window, back-off (up to CHECK_INTERVAL) outside;
+# off by default so existing deployments keep the fixed CHECK_INTERVAL schedule
+ADAPTIVE_POLLING = os.getenv('ADAPTIVE_POLLING', 'false').lower() == 'true'
+ADAPTIVE_MIN_INTERVAL = float(os.getenv('ADAPTIVE_MIN_INTERVAL', 2))  # minutes between checks inside the window
+# List checks per source per day (China date); by default the same number the fixed CHECK_INTERVAL makes
+ADAPTIVE_DAILY_BUDGET = int(os.getenv('ADAPTIVE_DAILY_BUDGET', max(1, 1440 // max(1, CHECK_INTERVAL))))
 
 # Data Storage
 DATA_DIR = 'data'
 PROCESSED_VIDEOS_FILE = os.path.join(DATA_DIR, 'processed_videos.txt')
 DAILY_PUSH_LOG_FILE = os.path.join(DATA_DIR, 'daily_push_log.txt')  # Record daily push history
+VIDEO_CACHE_FILE = os.path.join(DATA_DIR, 'video_cache.json')  # legacy list cache, only read by the SQLite migration
+LIST_CACHE_FILE = os.path.join(DATA_DIR, 'list_cache.json')  # video lists keyed by source/uid/page
+LIST_CACHE_TTL = int(os.getenv('LIST_CACHE_TTL', 300))  # seconds
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'sqlite')  # sqlite | file
+STATE_DB_FILE = os.path.join(DATA_DIR, 'state.db')  # SQLite state store (WAL mode)
+
+# Video detail cache
+DETAIL_CACHE_TTL = int(os.getenv('DETAIL_CACHE_TTL', 1800))  # seconds
+DETAIL_CACHE_SIZE = int(os.getenv('DETAIL_CACHE_SIZE', 256))  # max cached videos (LRU)
+DETAIL_CACHE_FILE = os.getenv('DETAIL_CACHE_FILE', os.path.join(DATA_DIR, 'detail_cache.json'))  # empty to disable disk spill
+
+# WBI request signing (mixin key cached on disk until the keys rotate)
+WBI_KEYS_FILE = os.path.join(DATA_DIR, 'wbi_keys.json')
+WBI_KEY_TTL = int(os.getenv('WBI_KEY_TTL', 6 * 3600))  # seconds
+
+# Bilibili request budget (token bucket shared by all processes via a lock file)
+BILIBILI_RATE_LIMIT = float(os.getenv('BILIBILI_RATE_LIMIT', 1 / 3))  # requests per second
+BILIBILI_RATE_BURST = int(os.getenv('BILIBILI_RATE_BURST', 2))  # max back-to-back requests
+RATE_LIMIT_FILE = os.path.join(DATA_DIR, 'rate_limit.state')
+
+# Per-endpoint circuit breakers (state shared on disk, shown in --mode status)
+CIRCUIT_BREAKER_FILE = os.path.join(DATA_DIR, 'circuit_breakers.json')
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 3))  # consecutive failures before opening
+CIRCUIT_RESET_TIMEOUT = int(os.getenv('CIRCUIT_RESET_TIMEOUT', 900))  # seconds before a half-open probe
+
+# Shared HTTP transport (one keep-alive session and connection pool per host)
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 4))  # pooled connections per host
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))  # retries on connection errors and 5xx, GET only
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))  # seconds
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 10))  # seconds
+HTTP_HOST_TIMEOUTS = {  # per-host (connect, read) overrides
+    'qyapi.weixin.qq.com': (HTTP_CONNECT_TIMEOUT, 15)
+}
+
+# Per-video pipeline (detail -> summarize -> notify); notify always runs in order on one thread
+PIPELINE_DETAIL_WORKERS = int(os.getenv('PIPELINE_DETAIL_WORKERS', 2))
+PIPELINE_SUMMARY_WORKERS = int(os.getenv('PIPELINE_SUMMARY_WORKERS', 1))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 4))  # max videos waiting in front of each stage
+
+# --mode run-async: threads for blocking work (list walks, HTTP send/receive); waiting happens on the event loop
+ASYNC_WORKERS = int(os.getenv('ASYNC_WORKERS', 8))
 
 # Headers for requests
 HEADERS = {
@@ -1,18 +1,212 @@
-import requests
+import re
 import logging
-from typing import Optional, Dict
+from itertools import islice
+from typing import Optional, Dict, Iterator, List, Tuple
 from bs4 import BeautifulSoup
-from config import HEADERS
+from video import Video
 
 logger = logging.getLogger(__name__)
 
+# 所有emoji表情符号（精确范围，避免误删汉字；汉字范围 U+4E00-U+9FFF 不在其中）
+_EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"  # emoticons (😀-🙏)
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs (🌀-🗿)
+    "\U0001F680-\U0001F6FF"  # transport & map symbols (🚀-🛿)
+    "\U0001F1E0-\U0001F1FF"  # flags (🇠-🇿)
+    "\U0001F900-\U0001F9FF"  # supplemental symbols (🤀-🧿)
+    "\U0001FA70-\U0001FAFF"  # symbols and pictographs extended-A
+    "\U00002600-\U000026FF"  # miscellaneous symbols (☀-⛿)
+    "\U00002700-\U000027BF"  # dingbats (✀-➿)
+    "\U0001F000-\U0001F02F"  # mahjong tiles
+    "\U0001F0A0-\U0001F0FF"  # playing cards
+    "]+", flags=re.UNICODE)
+# 上面各范围的并集外包（两段连续范围），扫描比逐个范围判断快；命中的片段再用精确模式处理
+_EMOJI_CANDIDATE_PATTERN = re.compile("[\u2600-\u27BF\U0001F000-\U0001FAFF]+")
+
+# 链接、邮箱和B站ID（按原有顺序依次移除），每个模式附带其匹配必然包含的字面量，文本中没有时跳过
+_LINK_PATTERNS = (
+    ('http', re.compile(r'https?://[^\s\n\r\t]+')),  # http/https 链接
+    ('www.', re.compile(r'www\.[^\s\n\r\t]+')),     # www 开头的链接
+    ('@', re.compile(r'\S+@\S+\.\S+')),             # 邮箱（只作用于含@的非空白片段，见 _strip_emails）
+    ('BV', re.compile(r'BV[0-9A-Za-z]+')),            # BV号
+    ('av', re.compile(r'av[0-9]+'))                   # AV号
+)
+
+# 以 endpos 结尾的非空白片段前面的那个空白字符
+_TOKEN_START_PATTERN = re.compile(r'\s\S*\Z')
+_TOKEN_REST_PATTERN = re.compile(r'\S*')
+
+# 常见的无用信息（顺序即原先逐个 str.replace 的顺序）
+UNWANTED_PHRASES = (
+    '点击展开',
+    '展开全部',
+    '收起',
+    '更多精彩内容',
+    '关注我们',
+    '订阅频道',
+    '链接：',
+    '网址：',
+    '地址：',
+    '官网：',
+    '详情：',
+    '查看更多',
+    '点击查看',
+    '复制链接',
+    '分享链接'
+)
+
+_PHRASE_PATTERN = re.compile('|'.join(map(re.escape, UNWANTED_PHRASES)))
+_PHRASE_MAX_LEN = max(map(len, UNWANTED_PHRASES))
+
+def _strip_emoji_run(match) -> str:
+    return _EMOJI_PATTERN.sub('', match.group(0))
+
+def _strip_emails(text: str, pattern) -> str:
+    """只对含@的非空白片段执行邮箱模式，结果与在全文上执行相同
+    
+    邮箱模式不跨越空白；在全文上执行时 \\S+ 会在每段无空白的长文本（中文描述很常见）里反复回溯，代价是长度的平方。
+    """
+    pieces = []
+    last = 0
+    at = text.find('@')
+    while at != -1:
+        space = _TOKEN_START_PATTERN.search(text, last, at)
+        start = space.start() + 1 if space else last
+        end = _TOKEN_REST_PATTERN.match(text, at).end()
+        pieces.append(text[last:start])
+        pieces.append(pattern.sub(' ', text[start:end]))
+        last = end
+        at = text.find('@', end)
+    pieces.append(text[last:])
+    return ''.join(pieces)
+
+def _strip_links(text: str) -> str:
+    """移除链接、邮箱和B站ID，结果与在全文上依次执行 _LINK_PATTERNS 完全相同"""
+    for literal, pattern in _LINK_PATTERNS:
+        if literal not in text:
+            continue
+        if literal == '@':
+            text = _strip_emails(text, pattern)
+        else:
+            text = pattern.sub(' ', text)
+    return text
+
+def _collapse_whitespace(text: str) -> str:
+    """连续空白合并为单个空格（与 re.sub(r'\\s+', ' ', text) 相同，str.split 与 \\s 的空白定义一致）"""
+    words = text.split()
+    if not words:
+        return ' ' if text else ''
+    collapsed = ' '.join(words)
+    if text[0].isspace():
+        collapsed = ' ' + collapsed
+    if text[-1].isspace():
+        collapsed += ' '
+    return collapsed
+
+def _phrase_spans(text: str) -> Optional[List[Tuple[int, int]]]:
+    """找出所有短语出现的位置；出现之间互相重叠或离得太近时返回 None
+    
+    每次从上一处出现的下一个字符开始查找，重叠的出现也能被找到；
+    相邻两处出现之间至少隔开 _PHRASE_MAX_LEN - 1 个字符时，删除一处不会影响其他出现是否成立。
+    """
+    spans = []
+    match = _PHRASE_PATTERN.search(text)
+    while match:
+        start, end = match.span()
+        match = _PHRASE_PATTERN.search(text, start + 1)
+        if match and match.start() < end + _PHRASE_MAX_LEN - 1:
+            return None
+        spans.append((start, end))
+    return spans
+
+def _strip_phrases(text: str) -> str:
+    """删除所有无用短语，结果与按 UNWANTED_PHRASES 顺序逐个 str.replace 完全相同
+    
+    通常一次扫描完成；短语互相重叠、挨得很近，或删除后在接缝处拼出新短语时
+    （逐个替换的结果取决于短语顺序），退回逐个替换。
+    """
+    spans = _phrase_spans(text)
+    if spans is None:
+        return _strip_phrases_in_order(text)
+    if not spans:
+        return text
+    
+    pieces = []
+    last = 0
+    for start, end in spans:
+        pieces.append(text[last:start])
+        last = end
+    pieces.append(text[last:])
+    
+    window = _PHRASE_MAX_LEN - 1
+    for left, right in zip(pieces, pieces[1:]):
+        if _PHRASE_PATTERN.search(left[-window:] + right[:window]):
+            return _strip_phrases_in_order(text)
+    return ''.join(pieces)
+
+def _strip_phrases_in_order(text: str) -> str:
+    for phrase in UNWANTED_PHRASES:
+        text = text.replace(phrase, '')
+    return text
+
+def clean_description_text(description: str) -> str:
+    """描述文本清理：去除HTML标签、emoji、链接/邮箱/B站ID和常见无用短语，空白合并为单个空格
+    
+    所有模式在模块加载时编译；邮箱模式只处理含@的片段，短语通常一次扫描删除。
+    """
+    # 移除HTML标签（如果存在）
+    if '<' in description and '>' in description:
+        soup = BeautifulSoup(description, 'html.parser')
+        clean_text = soup.get_text()
+    else:
+        clean_text = description
+    
+    # 将 ⬛ 替换为换行符
+    clean_text = clean_text.replace('⬛', '\n\n')
+    clean_text = _EMOJI_CANDIDATE_PATTERN.sub(_strip_emoji_run, clean_text)
+    clean_text = _strip_links(clean_text)
+    clean_text = _collapse_whitespace(clean_text)
+    return _strip_phrases(clean_text)
+
+# 按时间信息分割内容："{标题}: {时间}"
+_TIME_PATTERN = re.compile(r'([^:\n]+):\s*(\d{1,2}:\d{2}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}月\d{1,2}日|\d{1,2}/\d{1,2}|\d{1,2}-\d{1,2}|今天|昨天|明天|本周|上周|下周)')
+# 只包含特殊字符的行（没有字母、数字或汉字）
+_SYMBOLS_ONLY_PATTERN = re.compile(r'^[^\w\u4e00-\u9fff]*$')
+
+# 内容概要最多保留的条目数，避免过长
+MAX_BULLET_ENTRIES = 8
+
+def iter_time_bullets(text: str) -> Iterator[str]:
+    """按 "标题: 时间" 把清理后的描述逐条切分为 "标题 (时间): 内容"
+    
+    只遍历一次时间匹配，每条的内容到下一处匹配开始为止；惰性产出，调用方取够条目后不再继续扫描。
+    """
+    matches = _TIME_PATTERN.finditer(text)
+    match = next(matches, None)
+    while match:
+        following = next(matches, None)
+        content_end = following.start() if following else len(text)
+        title_part = match.group(1).strip()
+        time_part = match.group(2).strip()
+        if title_part:
+            # 清理内容，移除多余的换行和空格
+            content_part = ' '.join(text[match.end():content_end].split())
+            entry = f"{title_part} ({time_part}): {content_part}" if content_part else f"{title_part} ({time_part})"
+            if len(entry) > 10:  # 过滤太短的条目
+                yield entry
+        match = following
+
+def _iter_lines(text: str, min_length: int) -> Iterator[str]:
+    """逐行产出长度超过 min_length 且不只包含特殊字符的行"""
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) > min_length and not _SYMBOLS_ONLY_PATTERN.match(line):
+            yield line
+
 class ContentSummarizer:
     """视频内容总结器"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
-    
     def extract_video_info(self, video_detail: Dict) -> Dict:
         """从视频详情中提取关键信息"""
         try:
@@ -42,12 +236,12 @@ class ContentSummarizer:
             logger.error(f"Error extracting video info: {e}")
             return {}
     
-    def generate_summary(self, video: Dict, video_detail: Optional[Dict] = None) -> str:
+    def generate_summary(self, video: Video, video_detail: Optional[Dict] = None) -> str:
         """生成视频内容摘要"""
         try:
-            title = video.get('title', '')
-            description = video.get('description', '')
-            video_url = video.get('video_url', '')
+            title = video.title
+            description = video.description
+            video_url = video.video_url
             
             # 构建摘要
             summary_parts = []
@@ -84,144 +278,26 @@ class ContentSummarizer:
                 
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
-            return f"📺 {video.get('title', '未知标题')}\n🔗 {video.get('video_url', '')}"
+            return f"📺 {video.title or '未知标题'}\n🔗 {video.video_url}"
     
     def _clean_description(self, description: str) -> str:
         """清理描述文本并按时间信息分割为bullet points"""
         try:
-            import re
-            
-            # 移除HTML标签（如果存在）
-            if '<' in description and '>' in description:
-                soup = BeautifulSoup(description, 'html.parser')
-                clean_text = soup.get_text()
-            else:
-                clean_text = description
-            
-            # 将 ⬛ 替换为换行符
-            clean_text = clean_text.replace('⬛', '\n\n')
-            
-            # 移除所有emoji表情符号（精确范围，避免误删汉字）
-            # 汉字范围: U+4E00-U+9FFF，要避免这个范围
-            emoji_pattern = re.compile(
-                "["
-                "\U0001F600-\U0001F64F"  # emoticons (😀-🙏)
-                "\U0001F300-\U0001F5FF"  # symbols & pictographs (🌀-🗿) 
-                "\U0001F680-\U0001F6FF"  # transport & map symbols (🚀-🛿)
-                "\U0001F1E0-\U0001F1FF"  # flags (🇠-🇿)
-                "\U0001F900-\U0001F9FF"  # supplemental symbols (🤀-🧿)
-                "\U0001FA70-\U0001FAFF"  # symbols and pictographs extended-A
-                "\U00002600-\U000026FF"  # miscellaneous symbols (☀-⛿) 
-                "\U00002700-\U000027BF"  # dingbats (✀-➿)
-                "\U0001F000-\U0001F02F"  # mahjong tiles
-                "\U0001F0A0-\U0001F0FF"  # playing cards
-                "]+", flags=re.UNICODE)
-            clean_text = emoji_pattern.sub('', clean_text)
-            
-            # 移除所有链接信息
-            # 移除 http/https 链接
-            clean_text = re.sub(r'https?://[^\s\n\r\t]+', ' ', clean_text)
-            
-            # 移除 www 开头的链接
-            clean_text = re.sub(r'www\.[^\s\n\r\t]+', ' ', clean_text)
-            
-            # 移除邮箱
-            clean_text = re.sub(r'\S+@\S+\.\S+', ' ', clean_text)
-            
-            # 移除B站相关链接格式
-            clean_text = re.sub(r'BV[0-9A-Za-z]+', ' ', clean_text)
-            clean_text = re.sub(r'av[0-9]+', ' ', clean_text)
+            clean_text = clean_description_text(description)
             
-            # 移除多余的空格
-            clean_text = re.sub(r'\s+', ' ', clean_text)
+            # 按时间信息分割内容，取够条目即停止
+            bullet_points = list(islice(iter_time_bullets(clean_text), MAX_BULLET_ENTRIES))
             
-            # 移除一些常见的无用信息
-            unwanted_phrases = [
-                '点击展开',
-                '展开全部',
-                '收起',
-                '更多精彩内容',
-                '关注我们',
-                '订阅频道',
-                '链接：',
-                '网址：',
-                '地址：',
-                '官网：',
-                '详情：',
-                '查看更多',
-                '点击查看',
-                '复制链接',
-                '分享链接'
-            ]
-            
-            for phrase in unwanted_phrases:
-                clean_text = clean_text.replace(phrase, '')
-            
-            # 按时间信息分割内容：寻找 ": {时间信息}" 模式
-            # 改进的时间模式匹配逻辑
-            time_pattern = r'([^:\n]+):\s*(\d{1,2}:\d{2}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}月\d{1,2}日|\d{1,2}/\d{1,2}|\d{1,2}-\d{1,2}|今天|昨天|明天|本周|上周|下周)'
-            
-            # 寻找所有匹配的时间模式
-            time_matches = list(re.finditer(time_pattern, clean_text))
-            bullet_points = []
-            
-            if time_matches:
-                # 按照匹配的位置分割文本
-                last_end = 0
-                
-                for match in time_matches:
-                    # 获取匹配前的内容作为前置描述
-                    prefix_content = clean_text[last_end:match.start()].strip()
-                    
-                    # 获取匹配的标题和时间
-                    title_part = match.group(1).strip()
-                    time_part = match.group(2).strip()
-                    
-                    # 获取匹配后的内容（到下一个匹配或文本结尾）
-                    next_match_start = time_matches[time_matches.index(match) + 1].start() if time_matches.index(match) + 1 < len(time_matches) else len(clean_text)
-                    content_part = clean_text[match.end():next_match_start].strip()
-                    
-                    # 构建条目
-                    if title_part and content_part:
-                        # 清理内容，移除多余的换行和空格
-                        content_part = re.sub(r'\s+', ' ', content_part)
-                        entry = f"{title_part} ({time_part}): {content_part}"
-                    elif title_part:
-                        entry = f"{title_part} ({time_part})"
-                    else:
-                        continue
-                    
-                    if len(entry.strip()) > 10:  # 过滤太短的条目
-                        bullet_points.append(entry.strip())
-                    
-                    last_end = next_match_start
-            
-            # 如果没有找到时间模式，尝试其他分割方式
+            # 如果没有找到时间模式，按段落分割
             if not bullet_points:
-                # 按段落分割
-                paragraphs = clean_text.split('\n')
-                for para in paragraphs:
-                    para = para.strip()
-                    if para and len(para) > 10:  # 过滤太短的段落
-                        # 清理段落内容
-                        if not re.match(r'^[^\w\u4e00-\u9fff]*$', para):
-                            bullet_points.append(para)
+                bullet_points = list(islice(_iter_lines(clean_text, 10), MAX_BULLET_ENTRIES))
             
             # 如果仍然没有条目，使用原始清理逻辑
             if not bullet_points:
-                lines = clean_text.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and len(line) > 3 and not re.match(r'^[^\w\u4e00-\u9fff]*$', line):
-                        bullet_points.append(line)
+                bullet_points = list(islice(_iter_lines(clean_text, 3), MAX_BULLET_ENTRIES))
             
             # 格式化为bullet points
             if bullet_points:
-                # 限制条目数量，避免过长
-                max_entries = 8
-                if len(bullet_points) > max_entries:
-                    bullet_points = bullet_points[:max_entries]
-                
                 # 添加bullet point符号
                 formatted_points = []
                 for point in bullet_points:
@@ -239,7 +315,7 @@ class ContentSummarizer:
                 for line in lines:
                     line = line.strip()
                     # 过滤掉只包含特殊字符、数字或很短的行
-                    if line and len(line) > 3 and not re.match(r'^[^\w\u4e00-\u9fff]*$', line):
+                    if line and len(line) > 3 and not _SYMBOLS_ONLY_PATTERN.match(line):
                         cleaned_lines.append(line)
                 
                 # 用换行符连接不同内容
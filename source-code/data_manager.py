@@ -1,19 +1,35 @@
 import os
 import json
 import logging
-from typing import Set, Dict, List
-from datetime import datetime, timezone
-from config import DATA_DIR, PROCESSED_VIDEOS_FILE
+import pytz
+from typing import Set, Dict, List, Tuple
+from datetime import datetime
+from config import (DATA_DIR, PROCESSED_VIDEOS_FILE, DAILY_PUSH_LOG_FILE, VIDEO_CACHE_FILE, STATE_BACKEND, STATE_DB_FILE,
+                    CHINA_TIMEZONE)
+from state_store import FileStateStore, SQLiteStateStore
+from time_window import day_bounds, select_in_window
+from video import Video
 
 logger = logging.getLogger(__name__)
 
 class DataManager:
     """数据管理器，负责处理已处理视频的记录"""
     
-    def __init__(self):
+    def __init__(self, backend: str = STATE_BACKEND, channel: str = ''):
         self.data_dir = DATA_DIR
-        self.processed_videos_file = PROCESSED_VIDEOS_FILE
+        # 每个订阅一个频道，去重和定时推送记录互不影响；空字符串为单订阅部署时的默认频道
+        self.channel = channel
+        self.processed_videos_file = self._channel_file(PROCESSED_VIDEOS_FILE)
+        self.daily_push_log_file = self._channel_file(DAILY_PUSH_LOG_FILE)
         self._ensure_data_dir()
+        self.store = self._create_store(backend)
+    
+    def _channel_file(self, path: str) -> str:
+        """文本后端按频道使用独立的文件（processed_videos_<channel>.txt）"""
+        if not self.channel:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}_{self.channel}{ext}"
     
     def _ensure_data_dir(self):
         """确保数据目录存在"""
@@ -24,13 +40,23 @@ class DataManager:
         except Exception as e:
             logger.error(f"Error creating data directory: {e}")
     
+    def _create_store(self, backend: str):
+        """创建状态存储后端，SQLite不可用时回退到文本文件"""
+        if backend == 'sqlite':
+            try:
+                store = SQLiteStateStore(STATE_DB_FILE, self.channel)
+                store.migrate_from_files(self.processed_videos_file, self.daily_push_log_file, VIDEO_CACHE_FILE)
+                return store
+            except Exception as e:
+                logger.error(f"Error opening SQLite state store, falling back to files: {e}")
+        elif backend != 'file':
+            logger.warning(f"Unknown state backend '{backend}', using files")
+        return FileStateStore(self.processed_videos_file, self.daily_push_log_file)
+    
     def load_processed_videos(self) -> Set[str]:
         """加载已处理的视频ID列表"""
         try:
-            if os.path.exists(self.processed_videos_file):
-                with open(self.processed_videos_file, 'r', encoding='utf-8') as f:
-                    return set(line.strip() for line in f if line.strip())
-            return set()
+            return set(self.store.processed_ids())
         except Exception as e:
             logger.error(f"Error loading processed videos: {e}")
             return set()
@@ -38,51 +64,49 @@ class DataManager:
     def save_processed_video(self, video_id: str):
         """保存已处理的视频ID"""
         try:
-            with open(self.processed_videos_file, 'a', encoding='utf-8') as f:
-                f.write(f"{video_id}\n")
+            self.store.add_videos([Video(video_id)])
             logger.debug(f"Saved processed video: {video_id}")
         except Exception as e:
             logger.error(f"Error saving processed video: {e}")
     
     def is_video_processed(self, video_id: str) -> bool:
         """检查视频是否已处理"""
-        processed_videos = self.load_processed_videos()
-        return video_id in processed_videos
+        try:
+            return self.store.contains(video_id)
+        except Exception as e:
+            logger.error(f"Error checking processed video {video_id}: {e}")
+            return False
     
-    def is_video_published_today(self, video: Dict) -> bool:
-        """检查视频是否为当天发布"""
+    def is_daily_push_done(self, run_date: str) -> bool:
+        """检查指定日期（YYYY-MM-DD）是否已执行过定时推送"""
         try:
-            # 获取视频发布时间戳
-            pubdate = video.get('pubdate') or video.get('created')
-            if not pubdate:
-                logger.warning(f"Video {video.get('bvid')} missing publication date")
-                return False
-            
-            # 转换为datetime对象
-            if isinstance(pubdate, (int, float)):
-                video_date = datetime.fromtimestamp(pubdate)
-            elif isinstance(pubdate, str):
-                # 尝试解析字符串格式的时间
-                try:
-                    video_date = datetime.fromisoformat(pubdate.replace('Z', '+00:00'))
-                except ValueError:
-                    video_date = datetime.fromtimestamp(float(pubdate))
-            else:
-                logger.warning(f"Unknown pubdate format for video {video.get('bvid')}: {pubdate}")
-                return False
-            
-            # 获取当前日期
-            today = datetime.now().date()
-            video_date_only = video_date.date()
-            
-            logger.debug(f"Video {video.get('bvid')} published on {video_date_only}, today is {today}")
-            return video_date_only == today
-            
+            return self.store.is_push_done(run_date)
+        except Exception as e:
+            logger.warning(f"Error checking daily push status: {e}")
+            return False
+    
+    def mark_daily_push_done(self, completed_at: datetime, video_count: int = 0):
+        """记录一次完成的定时推送"""
+        try:
+            self.store.record_push_run(completed_at, video_count)
+            logger.debug(f"Marked daily push as completed: {completed_at.strftime('%Y-%m-%d %H:%M:%S')}")
         except Exception as e:
-            logger.error(f"Error checking video date for {video.get('bvid')}: {e}")
+            logger.error(f"Error marking daily push as done: {e}")
+    
+    def _today_bounds(self) -> Tuple[int, int]:
+        """今天（中国时区）的 [开始, 结束) Unix时间戳"""
+        china_tz = pytz.timezone(CHINA_TIMEZONE)
+        return day_bounds(datetime.now(china_tz).date(), china_tz)
+    
+    def is_video_published_today(self, video: Video) -> bool:
+        """检查视频是否为当天（中国时区）发布"""
+        if not video.pubdate:
+            logger.warning(f"Video {video.bvid} missing publication date")
             return False
+        start, end = self._today_bounds()
+        return start <= video.pubdate < end
     
-    def get_new_videos(self, all_videos: List[Dict], first_run: bool = False) -> List[Dict]:
+    def get_new_videos(self, all_videos: List[Video], first_run: bool = False) -> List[Video]:
         """获取需要处理的新视频（基于时间和处理状态）
         
         新视频定义：
@@ -93,14 +117,10 @@ class DataManager:
             all_videos: 所有视频列表
             first_run: 是否为首次运行（保留用于兼容性，但逻辑已改变）
         """
-        processed_videos = self.load_processed_videos()
         new_videos = []
-        today_videos = []
         
-        # 首先筛选出当天发布的视频
-        for video in all_videos:
-            if self.is_video_published_today(video):
-                today_videos.append(video)
+        # 首先筛选出当天发布的视频（今天的边界只计算一次，批量按整数比较）
+        today_videos = select_in_window(all_videos, *self._today_bounds())
         
         logger.info(f"Found {len(today_videos)} videos published today")
         
@@ -111,37 +131,46 @@ class DataManager:
         
         # 从当天视频中筛选出未处理的
         for video in today_videos:
-            video_id = video.get('bvid')
-            if video_id and video_id not in processed_videos:
+            video_id = video.bvid
+            if video_id and not self.is_video_processed(video_id):
                 new_videos.append(video)
-                logger.info(f"Found new video published today: {video_id} - {video.get('title', 'No title')}")
+                logger.info(f"Found new video published today: {video_id} - {video.title or 'No title'}")
             else:
                 logger.debug(f"Video {video_id} already processed today")
         
         logger.info(f"Total new videos to process: {len(new_videos)}")
         return new_videos
     
-    def mark_videos_as_processed(self, videos: List[Dict]):
+    def mark_videos_as_processed(self, videos: List[Video]):
         """批量标记视频为已处理"""
-        for video in videos:
-            video_id = video.get('bvid')
-            if video_id:
-                self.save_processed_video(video_id)
+        try:
+            self.store.add_videos(videos)
+            logger.debug(f"Saved {len(videos)} processed videos")
+        except Exception as e:
+            logger.error(f"Error saving processed videos: {e}")
+    
+    def get_recent_pubdates(self, limit: int = 60) -> List[int]:
+        """最近处理过的视频的发布时间，用于学习UP主的上传时段"""
+        try:
+            return self.store.recent_pubdates(limit)
+        except Exception as e:
+            logger.error(f"Error loading recent publication dates: {e}")
+            return []
     
     def get_stats(self) -> Dict:
         """获取统计信息"""
         try:
-            processed_videos = self.load_processed_videos()
-            
             stats = {
-                'total_processed': len(processed_videos),
+                'total_processed': self.store.count(),
+                'total_push_runs': self.store.push_run_count(),
+                'backend': self.store.backend,
                 'data_dir': self.data_dir,
                 'last_updated': datetime.now().isoformat()
             }
             
-            # 如果文件存在，获取最后修改时间
-            if os.path.exists(self.processed_videos_file):
-                mtime = os.path.getmtime(self.processed_videos_file)
+            # 获取最后一次写入时间
+            mtime = self.store.last_modified()
+            if mtime:
                 stats['file_last_modified'] = datetime.fromtimestamp(mtime).isoformat()
             
             return stats
@@ -153,22 +182,16 @@ class DataManager:
     def cleanup_old_records(self, keep_last_n: int = 1000):
         """清理旧记录，只保留最近的N条记录"""
         try:
-            processed_videos = self.load_processed_videos()
+            total = self.store.count()
             
-            if len(processed_videos) <= keep_last_n:
-                logger.info(f"No cleanup needed. Total records: {len(processed_videos)}")
+            if total <= keep_last_n:
+                logger.info(f"No cleanup needed. Total records: {total}")
                 return
             
-            # 转换为列表并保留最后的N条记录
-            video_list = list(processed_videos)
-            recent_videos = video_list[-keep_last_n:]
-            
-            # 重写文件
-            with open(self.processed_videos_file, 'w', encoding='utf-8') as f:
-                for video_id in recent_videos:
-                    f.write(f"{video_id}\n")
+            # 按写入顺序保留最后的N条记录
+            removed = self.store.keep_last(keep_last_n)
             
-            logger.info(f"Cleaned up records. Kept {len(recent_videos)} out of {len(processed_videos)}")
+            logger.info(f"Cleaned up records. Kept {total - removed} out of {total}")
             
         except Exception as e:
             logger.error(f"Error cleaning up old records: {e}")
@@ -180,13 +203,12 @@ class DataManager:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 export_file = os.path.join(self.data_dir, f"export_{timestamp}.json")
             
-            processed_videos = self.load_processed_videos()
             stats = self.get_stats()
             
             export_data = {
                 'export_time': datetime.now().isoformat(),
                 'stats': stats,
-                'processed_videos': list(processed_videos)
+                'processed_videos': self.store.processed_ids()
             }
             
             with open(export_file, 'w', encoding='utf-8') as f:
@@ -202,10 +224,7 @@ class DataManager:
     def reset_data(self):
         """重置所有数据（谨慎使用）"""
         try:
-            if os.path.exists(self.processed_videos_file):
-                os.remove(self.processed_videos_file)
-                logger.warning("All processed video records have been reset")
-            else:
-                logger.info("No data file to reset")
+            self.store.reset()
+            logger.warning("All processed video records have been reset")
         except Exception as e:
             logger.error(f"Error resetting data: {e}")
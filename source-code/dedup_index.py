@@ -0,0 +1,150 @@
+import os
+import mmap
+import struct
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional, Set
+from bvid_codec import try_bv_to_av
+
+logger = logging.getLogger(__name__)
+
+class AvidIndex:
+    """已处理视频的紧凑去重索引
+    
+    视频以64位AV号保存在有序的 array('q') 中，磁盘镜像通过mmap直接映射，
+    启动时无需逐行解析文本。无法解码为AV号的ID（例如测试数据）单独保存。
+    
+    镜像格式（小端）::
+        
+        magic(4) | count(q) | extra_bytes(q) | log_offset(q) | log_inode(q) | log_lines(q)
+        count 个 int64（升序）| extra_bytes 字节的换行分隔ID
+    """
+    
+    MAGIC = b'AVX1'
+    HEADER = struct.Struct('<4s4xqqqqq')
+    # 新增记录超过该数量时合并进有序数组
+    MERGE_THRESHOLD = 4096
+    
+    def __init__(self):
+        self._base = memoryview(array('q'))
+        self._mmap: Optional[mmap.mmap] = None
+        self._pending: Set[int] = set()
+        self._extra: Set[str] = set()
+        # 镜像对应的追加日志位置，启动时只需回放其后的部分
+        self.log_offset = 0
+        self.log_inode = 0
+        self.log_lines = 0
+    
+    def __len__(self) -> int:
+        return len(self._base) + len(self._pending) + len(self._extra)
+    
+    def __contains__(self, video_id) -> bool:
+        if isinstance(video_id, int):
+            return self._contains_aid(video_id)
+        aid = try_bv_to_av(video_id)
+        if aid is None:
+            return video_id in self._extra
+        return self._contains_aid(aid)
+    
+    def _contains_aid(self, aid: int) -> bool:
+        if aid in self._pending:
+            return True
+        base = self._base
+        index = bisect_left(base, aid)
+        return index < len(base) and base[index] == aid
+    
+    def add(self, video_id: str) -> bool:
+        """添加视频，返回是否为新记录"""
+        aid = try_bv_to_av(video_id)
+        if aid is None:
+            if video_id in self._extra:
+                return False
+            self._extra.add(video_id)
+            return True
+        if self._contains_aid(aid):
+            return False
+        self._pending.add(aid)
+        if len(self._pending) >= self.MERGE_THRESHOLD:
+            self._merge()
+        return True
+    
+    def update(self, video_ids: Iterable[str]):
+        for video_id in video_ids:
+            self.add(video_id)
+    
+    def _merge(self):
+        """将新增记录合并进有序数组（脱离mmap，转为内存数组）"""
+        merged = array('q', self._base)
+        merged.extend(self._pending)
+        merged = array('q', sorted(merged))
+        self._release()
+        self._base = memoryview(merged)
+        self._pending.clear()
+    
+    def clear(self):
+        self._release()
+        self._base = memoryview(array('q'))
+        self._pending.clear()
+        self._extra.clear()
+        self.log_offset = 0
+        self.log_inode = 0
+        self.log_lines = 0
+    
+    def _release(self):
+        base = self._base
+        self._base = memoryview(array('q'))
+        base.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+    
+    def nbytes(self) -> int:
+        """索引主体占用的字节数（不含Python对象开销）"""
+        return self._base.nbytes + len(self._pending) * 8 + sum(len(v) for v in self._extra)
+    
+    def save(self, image_file: str):
+        """原子地写出磁盘镜像（临时文件 + rename）"""
+        if self._pending:
+            self._merge()
+        extra = ''.join(f"{video_id}\n" for video_id in sorted(self._extra)).encode('utf-8')
+        tmp_file = f"{image_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, len(self._base), len(extra),
+                                     self.log_offset, self.log_inode, self.log_lines))
+            f.write(self._base.tobytes())
+            f.write(extra)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, image_file)
+    
+    @classmethod
+    def load(cls, image_file: str) -> Optional['AvidIndex']:
+        """通过一次mmap加载磁盘镜像，镜像不存在或损坏时返回None"""
+        if not os.path.exists(image_file) or os.path.getsize(image_file) < cls.HEADER.size:
+            return None
+        index = cls()
+        with open(image_file, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, count, extra_len, log_offset, log_inode, log_lines = cls.HEADER.unpack_from(mapped)
+            start = cls.HEADER.size
+            end = start + count * 8
+            if magic != cls.MAGIC or end + extra_len != len(mapped):
+                raise ValueError("corrupted index image")
+            index._base = memoryview(mapped)[start:end].cast('q')
+            index._mmap = mapped
+            if extra_len:
+                index._extra = set(mapped[end:end + extra_len].decode('utf-8').split())
+            index.log_offset = log_offset
+            index.log_inode = log_inode
+            index.log_lines = log_lines
+            return index
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable dedup index {image_file}: {e}")
+            index._release()
+            mapped.close()
+            return None
+    
+    def close(self):
+        self._release()
@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class DetailCache:
+    """视频详情缓存：按bvid索引，带TTL、LRU容量上限和可选的磁盘持久化"""
+    
+    def __init__(self, ttl: int, max_size: int, cache_file: Optional[str] = None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.cache_file = cache_file or None
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+    
+    def _load(self):
+        """从磁盘加载未过期的缓存条目"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            now = time.time()
+            for bvid, stored_at, detail in entries:
+                if now - stored_at < self.ttl:
+                    self._entries[bvid] = (stored_at, detail)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            logger.debug(f"Loaded {len(self._entries)} video details from cache")
+        except Exception as e:
+            logger.warning(f"Failed to load detail cache: {e}")
+    
+    def _save(self):
+        """原子地写出缓存（临时文件 + rename）"""
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            entries = [[bvid, stored_at, detail] for bvid, (stored_at, detail) in self._entries.items()]
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"Failed to save detail cache: {e}")
+    
+    def get(self, bvid: str) -> Optional[Dict]:
+        """获取未过期的详情，命中时刷新LRU顺序"""
+        with self._lock:
+            entry = self._entries.get(bvid)
+            if entry is not None:
+                stored_at, detail = entry
+                if time.time() - stored_at < self.ttl:
+                    self._entries.move_to_end(bvid)
+                    self.hits += 1
+                    return detail
+                del self._entries[bvid]
+            self.misses += 1
+            return None
+    
+    def put(self, bvid: str, detail: Dict):
+        """写入详情，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._entries[bvid] = (time.time(), detail)
+            self._entries.move_to_end(bvid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._save()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+    
+    def get_stats(self) -> Dict:
+        """命中统计"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+        }
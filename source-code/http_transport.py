@@ -0,0 +1,279 @@
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+
+from config import (HEADERS, HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+                    HTTP_HOST_TIMEOUTS)
+
+logger = logging.getLogger(__name__)
+
+# 所有会话共用的请求头：gzip/deflate（安装了 brotli 时还包括 br）由 urllib3 按本机可解码的格式协商
+BASE_HEADERS = {
+    **HEADERS,
+    'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+    'Connection': 'keep-alive'
+}
+
+# 只对幂等请求在连接失败和5xx时重试，webhook 的 POST 不会被重复发送
+RETRY_STATUS = (500, 502, 503, 504)
+RETRY_METHODS = frozenset(['GET', 'HEAD'])
+RETRY_BACKOFF = 0.5  # 第n次重试前等待 RETRY_BACKOFF * 2**(n-1) 秒
+
+def host_of(url: str) -> str:
+    """返回 URL 的 scheme://host[:port]，作为连接池和统计的键"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+class HttpTransport:
+    """所有客户端共享的HTTP传输层：每个主机一个保持连接的会话
+    
+    每个会话挂载独立的连接池和重试策略，并带有 BASE_HEADERS；
+    调用方只需传入预先构建好的差异请求头。未显式传入 timeout 时按主机取 (connect, read) 超时，
+    可为主机绑定限流器（如B站的令牌桶），每个请求的耗时、状态和传输字节数按主机统计。
+    绑定了限流器的主机不在连接池里重试，而由 request() 重试，每次尝试都获取一个令牌，
+    因此令牌数就是实际发往该主机的请求数。
+    """
+    
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, retries: int = HTTP_RETRIES,
+                 timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+                 host_timeouts: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.timeout = timeout
+        self.host_timeouts = dict(HTTP_HOST_TIMEOUTS if host_timeouts is None else host_timeouts)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._limiters: Dict[str, object] = {}
+        self._stats: Dict[str, Dict] = {}
+    
+    def _create_session(self, retries: int) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(BASE_HEADERS)
+        retry = Retry(
+            total=retries,
+            read=0,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=RETRY_METHODS,
+            backoff_factor=RETRY_BACKOFF,
+            raise_on_status=False
+        )
+        # 每个会话只连接一个主机，pool_maxsize 决定可复用的并发连接数
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def session_for(self, url: str) -> requests.Session:
+        """获取（必要时创建）URL 所在主机的会话"""
+        host = host_of(url)
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._create_session(0 if host in self._limiters else self.retries)
+                    self._sessions[host] = session
+                    logger.debug(f"Created HTTP session for {host}")
+        return session
+    
+    def set_rate_limiter(self, url: str, limiter):
+        """为 URL 所在主机绑定限流器（需提供 acquire()），每次尝试发出前获取一个令牌
+        
+        每个主机只绑定一次：已有限流器时保留原来的，返回实际生效的限流器，
+        因此多个客户端共用同一个传输层时也共用同一个限流器，连接池不会被重建。
+        """
+        host = host_of(url)
+        with self._lock:
+            if host in self._limiters:
+                return self._limiters[host]
+            self._limiters[host] = limiter
+            # 已有的会话带着连接池重试：从池中移除（不关闭，其他线程可能正在使用），下一次请求创建不重试的会话
+            self._sessions.pop(host, None)
+        return limiter
+    
+    def timeout_for(self, url: str) -> Tuple[float, float]:
+        """按主机名取 (connect, read) 超时，未配置时使用默认值"""
+        return self.host_timeouts.get(urlsplit(url).hostname or '', self.timeout)
+    
+    def limiter_for(self, url: str):
+        return self._limiters.get(host_of(url))
+    
+    def attempts_for(self, method: str, url: str) -> int:
+        """request() 最多尝试的次数：只有限流主机的幂等请求由这里重试，其余由连接池重试"""
+        if method.upper() in RETRY_METHODS and self.limiter_for(url) is not None:
+            return 1 + self.retries
+        return 1
+    
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """每次尝试前从主机的限流器获取令牌（可能阻塞），再发送请求"""
+        limiter = self.limiter_for(url)
+        attempts = self.attempts_for(method, url)
+        for attempt in range(1, attempts + 1):
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                response = self.send(method, url, **kwargs)
+            except requests.ConnectionError:
+                if attempt == attempts:
+                    raise
+            else:
+                if attempt == attempts or response.status_code not in RETRY_STATUS:
+                    return response
+                response.close()
+            self.record_retry(url)
+            time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+    
+    def send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """发送请求并记录统计，不经过限流器（由调用方负责获取令牌）"""
+        host = host_of(url)
+        session = self.session_for(url)
+        kwargs.setdefault('timeout', self.timeout_for(url))
+        
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            self._record(host, time.perf_counter() - start, None)
+            raise
+        self._record(host, time.perf_counter() - start, response)
+        return response
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+    
+    def _record(self, host: str, elapsed: float, response: Optional[requests.Response]):
+        """记录一次请求：耗时、错误、重试次数，以及压缩前后的字节数"""
+        wire_bytes = body_bytes = retries = 0
+        if response is not None:
+            body_bytes = len(response.content)
+            raw = response.raw
+            try:
+                # urllib3 的 tell() 是从连接上读取的（压缩后的）字节数
+                wire_bytes = raw.tell()
+            except Exception:
+                wire_bytes = body_bytes
+            history = getattr(getattr(raw, 'retries', None), 'history', None)
+            retries = len(history) if history else 0
+        
+        with self._lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = {'requests': 0, 'errors': 0, 'retries': 0, 'total_time': 0.0, 'max_time': 0.0,
+                         'wire_bytes': 0, 'body_bytes': 0}
+                self._stats[host] = stats
+            stats['requests'] += 1
+            if response is None or response.status_code >= 400:
+                stats['errors'] += 1
+            stats['retries'] += retries
+            stats['total_time'] += elapsed
+            stats['max_time'] = max(stats['max_time'], elapsed)
+            stats['wire_bytes'] += wire_bytes
+            stats['body_bytes'] += body_bytes
+    
+    def record_retry(self, url: str):
+        """记录一次由 request() 发起的重试（连接池内的重试由 _record 从响应中读取）"""
+        host = host_of(url)
+        with self._lock:
+            if host in self._stats:
+                self._stats[host]['retries'] += 1
+    
+    def get_stats(self) -> Dict:
+        """按主机返回请求统计"""
+        with self._lock:
+            result = {}
+            for host, stats in self._stats.items():
+                result[host] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'retries': stats['retries'],
+                    'avg_ms': round(stats['total_time'] / stats['requests'] * 1000, 1),
+                    'max_ms': round(stats['max_time'] * 1000, 1),
+                    'wire_bytes': stats['wire_bytes'],
+                    'body_bytes': stats['body_bytes']
+                }
+            return result
+    
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+class AsyncHttpTransport:
+    """HttpTransport 的 asyncio 封装
+    
+    限流在事件循环中等待（TokenBucket.reserve + asyncio.sleep），不占用线程；
+    每个主机的并发请求数不超过连接池大小，阻塞的收发交给有界线程池，
+    因此慢主机（如企业微信webhook）不会拖住其他主机的请求。
+    """
+    
+    def __init__(self, transport: HttpTransport, max_workers: int = 8):
+        self.transport = transport
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='http')
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+    
+    def _semaphore_for(self, url: str) -> asyncio.Semaphore:
+        host = host_of(url)
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.transport.pool_size)
+            self._semaphores[host] = semaphore
+        return semaphore
+    
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """与 HttpTransport.request 相同的重试规则，每次尝试前在事件循环中等待令牌"""
+        limiter = self.transport.limiter_for(url)
+        attempts = self.transport.attempts_for(method, url)
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, attempts + 1):
+            if limiter is not None:
+                wait = limiter.reserve()
+                if wait > 0:
+                    logger.debug(f"Rate limiting: waiting {wait:.2f} seconds")
+                    await asyncio.sleep(wait)
+            try:
+                async with self._semaphore_for(url):
+                    response = await loop.run_in_executor(self._executor,
+                                                          partial(self.transport.send, method, url, **kwargs))
+            except requests.ConnectionError:
+                if attempt == attempts:
+                    raise
+            else:
+                if attempt == attempts or response.status_code not in RETRY_STATUS:
+                    return response
+                response.close()
+            self.transport.record_retry(url)
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+    
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('GET', url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await self.request('POST', url, **kwargs)
+    
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+def get_transport() -> HttpTransport:
+    """进程内共享的传输层，所有客户端默认使用它以复用连接"""
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_lock:
+            if _shared_transport is None:
+                _shared_transport = HttpTransport()
+    return _shared_transport
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import logging
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class ListCache:
+    """视频列表缓存：按 (来源, UID, 分页参数) 分命名空间存储在一个紧凑的JSON文件中
+    
+    每个条目记录抓取时间和内容哈希，新鲜度由抓取时间判断（不依赖文件mtime）。
+    内容未变化时不重写文件，只刷新内存中的抓取时间；其他进程写入后通过文件状态检测并重新加载。
+    """
+    
+    def __init__(self, cache_file: Optional[str], ttl: int = 300):
+        self.cache_file = cache_file or None
+        self.ttl = ttl
+        self._entries: Dict[str, Dict] = {}
+        self._file_state: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.skipped_writes = 0
+    
+    @staticmethod
+    def make_key(source: str, uid: str, page: int, page_size: int) -> str:
+        return f"{source}:{uid}:{page}:{page_size}"
+    
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.cache_file)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+    
+    def _refresh(self):
+        """文件被其他进程改写过时重新加载"""
+        if not self.cache_file:
+            return
+        file_state = self._stat()
+        if file_state is None or file_state == self._file_state:
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = data.get('entries') if isinstance(data, dict) else None
+            if not isinstance(entries, dict):
+                raise ValueError("unexpected cache format")
+            # 合并：以抓取时间较新的为准（本进程内存中的刷新不会写回文件）
+            for key, entry in entries.items():
+                current = self._entries.get(key)
+                if current is None or entry.get('fetched_at', 0) >= current.get('fetched_at', 0):
+                    self._entries[key] = entry
+            self.reads += 1
+        except Exception as e:
+            logger.warning(f"Failed to load list cache: {e}")
+        self._file_state = file_state
+    
+    def _save(self):
+        """原子地写出缓存（临时文件 + rename）"""
+        if not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'entries': self._entries}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.cache_file)
+            self._file_state = self._stat()
+            self.writes += 1
+        except Exception as e:
+            logger.warning(f"Failed to save list cache: {e}")
+    
+    def get(self, key: str, allow_stale: bool = False) -> Optional[List[Dict]]:
+        """获取缓存的视频列表；allow_stale 为真时忽略过期（接口全部失败时兜底）"""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if not allow_stale and time.time() - entry.get('fetched_at', 0) > self.ttl:
+                logger.debug(f"List cache expired for {key}")
+                return None
+            return entry.get('videos')
+    
+    def put(self, key: str, videos: List[Dict]):
+        """写入视频列表，内容哈希未变化时跳过磁盘写入"""
+        payload = json.dumps(videos, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        digest = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(key)
+            if entry is not None and entry.get('hash') == digest:
+                entry['fetched_at'] = time.time()
+                self.skipped_writes += 1
+                return
+            self._entries[key] = {'fetched_at': time.time(), 'hash': digest, 'videos': videos}
+            self._save()
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._save()
+    
+    def get_stats(self) -> Dict:
+        return {
+            'entries': len(self._entries),
+            'ttl': self.ttl,
+            'reads': self.reads,
+            'writes': self.writes,
+            'skipped_writes': self.skipped_writes
+        }
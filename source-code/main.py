@@ -7,9 +7,12 @@ AI News Notification System
 import os
 import sys
 import logging
+import asyncio
 import argparse
 from datetime import datetime
-from scheduler import AINewsScheduler
+from scheduler import AINewsScheduler, MultiTenantScheduler
+from subscriptions import load_subscriptions
+from async_runtime import AsyncAINewsScheduler
 
 def setup_logging(log_level: str = 'INFO'):
     """设置日志配置"""
@@ -41,7 +44,12 @@ def validate_environment(skip_wechat=False):
     logger = logging.getLogger(__name__)
     
     # 检查必要的环境变量
-    from config import WECHAT_WEBHOOK_URL, BILIBILI_UP_UID
+    from config import WECHAT_WEBHOOK_URL, BILIBILI_UP_UID, SUBSCRIPTIONS_FILE
+    
+    # 使用订阅配置文件时，webhook 和来源在文件中按订阅配置
+    if os.path.exists(SUBSCRIPTIONS_FILE):
+        logger.info(f"Using subscriptions from {SUBSCRIPTIONS_FILE}")
+        return True
     
     if not skip_wechat and (not WECHAT_WEBHOOK_URL or 'YOUR_BOT_KEY' in WECHAT_WEBHOOK_URL):
         logger.warning("WeChat webhook URL not configured. Please set WECHAT_WEBHOOK_URL in .env file")
@@ -58,7 +66,7 @@ def validate_environment(skip_wechat=False):
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='AI News Notification System')
-    parser.add_argument('--mode', choices=['run', 'test', 'check', 'status', 'force', 'init', 'test-daily'], 
+    parser.add_argument('--mode', choices=['run', 'run-async', 'test', 'check', 'status', 'force', 'init', 'test-daily'], 
                        default='run', help='运行模式')
     parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], 
                        default='INFO', help='日志级别')
@@ -81,14 +89,27 @@ def main():
             logger.error("Environment validation failed. Exiting.")
             sys.exit(1)
         
-        # 创建调度器
-        scheduler = AINewsScheduler()
+        # 创建调度器：多个订阅时共享来源拉取；run-async 只支持单个订阅
+        subscriptions = load_subscriptions()
+        if len(subscriptions) > 1:
+            if args.mode == 'run-async':
+                logger.error(f"--mode run-async supports a single subscription, but {len(subscriptions)} are "
+                             f"configured. Use --mode run for multiple subscriptions.")
+                sys.exit(1)
+            scheduler = MultiTenantScheduler(subscriptions)
+        else:
+            scheduler = AINewsScheduler(subscriptions[0])
         
         if args.mode == 'run':
             # 正常运行模式
             logger.info("Starting in normal run mode...")
             scheduler.start_scheduler()
             
+        elif args.mode == 'run-async':
+            # asyncio 运行模式：检查、详情获取和通知在同一个事件循环中并发
+            logger.info("Starting in asyncio run mode...")
+            asyncio.run(AsyncAINewsScheduler(scheduler).run())
+            
         elif args.mode == 'test':
             # 测试模式
             logger.info("Running in test mode...")
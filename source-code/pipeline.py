@@ -0,0 +1,174 @@
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_DONE = object()
+
+class _Failed:
+    """某个阶段处理失败的条目，继续向下游传递以保证有序阶段不会等待它"""
+    
+    __slots__ = ('stage', 'error')
+    
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+
+class Stage:
+    """流水线中的一个阶段：workers 个线程从有界输入队列取条目，调用 fn 后交给下一阶段
+    
+    ordered=True 时按输入顺序执行 fn（例如发送通知），此时只使用一个线程，
+    先到达的后续条目暂存在重排缓冲中，缓冲大小受上游队列容量和线程数限制。
+    """
+    
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1, queue_size: int = 4,
+                 ordered: bool = False):
+        self.name = name
+        self.fn = fn
+        self.workers = 1 if ordered else max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.ordered = ordered
+        # 累计统计（跨多次 run）
+        self.processed = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.active_time = 0.0
+        self.max_depth = 0
+        self._queue: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+    
+    def _record(self, elapsed: float, ok: bool):
+        with self._lock:
+            self.busy_time += elapsed
+            if ok:
+                self.processed += 1
+            else:
+                self.errors += 1
+    
+    def get_stats(self) -> Dict:
+        handled = self.processed + self.errors
+        return {
+            'workers': self.workers,
+            'processed': self.processed,
+            'errors': self.errors,
+            'avg_ms': round(self.busy_time / handled * 1000, 1) if handled else 0.0,
+            # 阶段运行期间每秒完成的条目数
+            'throughput': round(handled / self.active_time, 2) if self.active_time > 0 else 0.0,
+            # 各线程忙碌时间占比，接近1说明该阶段是瓶颈
+            'utilization': round(self.busy_time / (self.active_time * self.workers), 2) if self.active_time > 0 else 0.0,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'queue_max_depth': self.max_depth,
+            'queue_size': self.queue_size
+        }
+
+class Pipeline:
+    """由有界队列连接的多阶段流水线
+    
+    每个阶段有自己的线程数，队列满时上游阻塞（背压），同时在途的条目数不超过各队列容量与线程数之和。
+    某条目在任一阶段抛出异常时记录日志，结果为 None，其余条目继续处理。
+    """
+    
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.stages = stages
+        self.runs = 0
+        self._run_lock = threading.Lock()
+    
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """处理 items，返回与输入顺序一致的最终结果列表（失败的条目为 None）"""
+        with self._run_lock:
+            self.runs += 1
+            return self._run(list(items))
+    
+    def _run(self, items: List[Any]) -> List[Any]:
+        results: List[Any] = [None] * len(items)
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        for stage, stage_queue in zip(self.stages, queues):
+            stage._queue = stage_queue
+        
+        threads = []
+        for index, stage in enumerate(self.stages):
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+            remaining = [stage.workers]
+            order = {'next': 0, 'pending': {}}
+            started = time.perf_counter()
+            for i in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[index], next_queue, items, results, remaining, order, started),
+                    name=f"pipeline-{stage.name}-{i}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+        
+        # 输入队列有界：流水线处理不过来时这里会阻塞
+        first = self.stages[0]
+        for seq, item in enumerate(items):
+            queues[0].put((seq, item))
+            first.max_depth = max(first.max_depth, queues[0].qsize())
+        for _ in range(first.workers):
+            queues[0].put(_DONE)
+        
+        for thread in threads:
+            thread.join()
+        return results
+    
+    def _worker(self, stage: Stage, in_queue: queue.Queue, next_queue: Optional[queue.Queue], items: List[Any],
+                results: List[Any], remaining: List[int], order: Dict, started: float):
+        next_stage = self.stages[self.stages.index(stage) + 1] if next_queue is not None else None
+        while True:
+            entry = in_queue.get()
+            if entry is _DONE:
+                break
+            
+            if stage.ordered:
+                # 按序号放入重排缓冲，依次处理已连续到达的条目
+                order['pending'][entry[0]] = entry[1]
+                while order['next'] in order['pending']:
+                    seq = order['next']
+                    value = order['pending'].pop(seq)
+                    order['next'] += 1
+                    self._handle(stage, seq, value, next_queue, next_stage, items, results)
+            else:
+                self._handle(stage, entry[0], entry[1], next_queue, next_stage, items, results)
+        
+        with stage._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+            if last:
+                stage.active_time += time.perf_counter() - started
+        if last and next_queue is not None:
+            # 本阶段最后一个线程退出时通知下一阶段的所有线程
+            for _ in range(next_stage.workers):
+                next_queue.put(_DONE)
+    
+    def _handle(self, stage: Stage, seq: int, value: Any, next_queue: Optional[queue.Queue],
+                next_stage: Optional[Stage], items: List[Any], results: List[Any]):
+        if not isinstance(value, _Failed):
+            start = time.perf_counter()
+            try:
+                value = stage.fn(value)
+                stage._record(time.perf_counter() - start, True)
+            except Exception as e:
+                stage._record(time.perf_counter() - start, False)
+                logger.error(f"Error processing {items[seq]!r} in {stage.name} stage: {e}")
+                value = _Failed(stage.name, e)
+        
+        if next_queue is None:
+            results[seq] = None if isinstance(value, _Failed) else value
+            return
+        next_queue.put((seq, value))
+        next_stage.max_depth = max(next_stage.max_depth, next_queue.qsize())
+    
+    def get_stats(self) -> Dict:
+        """各阶段的吞吐、耗时和队列深度"""
+        return {
+            'runs': self.runs,
+            'stages': {stage.name: stage.get_stats() for stage in self.stages}
+        }
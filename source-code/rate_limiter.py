@@ -0,0 +1,102 @@
+import os
+import time
+import struct
+import logging
+import threading
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows：退化为仅进程内限流
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 状态文件内容：当前令牌数、上次更新时间
+_STATE = struct.Struct('<dd')
+
+class TokenBucket:
+    """令牌桶限流器：按 rate（每秒令牌数）补充，最多积累 burst 个令牌
+    
+    配置 state_file 时，桶状态保存在文件中并通过 flock 加锁，
+    同一台机器上的多个进程（如定时 check 与常驻 run）共享同一个请求预算。
+    令牌不足时先记账（令牌数可为负）再在锁外等待，请求按到达顺序依次放行。
+    """
+    
+    def __init__(self, rate: float, burst: int = 1, state_file: Optional[str] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.state_file = state_file or None
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated_at = time.time()
+        self._fd = None
+        self.acquired = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        if self.state_file and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.state_file) or '.', exist_ok=True)
+                self._fd = os.open(self.state_file, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError as e:
+                logger.warning(f"Rate limiter state file unavailable, limiting per process only: {e}")
+    
+    def _reserve(self, now: float) -> float:
+        """补充令牌并预订一个，返回需要等待的秒数"""
+        state = os.pread(self._fd, _STATE.size, 0) if self._fd is not None else b''
+        if len(state) == _STATE.size:
+            tokens, updated_at = _STATE.unpack(state)
+        else:
+            tokens, updated_at = self._tokens, self._updated_at
+        
+        tokens = min(float(self.burst), tokens + max(0.0, now - updated_at) * self.rate)
+        tokens -= 1
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        
+        self._tokens, self._updated_at = tokens, now
+        if self._fd is not None:
+            os.pwrite(self._fd, _STATE.pack(tokens, now), 0)
+        return wait
+    
+    def reserve(self) -> float:
+        """预订一个令牌但不等待，返回调用方需要等待的秒数（供 asyncio 在事件循环中等待）"""
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                try:
+                    wait = self._reserve(time.time())
+                finally:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                wait = self._reserve(time.time())
+            self.acquired += 1
+            if wait > 0:
+                self.waits += 1
+                self.total_wait += wait
+        return wait
+    
+    def acquire(self) -> float:
+        """获取一个令牌，必要时阻塞等待，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            logger.debug(f"Rate limiting: waiting {wait:.2f} seconds")
+            time.sleep(wait)
+        return wait
+    
+    def get_stats(self) -> Dict:
+        """限流统计"""
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'shared': self._fd is not None,
+            'acquired': self.acquired,
+            'waits': self.waits,
+            'total_wait': round(self.total_wait, 3)
+        }
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,166 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # 可选依赖，未安装时使用标准库
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = 'orjson' if orjson is not None else 'json'
+
+class DecodeError(ValueError):
+    """响应结构与接口契约不符"""
+
+def loads(content) -> Any:
+    """解析JSON（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+class Schema:
+    """接口契约（api-contracts/bilibili/*.yml）中某个对象的子集：只声明代码实际用到的字段
+    
+    fields 的值可以是类型（或类型元组）、嵌套的 Schema，或 [Schema] 表示对象数组。
+    只有代码离不开的字段严格校验：required（契约中的必填项，必须存在）和 strict（可以缺失）的类型不符时抛出 DecodeError；
+    其余字段尽力提取，类型与契约不符时只丢弃该字段（按字段记一次警告），不会因为接口变动拒绝整页。
+    未声明的字段（owner、rights、honor_reply 等）不会被复制。
+    """
+    
+    def __init__(self, contract: str, fields: Dict[str, Any], required: Tuple[str, ...] = (),
+                 strict: Tuple[str, ...] = ()):
+        self.contract = contract
+        self.fields = fields
+        self.required = required
+        self.strict = frozenset(required) | frozenset(strict)
+        self.drifted: Dict[str, int] = {}
+        # 预先按字段种类拆分，解码时标量字段只做一次精确类型检查（同时排除了 bool）
+        self._scalars = tuple(
+            (key, frozenset(spec) if isinstance(spec, tuple) else frozenset((spec,)))
+            for key, spec in fields.items() if not isinstance(spec, (Schema, list))
+        )
+        self._objects = tuple((key, spec) for key, spec in fields.items() if isinstance(spec, Schema))
+        self._arrays = tuple((key, spec[0]) for key, spec in fields.items() if isinstance(spec, list))
+    
+    def extract(self, node: Any, path: str = 'data') -> Dict:
+        """按声明提取字段并同时校验类型"""
+        if type(node) is not dict:
+            raise DecodeError(f"{path}: expected object, got {type(node).__name__}")
+        for key in self.required:
+            if key not in node:
+                raise DecodeError(f"{path}.{key}: required field missing")
+        
+        result = {}
+        get = node.get
+        for key, types in self._scalars:
+            value = get(key)
+            if value is not None:
+                if type(value) in types:
+                    result[key] = value
+                else:
+                    self._reject(key, DecodeError(f"{path}.{key}: unexpected type {type(value).__name__}"))
+        for key, schema in self._objects:
+            value = get(key)
+            if value is not None:
+                try:
+                    result[key] = schema.extract(value, f"{path}.{key}")
+                except DecodeError as e:
+                    self._reject(key, e)
+        for key, schema in self._arrays:
+            value = get(key)
+            if value is not None:
+                try:
+                    if type(value) is not list:
+                        raise DecodeError(f"{path}.{key}: expected array, got {type(value).__name__}")
+                    extract = schema.extract
+                    result[key] = [extract(item, f"{path}.{key}[{i}]") for i, item in enumerate(value)]
+                except DecodeError as e:
+                    self._reject(key, e)
+        return result
+    
+    def _reject(self, key: str, error: DecodeError):
+        """严格字段不符时抛出；其余字段丢弃，同一字段只在第一次时记录警告"""
+        if key in self.strict:
+            raise error
+        count = self.drifted.get(key, 0)
+        self.drifted[key] = count + 1
+        if not count:
+            logger.warning(f"{self.contract}: ignoring field that no longer matches the contract: {error}")
+
+class ResponseDecoder:
+    """解析 {code, message, data} 响应，并按契约只提取 data 中用到的字段"""
+    
+    def __init__(self, name: str, data_schema: Schema):
+        self.name = name
+        self.data_schema = data_schema
+    
+    def decode(self, content) -> Tuple[int, str, Optional[Dict]]:
+        """返回 (code, message, data)；code 非0时 data 为 None，结构不符时抛出 DecodeError"""
+        try:
+            document = loads(content)
+        except ValueError as e:
+            raise DecodeError(f"{self.name}: invalid JSON: {e}")
+        if not isinstance(document, dict) or not isinstance(document.get('code'), int):
+            raise DecodeError(f"{self.name}: missing response code")
+        
+        code = document['code']
+        message = str(document.get('message', ''))
+        if code != 0:
+            return code, message, None
+        return code, message, self.data_schema.extract(document.get('data'), f"{self.name}.data")
+
+# arc_search.yml: ArcSearchItem（只有 bvid 严格校验，其余字段缺失时 Video.from_api 使用默认值）
+ARC_SEARCH_ITEM = Schema('arc_search.yml#ArcSearchItem', {
+    'bvid': str,
+    'aid': int,
+    'title': str,
+    'description': str,
+    'created': int,
+    'length': str,
+    'play': (int, str),
+    'pic': str,
+    'author': str,
+    'mid': int,
+    'typeid': int,
+    'comment': int,
+    'review': int
+}, required=('bvid',))
+
+# arc_search.yml: ArcSearchData（主接口与备用接口结构相同）
+ARC_SEARCH = ResponseDecoder('arc_search', Schema('arc_search.yml#ArcSearchData', {
+    'list': Schema('arc_search.yml#ArcSearchData.list', {'vlist': [ARC_SEARCH_ITEM]}, required=('vlist',))
+}, required=('list',)))
+
+# collection.yml: CollectionArchive
+COLLECTION_ARCHIVE = Schema('collection.yml#CollectionArchive', {
+    'aid': int,
+    'bvid': str,
+    'title': str,
+    'desc': str,
+    'pubdate': int,
+    'duration': int,
+    'pic': str,
+    'stat': Schema('collection.yml#CollectionArchive.stat', {'view': int})
+}, required=('aid', 'bvid', 'title', 'pubdate'))
+
+# collection.yml: SeasonArchivesResponse / SeriesArchivesResponse 的 data（archives 不符时不能当作空合集）
+COLLECTION = ResponseDecoder('collection', Schema('collection.yml#SeasonArchivesResponse.data', {
+    'archives': [COLLECTION_ARCHIVE],
+    'page': Schema('collection.yml#SeasonArchivesResponse.data.page', {'total': int})
+}, strict=('archives',)))
+
+# view.yml: VideoDetailData
+VIDEO_DETAIL = ResponseDecoder('view', Schema('view.yml#VideoDetailData', {
+    'aid': int,
+    'bvid': str,
+    'title': str,
+    'desc': str,
+    'pic': str,
+    'tname': str,
+    'pubdate': int,
+    'duration': int,
+    'stat': Schema('view.yml#VideoStats', {'view': int}),
+    'pages': [Schema('view.yml#VideoPage', {'cid': int, 'part': str, 'duration': int})]
+}, required=('bvid', 'title')))
@@ -53,7 +53,7 @@ check_dependencies() {
     local needs_install=false
     
     # 检查主要依赖是否存在
-    if ! python -c "import requests, schedule, dotenv, bs4" &> /dev/null; then
+    if ! python -c "import requests, dotenv, bs4, pytz" &> /dev/null; then
         needs_install=true
     fi
     
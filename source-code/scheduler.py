@@ -1,31 +1,91 @@
-import schedule
 import time
 import logging
 import pytz
-import os
-from datetime import datetime, date
-from typing import Optional
+from datetime import datetime, date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
 from bilibili_monitor import BilibiliMonitor
 from content_summarizer import ContentSummarizer
 from wechat_notifier import WeChatNotifier
 from data_manager import DataManager
-from config import CHECK_INTERVAL, DAILY_PUSH_TIME, CHINA_TIMEZONE, ENABLE_DAILY_PUSH, DAILY_PUSH_LOG_FILE
+from video import Video
+from pipeline import Pipeline, Stage
+from timer_scheduler import TimerScheduler, next_daily_run
+from adaptive_poller import AdaptivePoller
+from snapshot_diff import added_videos
+from time_window import select_in_window
+from sources import BILIBILI, BilibiliSource, SourceRegistry, VideoSource, create_source
+from subscriptions import Subscription, default_subscription
+from config import (CHECK_INTERVAL, CHINA_TIMEZONE, PIPELINE_DETAIL_WORKERS, PIPELINE_SUMMARY_WORKERS, PIPELINE_QUEUE_SIZE,
+                    ADAPTIVE_POLLING, ADAPTIVE_MIN_INTERVAL, ADAPTIVE_DAILY_BUDGET, DAILY_PUSH_PREWARM)
 
 logger = logging.getLogger(__name__)
 
+def prewarm_time(push_time: str, minutes: int = DAILY_PUSH_PREWARM) -> Optional[str]:
+    """每日推送预热的时刻（HH:MM，可跨零点）；minutes 不大于 0 时不预热"""
+    if minutes <= 0:
+        return None
+    return (datetime.strptime(push_time, "%H:%M") - timedelta(minutes=minutes)).strftime("%H:%M")
+
+def polling_description() -> str:
+    """日志中的检查方式"""
+    if ADAPTIVE_POLLING:
+        return (f"adaptive polling ({ADAPTIVE_MIN_INTERVAL:g}-{CHECK_INTERVAL} minute intervals, "
+                f"at most {ADAPTIVE_DAILY_BUDGET} checks per source per day)")
+    return f"{CHECK_INTERVAL} minute intervals"
+
+def check_interval_text() -> str:
+    """启动通知中的检查方式"""
+    if ADAPTIVE_POLLING:
+        return (f"实时检查: 自适应（上传时段内每{ADAPTIVE_MIN_INTERVAL:g}分钟，其余最长{CHECK_INTERVAL}分钟，"
+                f"每天最多{ADAPTIVE_DAILY_BUDGET}次）")
+    return f"实时检查间隔: {CHECK_INTERVAL}分钟"
+
 class AINewsScheduler:
-    """AI早报调度器"""
+    """AI早报调度器（一个订阅：一个来源推送到一个webhook，使用独立的去重状态）"""
     
-    def __init__(self):
-        self.bilibili_monitor = BilibiliMonitor()
+    def __init__(self, subscription: Optional[Subscription] = None, monitor: Optional[BilibiliMonitor] = None,
+                 source: Optional[VideoSource] = None):
+        self.subscription = subscription or default_subscription()
+        self.source = source or create_source(self.subscription.source, monitor=monitor)
+        # B站专用的模式（force、init、run-async 等）直接使用监控器
+        if isinstance(self.source, BilibiliSource):
+            self.bilibili_monitor = self.source.monitor
+        else:
+            self.bilibili_monitor = monitor or BilibiliMonitor()
         self.content_summarizer = ContentSummarizer()
-        self.wechat_notifier = WeChatNotifier()
-        self.data_manager = DataManager()
+        self.wechat_notifier = WeChatNotifier(self.subscription.webhook_url)
+        self.data_manager = DataManager(channel=self.subscription.channel)
         self.is_running = False
         self.china_tz = pytz.timezone(CHINA_TIMEZONE)
+        self.timer = TimerScheduler()
+        # 按学到的上传时段调整检查间隔（关闭时按 CHECK_INTERVAL 固定间隔）
+        self.poller = AdaptivePoller(self.china_tz) if ADAPTIVE_POLLING else None
+        # 获取详情 → 生成摘要 → 发送通知：下一个视频的详情请求与上一个视频的摘要和发送重叠进行
+        self.pipeline = Pipeline([
+            Stage('detail', self._fetch_detail_stage, PIPELINE_DETAIL_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('summarize', self._summarize_stage, PIPELINE_SUMMARY_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('notify', self._notify_stage, queue_size=PIPELINE_QUEUE_SIZE, ordered=True)
+        ])
+        # 预热只获取详情、生成摘要，消息暂存到推送时间再发送
+        self.prewarm_pipeline = Pipeline([
+            Stage('detail', self._fetch_detail_stage, PIPELINE_DETAIL_WORKERS, PIPELINE_QUEUE_SIZE),
+            Stage('summarize', self._summarize_stage, PIPELINE_SUMMARY_WORKERS, PIPELINE_QUEUE_SIZE)
+        ])
+        self._notify_interval = 0.0
+        self._last_notified = float('-inf')
+        # 预热暂存的消息 {bvid: (视频, 摘要)}，只对 _staged_day 当天的推送有效
+        self._staged: Dict[str, Tuple[Video, str]] = {}
+        self._staged_day: Optional[date] = None
+        self._push_target: Optional[datetime] = None
+        self._push_latencies: List[float] = []
+        self.last_push: Optional[Dict] = None
     
-    def daily_push_check(self):
-        """每日定时推送检查 (9:30 AM China time)"""
+    def daily_push_check(self, videos: Optional[List[Video]] = None):
+        """每日定时推送检查 (9:30 AM China time)
+        
+        预热暂存的消息直接发送，只补查预热之后发布的视频；每条消息相对推送时间的延迟记录在 last_push 中。
+        videos 为多订阅调度器已拉取的来源视频，未传入时自行拉取。
+        """
         try:
             # 获取当前中国时间
             china_now = datetime.now(self.china_tz)
@@ -38,80 +98,142 @@ class AINewsScheduler:
                 logger.info(f"Daily push already completed for {today_str}")
                 return
             
-            # 获取AI早报视频
-            ai_videos = self.bilibili_monitor.get_ai_news_videos()
-            
-            if not ai_videos:
-                logger.info("No AI news videos found for daily push")
-                self._mark_daily_push_done()
-                return
+            # 逐页获取到推送窗口起点为止；实时检查只处理当天的视频，窗口内更早的视频可能未处理，
+            # 因此遇到已处理的视频不能停止，已处理和已暂存的视频在拉取后过滤
+            window_start, target = self._get_daily_push_window()
+            self._begin_push_report(target)
+            ai_videos = self._select_videos(videos, int(window_start.timestamp()), stop_at_known=False)
             
-            # 筛选今天的视频（从昨晚到今天9:30之前发布的）
-            today_videos = self._get_videos_for_daily_push(ai_videos)
+            # 晚到的视频在前，预热暂存的视频在后（均为发布时间倒序）
+            staged = self._staged_videos()
+            late = [video for video in self._get_videos_for_daily_push(ai_videos)
+                    if not self.data_manager.is_video_processed(video.bvid) and video.bvid not in self._staged]
+            pending = late + staged
             
-            if not today_videos:
+            if not pending:
                 logger.info("No new videos found for today's daily push")
                 self._mark_daily_push_done()
+                self._end_push_report(0, 0)
                 return
             
-            logger.info(f"Found {len(today_videos)} videos for daily push")
-            
-            # 处理每个视频并标记为已推送
-            push_count = 0
-            for video in today_videos:
-                try:
-                    # 检查是否已经被处理过
-                    if not self.data_manager.is_video_processed(video.get('bvid')):
-                        self._process_single_video(video)
-                        push_count += 1
-                        time.sleep(2)  # 避免发送过快
-                except Exception as e:
-                    logger.error(f"Error processing video in daily push {video.get('bvid')}: {e}")
-                    continue
+            logger.info(f"Found {len(pending)} videos for daily push ({len(staged)} pre-warmed, {len(late)} late)")
+            
+            # 处理尚未处理过的视频（相邻通知间隔2秒，避免发送过快）
+            push_count = self._process_videos(pending, notify_interval=2)
             
             # 标记今日定时推送已完成
-            self._mark_daily_push_done()
+            self._mark_daily_push_done(push_count)
+            report = self._end_push_report(len(staged), len(late))
             
             # 发送定时推送完成通知
             if push_count > 0:
-                self.wechat_notifier.send_text_message(
-                    f"📅 每日AI早报推送完成\n"
-                    f"📊 推送数量: {push_count}个视频\n"
-                    f"⏰ 推送时间: {china_now.strftime('%Y-%m-%d %H:%M:%S')}"
-                )
+                self.wechat_notifier.send_text_message(self._daily_push_message(push_count, china_now, report))
                 logger.info(f"Daily push completed: {push_count} videos sent")
             else:
                 logger.info("Daily push completed: no new videos to send")
                 
         except Exception as e:
             logger.error(f"Error in daily_push_check: {e}")
+            self._push_target = None
+    
+    def prewarm_daily_push(self, videos: Optional[List[Video]] = None) -> int:
+        """每日推送预热：提前拉取推送窗口内的视频、获取详情并生成摘要，消息暂存到推送时间再发送
+        
+        推送时只需补查预热之后发布的视频。videos 为多订阅调度器已拉取的来源视频，未传入时自行拉取。
+        返回暂存的消息数。
+        """
+        try:
+            target = next_daily_run(self.subscription.push_time, self.china_tz)
+            if self.data_manager.is_daily_push_done(target.strftime('%Y-%m-%d')):
+                return 0
+            if self._staged_day != target.date():
+                self._staged, self._staged_day = {}, target.date()
+            
+            started = time.perf_counter()
+            window_start, _ = self._get_daily_push_window(target.date())
+            # 与推送相同：拉取到窗口起点为止，已处理和已暂存的视频在拉取后过滤
+            ai_videos = self._select_videos(videos, int(window_start.timestamp()), stop_at_known=False)
+            pending = [video for video in self._get_videos_for_daily_push(ai_videos, target.date())
+                       if not self.data_manager.is_video_processed(video.bvid) and video.bvid not in self._staged]
+            for video, result in zip(pending, self.prewarm_pipeline.run(pending)):
+                if result is not None:
+                    self._staged[video.bvid] = result
+            
+            logger.info(f"Pre-warmed daily push for {target.strftime('%Y-%m-%d %H:%M')}: "
+                        f"{len(self._staged)} messages staged in {time.perf_counter() - started:.1f} s")
+            return len(self._staged)
+        
+        except Exception as e:
+            logger.error(f"Error in prewarm_daily_push: {e}")
+            return 0
+    
+    def _staged_videos(self) -> List[Video]:
+        """今天的推送预热暂存、且尚未被实时检查处理的视频"""
+        if self._staged_day != datetime.now(self.china_tz).date():
+            self._staged, self._staged_day = {}, None
+        return [video for video, _ in self._staged.values() if not self.data_manager.is_video_processed(video.bvid)]
+    
+    def _take_staged_summary(self, bvid: str) -> Optional[str]:
+        """取出预热生成的摘要（每条暂存消息只发送一次）"""
+        staged = self._staged.pop(bvid, None)
+        return staged[1] if staged is not None else None
     
-    def _get_videos_for_daily_push(self, ai_videos):
+    def _begin_push_report(self, target: datetime):
+        self._push_target = target
+        self._push_latencies = []
+    
+    def _record_push_latency(self):
+        """记录一条推送消息相对目标推送时间的延迟"""
+        if self._push_target is not None:
+            self._push_latencies.append(time.time() - self._push_target.timestamp())
+    
+    def _end_push_report(self, staged: int, late: int) -> Dict:
+        """汇总本次推送的延迟（秒，相对目标推送时间；负数表示提前）"""
+        latencies = self._push_latencies
+        self.last_push = {
+            'target': self._push_target.isoformat() if self._push_target else None,
+            'messages': len(latencies),
+            'staged': staged,
+            'late': late,
+            'first_latency_s': round(latencies[0], 1) if latencies else None,
+            'last_latency_s': round(latencies[-1], 1) if latencies else None
+        }
+        self._push_target = None
+        self._staged, self._staged_day = {}, None
+        if latencies:
+            logger.info(f"Daily push latency: first message {latencies[0]:+.1f} s, last {latencies[-1]:+.1f} s "
+                        f"after target ({staged} pre-warmed, {late} late)")
+        return self.last_push
+    
+    def _daily_push_message(self, push_count: int, china_now: datetime, report: Dict) -> str:
+        latency = ""
+        if report.get('last_latency_s') is not None:
+            latency = f"\n⏱️ 推送延迟: 首条 {report['first_latency_s']:+.1f}秒，末条 {report['last_latency_s']:+.1f}秒"
+        return (
+            f"📅 每日AI早报推送完成\n"
+            f"📊 推送数量: {push_count}个视频\n"
+            f"⏰ 推送时间: {china_now.strftime('%Y-%m-%d %H:%M:%S')}"
+            f"{latency}"
+        )
+    
+    def _get_daily_push_window(self, day: Optional[date] = None):
+        """定时推送的时间范围：前一天18:00到当天推送时间（中国时区，day 默认为今天）"""
+        today = day or datetime.now(self.china_tz).date()
+        yesterday = date.fromordinal(today.toordinal() - 1)
+        start_time = self.china_tz.localize(datetime.combine(yesterday, datetime.strptime("18:00", "%H:%M").time()))
+        end_time = self.china_tz.localize(datetime.combine(today, datetime.strptime(self.subscription.push_time, "%H:%M").time()))
+        return start_time, end_time
+    
+    def _get_videos_for_daily_push(self, ai_videos, day: Optional[date] = None):
         """获取用于定时推送的视频（昨晚到今天9:30之前发布的）"""
         try:
-            china_now = datetime.now(self.china_tz)
-            today = china_now.date()
-            
-            # 计算时间范围：昨天18:00到今天9:30
-            yesterday = date.fromordinal(today.toordinal() - 1)
-            start_time = self.china_tz.localize(datetime.combine(yesterday, datetime.strptime("18:00", "%H:%M").time()))
-            end_time = self.china_tz.localize(datetime.combine(today, datetime.strptime(DAILY_PUSH_TIME, "%H:%M").time()))
-            
-            daily_videos = []
-            for video in ai_videos:
-                video_time = video.get('created') or video.get('pubdate')
-                if video_time:
-                    # 转换为datetime对象
-                    if isinstance(video_time, int):
-                        video_dt = datetime.fromtimestamp(video_time, tz=self.china_tz)
-                    else:
-                        continue
-                    
-                    # 检查是否在时间范围内
-                    if start_time <= video_dt <= end_time:
-                        daily_videos.append(video)
-                        logger.debug(f"Video for daily push: {video.get('title')} at {video_dt}")
-            
+            # 计算时间范围：昨天18:00到今天9:30（边界只本地化一次，批量按整数比较）
+            start_time, end_time = self._get_daily_push_window(day)
+            daily_videos = select_in_window(ai_videos, int(start_time.timestamp()), int(end_time.timestamp()),
+                                            inclusive_end=True)
+            if logger.isEnabledFor(logging.DEBUG):
+                for video in daily_videos:
+                    logger.debug(f"Video for daily push: {video.title} at {datetime.fromtimestamp(video.pubdate, self.china_tz)}")
             return daily_videos
             
         except Exception as e:
@@ -120,96 +242,141 @@ class AINewsScheduler:
     
     def _is_daily_push_done_today(self) -> bool:
         """检查今天是否已经执行过定时推送"""
-        try:
-            if not os.path.exists(DAILY_PUSH_LOG_FILE):
-                return False
-            
-            today_str = datetime.now(self.china_tz).strftime('%Y-%m-%d')
-            
-            with open(DAILY_PUSH_LOG_FILE, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                last_line = lines[-1].strip() if lines else ''
-                return today_str in last_line
-                
-        except Exception as e:
-            logger.warning(f"Error checking daily push status: {e}")
-            return False
+        today_str = datetime.now(self.china_tz).strftime('%Y-%m-%d')
+        return self.data_manager.is_daily_push_done(today_str)
     
-    def _mark_daily_push_done(self):
+    def _mark_daily_push_done(self, video_count: int = 0):
         """标记今日定时推送已完成"""
+        self.data_manager.mark_daily_push_done(datetime.now(self.china_tz), video_count)
+    
+    def _today_start(self) -> datetime:
+        """今天零点（中国时区）"""
+        return self.china_tz.localize(datetime.combine(datetime.now(self.china_tz).date(), datetime.min.time()))
+    
+    def _select_videos(self, videos: Optional[List[Video]], since: int, stop_at_known: bool = True) -> List[Video]:
+        """筛选本订阅关心的视频；videos 为 None 时自行逐页拉取，到达 since 即停止
+        
+        stop_at_known 为真时遇到已处理的视频也停止，只适用于当天的实时检查。
+        """
+        if videos is not None:
+            return [video for video in videos if self.subscription.matches(video)]
         try:
-            os.makedirs(os.path.dirname(DAILY_PUSH_LOG_FILE), exist_ok=True)
-            china_now = datetime.now(self.china_tz)
-            log_entry = f"{china_now.strftime('%Y-%m-%d %H:%M:%S')} - Daily push completed\n"
-            
-            with open(DAILY_PUSH_LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-                
-            logger.debug(f"Marked daily push as completed: {log_entry.strip()}")
-            
+            return self.source.poll(
+                is_known=self.data_manager.is_video_processed if stop_at_known else None,
+                since=since,
+                predicate=self.subscription.matches
+            )
         except Exception as e:
-            logger.error(f"Error marking daily push as done: {e}")
+            logger.error(f"Error fetching videos from {self.source!r}: {e}")
+            return []
     
-    def check_for_new_videos(self):
-        """实时检查新视频并发送通知（避免与定时推送重复）"""
+    def check_for_new_videos(self, videos: Optional[List[Video]] = None) -> List[Video]:
+        """实时检查新视频并发送通知（避免与定时推送重复），返回本次处理的新视频
+        
+        videos 为多订阅调度器已拉取的来源视频，未传入时自行拉取。
+        """
         try:
             logger.info("Checking for new AI news videos...")
-            
-            # 获取AI早报视频
-            ai_videos = self.bilibili_monitor.get_ai_news_videos()
+            since = int(self._today_start().timestamp())
+            
+            # 获取今天的AI早报视频，只处理与上一次拉取相比新增的；列表没有变化时跳过筛选、详情和摘要
+            if videos is None:
+                events = self.source.poll_changes(since, self.subscription.matches)
+                if events is None:
+                    logger.warning("Failed to fetch the video list, skipping this check")
+                    return []
+                if not events:
+                    logger.info("Video list unchanged since the last check")
+                    return []
+                videos = added_videos(events)
+            ai_videos = self._select_videos(videos, since)
             
             if not ai_videos:
                 logger.info("No AI news videos found")
-                return
+                return []
             
             # 筛选出当天发布且未处理的新视频
             new_videos = self.data_manager.get_new_videos(ai_videos)
             
             if not new_videos:
                 logger.info("No new videos to process today")
-                return
+                return []
             
             logger.info(f"Found {len(new_videos)} new videos published today")
             
             # 处理每个新视频
-            for video in new_videos:
-                try:
-                    self._process_single_video(video)
-                except Exception as e:
-                    logger.error(f"Error processing video {video.get('bvid')}: {e}")
-                    continue
+            self._process_videos(new_videos)
             
             # 标记视频为已处理
             self.data_manager.mark_videos_as_processed(new_videos)
+            return new_videos
             
         except Exception as e:
             logger.error(f"Error in check_for_new_videos: {e}")
+            # 下一次检查重新对比完整列表，本次未处理完的视频不会因快照已更新而漏掉
+            self.source.changes.reset()
             # 发送错误通知
             self.wechat_notifier.send_error_notification(str(e))
+            return []
     
-    def _process_single_video(self, video: dict):
-        """处理单个视频"""
+    def _seed_poller(self):
+        """用已处理视频的发布时间初始化上传时段；记录不足时从B站最新投稿补充（一次请求）"""
+        self.poller.observe(self.data_manager.get_recent_pubdates())
+        if len(self.poller.profile) < self.poller.profile.min_samples and isinstance(self.source, BilibiliSource):
+            recent = [video for video in self.bilibili_monitor.get_latest_videos(30) if self.subscription.matches(video)]
+            self.poller.observe(video.pubdate for video in recent)
+        logger.info(f"Upload profile: {self.poller.get_stats()}")
+    
+    def _adaptive_check(self):
+        """检查一次，再按上传时段安排下一次检查"""
         try:
-            bvid = video.get('bvid')
-            logger.info(f"Processing video: {bvid}")
-            
-            # 获取视频详细信息
-            video_detail = self.bilibili_monitor.get_video_detail(bvid)
-            
-            # 生成摘要
+            new_videos = self.check_for_new_videos()
+            self.poller.observe(video.pubdate for video in new_videos)
+        finally:
+            delay = self.poller.next_delay()
+            logger.info(f"Next check in {delay / 60:.1f} minutes")
+            self.timer.after(delay, self._adaptive_check)
+    
+    def _process_videos(self, videos, notify_interval: float = 0.0) -> int:
+        """经流水线处理视频，返回成功走完所有阶段的视频数（通知按视频顺序发送）"""
+        if not videos:
+            return 0
+        self._notify_interval = notify_interval
+        results = self.pipeline.run(videos)
+        return sum(1 for result in results if result is not None)
+    
+    def _fetch_detail_stage(self, video: Video):
+        """流水线阶段：获取视频详细信息（预热已生成摘要的视频跳过）"""
+        logger.info(f"Processing video: {video.bvid}")
+        if video.bvid in self._staged:
+            return video, None
+        return video, self.source.get_detail(video)
+    
+    def _summarize_stage(self, item):
+        """流水线阶段：生成摘要（优先使用预热暂存的摘要）"""
+        video, video_detail = item
+        summary = self._take_staged_summary(video.bvid)
+        if summary is None:
             summary = self.content_summarizer.generate_summary(video, video_detail)
-            
-            # 发送通知
+        return video, summary
+    
+    def _notify_stage(self, item) -> bool:
+        """流水线阶段：发送通知（与上一条通知至少间隔 notify_interval 秒）"""
+        video, summary = item
+        wait = self._last_notified + self._notify_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
             success = self.wechat_notifier.send_ai_news_notification(summary, is_new=True)
-            
-            if success:
-                logger.info(f"Successfully sent notification for video: {bvid}")
-            else:
-                logger.warning(f"Failed to send notification for video: {bvid}")
-                
-        except Exception as e:
-            logger.error(f"Error processing single video: {e}")
-            raise
+        finally:
+            self._last_notified = time.monotonic()
+        
+        if success:
+            self._record_push_latency()
+            logger.info(f"Successfully sent notification for video: {video.bvid}")
+        else:
+            logger.warning(f"Failed to send notification for video: {video.bvid}")
+        return success
     
     def run_once(self):
         """运行一次检查"""
@@ -224,7 +391,7 @@ class AINewsScheduler:
     def start_scheduler(self):
         """启动调度器"""
         try:
-            logger.info(f"Starting AI News Scheduler with {CHECK_INTERVAL} minute intervals")
+            logger.info(f"Starting AI News Scheduler with {polling_description()}")
             
             # 验证配置
             if not self._validate_configuration():
@@ -232,41 +399,37 @@ class AINewsScheduler:
                 return
             
             # 设置定时任务
-            # 1. 实时检查：每隔6小时检查新视频
-            schedule.every(CHECK_INTERVAL).minutes.do(self.check_for_new_videos)
-            
-            # 2. 定时推送：每日上匈9:30（中国时区）
-            if ENABLE_DAILY_PUSH:
-                schedule.every().day.at(DAILY_PUSH_TIME).do(self.daily_push_check)
-                logger.info(f"Daily push scheduled at {DAILY_PUSH_TIME} China time")
+            # 1. 实时检查：自适应间隔，或每隔 CHECK_INTERVAL 分钟检查新视频
+            if self.poller is None:
+                self.timer.every(CHECK_INTERVAL * 60, self.check_for_new_videos)
+            
+            # 2. 定时推送：每日推送时间（按中国时区计算，与主机时区无关）
+            if self.subscription.daily_push:
+                self.timer.daily_at(self.subscription.push_time, self.china_tz, self.daily_push_check)
+                logger.info(f"Daily push scheduled at {self.subscription.push_time} China time")
+                # 推送前提前拉取并生成摘要，推送时只补查晚到的视频
+                prewarm_at = prewarm_time(self.subscription.push_time)
+                if prewarm_at:
+                    self.timer.daily_at(prewarm_at, self.china_tz, self.prewarm_daily_push)
+                    logger.info(f"Daily push pre-warm scheduled at {prewarm_at} China time")
             
             # 发送启动通知
-            daily_push_status = f"\n📅 每日定时推送: {DAILY_PUSH_TIME} (中国时区)" if ENABLE_DAILY_PUSH else ""
-            self.wechat_notifier.send_text_message(
-                f"🚀 AI早报监控系统已启动\n"
-                f"⏰ 实时检查间隔: {CHECK_INTERVAL}分钟\n"
-                f"{daily_push_status}"
-                f"📺 监控UP主: 橘鸦Juya\n"
-                f"🕐 启动时间: {datetime.now(self.china_tz).strftime('%Y-%m-%d %H:%M:%S')}"
-            )
+            self.wechat_notifier.send_text_message(self._startup_message())
             
             self.is_running = True
             
             # 执行一次初始检查
-            self.check_for_new_videos()
-            
-            # 开始调度循环
-            while self.is_running:
-                try:
-                    schedule.run_pending()
-                    time.sleep(30)  # 每30秒检查一次调度
-                except KeyboardInterrupt:
-                    logger.info("Received interrupt signal")
-                    break
-                except Exception as e:
-                    logger.error(f"Error in scheduler loop: {e}")
-                    time.sleep(60)  # 出错时等待1分钟再继续
+            if self.poller is not None:
+                self._seed_poller()
+                self._adaptive_check()
+            else:
+                self.check_for_new_videos()
             
+            # 休眠到下一个任务到期，收到 SIGINT/SIGTERM 时返回
+            self.timer.run()
+            
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal")
         except Exception as e:
             logger.error(f"Error starting scheduler: {e}")
         finally:
@@ -277,17 +440,31 @@ class AINewsScheduler:
         try:
             logger.info("Stopping AI News Scheduler...")
             self.is_running = False
-            schedule.clear()
+            self.timer.stop()
+            self.timer.clear()
             
             # 发送停止通知
-            self.wechat_notifier.send_text_message(
-                f"🛑 AI早报监控系统已停止\n"
-                f"🕐 停止时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            )
+            self.wechat_notifier.send_text_message(self._shutdown_message())
             
         except Exception as e:
             logger.error(f"Error stopping scheduler: {e}")
     
+    def _startup_message(self) -> str:
+        daily_push_status = f"\n📅 每日定时推送: {self.subscription.push_time} (中国时区)" if self.subscription.daily_push else ""
+        return (
+            f"🚀 AI早报监控系统已启动\n"
+            f"⏰ {check_interval_text()}\n"
+            f"{daily_push_status}"
+            f"📺 监控UP主: 橘鸦Juya\n"
+            f"🕐 启动时间: {datetime.now(self.china_tz).strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+    
+    def _shutdown_message(self) -> str:
+        return (
+            f"🛑 AI早报监控系统已停止\n"
+            f"🕐 停止时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        )
+    
     def _validate_configuration(self) -> bool:
         """验证配置"""
         try:
@@ -319,7 +496,13 @@ class AINewsScheduler:
                 'check_interval': CHECK_INTERVAL,
                 'last_check': datetime.now().isoformat(),
                 'data_stats': stats,
-                'next_run': schedule.next_run().isoformat() if schedule.jobs else None
+                'monitor_stats': self.bilibili_monitor.get_stats(),
+                'pipeline_stats': self.pipeline.get_stats(),
+                'poller_stats': self.poller.get_stats() if self.poller is not None else None,
+                'change_stats': self.source.changes.get_stats(),
+                'staged_messages': len(self._staged),
+                'last_daily_push': self.last_push,
+                'next_run': self.timer.next_run().isoformat() if self.timer.jobs else None
             }
             
             return status
@@ -338,7 +521,7 @@ class AINewsScheduler:
             
             if ai_videos:
                 latest_video = ai_videos[0]
-                video_detail = self.bilibili_monitor.get_video_detail(latest_video.get('bvid'))
+                video_detail = self.bilibili_monitor.get_video_detail(latest_video.bvid)
                 summary = self.content_summarizer.generate_summary(latest_video, video_detail)
                 
                 test_content = f"🧪 **测试通知** 🧪\n\n以下是最新的AI早报内容预览：\n\n{summary}"
@@ -371,14 +554,240 @@ class AINewsScheduler:
             
             logger.info(f"Found {len(ai_videos)} AI news videos")
             
-            for i, video in enumerate(ai_videos[:3]):  # 限制为最新3个视频
-                try:
-                    logger.info(f"Processing video {i+1}/{min(3, len(ai_videos))}: {video.get('title')}")
-                    self._process_single_video(video)
-                    time.sleep(2)  # 避免发送过快
-                except Exception as e:
-                    logger.error(f"Error processing video {video.get('bvid')}: {e}")
-                    continue
+            # 限制为最新3个视频
+            self._process_videos(ai_videos[:3], notify_interval=2)
                     
         except Exception as e:
             logger.error(f"Error in force_check_all_videos: {e}")
+
+class MultiTenantScheduler:
+    """多订阅调度器：一个进程服务多个订阅
+    
+    订阅按来源分组，每个检查周期所有不同来源并发拉取一次（见 sources.SourceRegistry），结果分发给该来源的所有订阅；
+    每日推送按（来源, 推送时间）分组，同样只拉取一次。各订阅使用独立的webhook和去重状态，
+    上游请求量随不同来源数增长，而不是随订阅数增长。
+    """
+    
+    def __init__(self, subscriptions: List[Subscription], monitor: Optional[BilibiliMonitor] = None):
+        if not subscriptions:
+            raise ValueError("at least one subscription is required")
+        self.china_tz = pytz.timezone(CHINA_TIMEZONE)
+        self.is_running = False
+        self.timer = TimerScheduler()
+        base_monitor = monitor or BilibiliMonitor()
+        # 每个不同来源一个插件；B站来源的监控器由同一个监控器派生，共享限流器、熔断器、缓存和传输层
+        self.registry = SourceRegistry()
+        self.tenants: List[AINewsScheduler] = []
+        for subscription in subscriptions:
+            config = subscription.source
+            source = self.registry.sources.get(config.key)
+            if source is None:
+                derived = base_monitor.for_source(config.uid, config.season_id, config.series_id) \
+                    if config.type == BILIBILI else None
+                source = self.registry.add(create_source(config, monitor=derived, transport=base_monitor.transport))
+            self.tenants.append(AINewsScheduler(subscription, base_monitor, source))
+        self.source_fetches = 0
+        # 每个来源按自己的上传时段调整检查间隔
+        self.pollers: Dict[Tuple, AdaptivePoller] = {}
+        if ADAPTIVE_POLLING:
+            self.pollers = {source_key: AdaptivePoller(self.china_tz) for source_key in self.registry.sources}
+    
+    def _tenants_for(self, source_key) -> List[AINewsScheduler]:
+        return [tenant for tenant in self.tenants if tenant.subscription.source.key == source_key]
+    
+    @staticmethod
+    def _predicate(tenants: List[AINewsScheduler]) -> Callable[[Video], bool]:
+        """任一订阅关心的视频都需要拉取"""
+        return lambda video: any(tenant.subscription.matches(video) for tenant in tenants)
+    
+    def _poll(self, since: int, groups: Dict[Tuple, List[AINewsScheduler]]) -> Dict[Tuple, Optional[List[Video]]]:
+        """并发拉取各组来源 since 之后的完整列表（用于变更捕获和每日推送），一轮耗时约等于最慢的来源
+        
+        不在已处理的视频处停止：实时检查需要完整列表做比对，推送窗口内更早的视频可能尚未处理。
+        """
+        filters = {source_key: (None, self._predicate(tenants)) for source_key, tenants in groups.items()}
+        self.source_fetches += len(filters)
+        return self.registry.poll(since, filters)
+    
+    def check_for_new_videos(self, source_keys: Optional[List[Tuple]] = None) -> Dict[Tuple, List[Video]]:
+        """一个检查周期：所有来源（或 source_keys 中的来源）并发拉取一次，新增的视频分发给各来源的订阅
+        
+        返回 {来源key: 新增的视频}，出错或超时的来源不在其中；列表没有变化的来源不会触发任何订阅的处理。
+        """
+        since = int(self.tenants[0]._today_start().timestamp())
+        groups = {source_key: self._tenants_for(source_key) for source_key in source_keys or self.registry.sources}
+        groups = {source_key: tenants for source_key, tenants in groups.items() if tenants}
+        fetched = {}
+        for source_key, videos in self._poll(since, groups).items():
+            if videos is None:
+                continue
+            events = self.registry.sources[source_key].changes.update(videos, since)
+            added = added_videos(events)
+            fetched[source_key] = added
+            if not added:
+                logger.info(f"No new videos from source {source_key} ({len(events)} other changes)")
+                continue
+            logger.info(f"Fetched {len(added)} new videos from source {source_key} "
+                        f"for {len(groups[source_key])} subscriptions")
+            for tenant in groups[source_key]:
+                tenant.check_for_new_videos(added)
+        return fetched
+    
+    def _schedule_next_check(self, source_key, videos: Optional[List[Video]]):
+        poller = self.pollers[source_key]
+        poller.observe(video.pubdate for video in videos or [])
+        delay = poller.next_delay()
+        logger.info(f"Next check of source {source_key} in {delay / 60:.1f} minutes")
+        self.timer.after(delay, self._adaptive_check, source_key, name=f"check {':'.join(source_key)}")
+    
+    def _adaptive_check(self, source_key):
+        """检查一个来源，再按该来源的上传时段安排下一次检查"""
+        videos = None
+        try:
+            videos = self.check_for_new_videos([source_key]).get(source_key)
+        finally:
+            self._schedule_next_check(source_key, videos)
+    
+    def _start_adaptive_checks(self):
+        """用各订阅已处理视频的发布时间初始化上传时段，并发检查所有来源一次后各自安排下一次检查"""
+        for source_key, poller in self.pollers.items():
+            for tenant in self._tenants_for(source_key):
+                poller.observe(tenant.data_manager.get_recent_pubdates())
+        fetched = self.check_for_new_videos()
+        for source_key in self.pollers:
+            self._schedule_next_check(source_key, fetched.get(source_key))
+    
+    def _push_groups(self) -> Dict[Tuple, List[AINewsScheduler]]:
+        """按（来源, 推送时间）分组启用了每日推送的订阅"""
+        groups: Dict[Tuple, List[AINewsScheduler]] = {}
+        for tenant in self.tenants:
+            if tenant.subscription.daily_push:
+                groups.setdefault((tenant.subscription.source.key, tenant.subscription.push_time), []).append(tenant)
+        return groups
+    
+    def daily_push_check(self, source_key=None, push_time: Optional[str] = None):
+        """同一来源、同一推送时间的订阅共享一次拉取；不指定分组时依次检查所有分组（--mode test-daily）"""
+        if source_key is None:
+            for source_key, push_time in self._push_groups():
+                self.daily_push_check(source_key, push_time)
+            return
+        tenants = [tenant for tenant in self._push_groups().get((source_key, push_time), [])
+                   if not tenant._is_daily_push_done_today()]
+        if not tenants:
+            return
+        # 拉取推送窗口内的完整列表，已处理的视频由各订阅过滤（见 AINewsScheduler.daily_push_check）
+        window_start, _ = tenants[0]._get_daily_push_window()
+        videos = self._poll(int(window_start.timestamp()), {source_key: tenants}).get(source_key)
+        if videos is None:
+            return
+        for tenant in tenants:
+            tenant.daily_push_check(videos)
+    
+    def prewarm_daily_push(self, source_key, push_time: str):
+        """同一来源、同一推送时间的订阅共享一次预热拉取，各订阅分别生成并暂存自己的消息"""
+        target = next_daily_run(push_time, self.china_tz)
+        tenants = [tenant for tenant in self._push_groups().get((source_key, push_time), [])
+                   if not tenant.data_manager.is_daily_push_done(target.strftime('%Y-%m-%d'))]
+        if not tenants:
+            return
+        window_start, _ = tenants[0]._get_daily_push_window(target.date())
+        videos = self._poll(int(window_start.timestamp()), {source_key: tenants}).get(source_key)
+        if videos is None:
+            return
+        for tenant in tenants:
+            tenant.prewarm_daily_push(videos)
+    
+    def run_once(self):
+        logger.info("Running manual check for all subscriptions...")
+        self.check_for_new_videos()
+    
+    def run_first_time_setup(self):
+        """初始化设置模式：所有来源检查一次当天发布的视频"""
+        logger.info("Running initialization setup for all subscriptions...")
+        self.check_for_new_videos()
+    
+    def send_test_notification(self):
+        """每个订阅向自己的webhook发送一条测试通知"""
+        for tenant in self.tenants:
+            logger.info(f"Subscription '{tenant.subscription.name}':")
+            tenant.send_test_notification()
+    
+    def force_check_all_videos(self):
+        """每个订阅各自强制检查最新的视频（忽略已处理状态）"""
+        for tenant in self.tenants:
+            logger.info(f"Subscription '{tenant.subscription.name}':")
+            tenant.force_check_all_videos()
+    
+    def start_scheduler(self):
+        """启动调度器"""
+        try:
+            logger.info(f"Starting multi-tenant scheduler: {len(self.tenants)} subscriptions, "
+                        f"{len(self.registry.sources)} sources, {polling_description()}")
+            
+            # webhook 配置错误的订阅不参与调度
+            valid = [tenant for tenant in self.tenants if tenant.wechat_notifier.validate_webhook_url()]
+            for tenant in self.tenants:
+                if tenant not in valid:
+                    logger.error(f"Subscription '{tenant.subscription.name}' has an invalid webhook, skipping")
+            if not valid:
+                logger.error("No subscription with a valid webhook. Please check your settings.")
+                return
+            self.tenants = valid
+            
+            if not self.pollers:
+                self.timer.every(CHECK_INTERVAL * 60, self.check_for_new_videos)
+            for source_key, push_time in self._push_groups():
+                self.timer.daily_at(push_time, self.china_tz, self.daily_push_check, source_key, push_time,
+                                    name=f"daily_push {':'.join(source_key)}")
+                logger.info(f"Daily push for source {source_key} scheduled at {push_time} China time")
+                prewarm_at = prewarm_time(push_time)
+                if prewarm_at:
+                    self.timer.daily_at(prewarm_at, self.china_tz, self.prewarm_daily_push, source_key, push_time,
+                                        name=f"prewarm {':'.join(source_key)}")
+            
+            for tenant in self.tenants:
+                tenant.wechat_notifier.send_text_message(tenant._startup_message())
+            
+            self.is_running = True
+            if self.pollers:
+                self._start_adaptive_checks()
+            else:
+                self.check_for_new_videos()
+            
+            # 休眠到下一个任务到期，收到 SIGINT/SIGTERM 时返回
+            self.timer.run()
+            
+        except KeyboardInterrupt:
+            logger.info("Received interrupt signal")
+        except Exception as e:
+            logger.error(f"Error starting scheduler: {e}")
+        finally:
+            self.stop_scheduler()
+    
+    def stop_scheduler(self):
+        """停止调度器"""
+        logger.info("Stopping multi-tenant scheduler...")
+        self.is_running = False
+        self.timer.stop()
+        self.timer.clear()
+        self.registry.close()
+        for tenant in self.tenants:
+            try:
+                tenant.wechat_notifier.send_text_message(tenant._shutdown_message())
+            except Exception as e:
+                logger.error(f"Error stopping subscription '{tenant.subscription.name}': {e}")
+    
+    def get_status(self) -> dict:
+        """获取系统状态（按订阅列出去重统计）"""
+        first = self.tenants[0]
+        return {
+            'is_running': self.is_running,
+            'check_interval': CHECK_INTERVAL,
+            'subscriptions': {tenant.subscription.name: tenant.data_manager.get_stats() for tenant in self.tenants},
+            'sources': len(self.registry.sources),
+            'source_fetches': self.source_fetches,
+            'source_stats': self.registry.get_stats(),
+            'poller_stats': {':'.join(key): poller.get_stats() for key, poller in self.pollers.items()},
+            'monitor_stats': first.bilibili_monitor.get_stats(),
+            'next_run': self.timer.next_run().isoformat() if self.timer.jobs else None
+        }
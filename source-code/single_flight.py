@@ -0,0 +1,60 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """一次进行中的调用"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """合并并发的相同请求：同一个 key 同时只有一次调用在进行，其余调用方等待并共享结果"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.saved = 0
+    
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """执行 fn，若相同 key 的调用正在进行则等待它的结果（异常同样共享）"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.saved += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+        
+        if not leader:
+            logger.debug(f"Coalesced request {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def get_stats(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'saved': self.saved,
+            'in_flight': len(self._calls)
+        }
@@ -0,0 +1,116 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from video import Video
+
+logger = logging.getLogger(__name__)
+
+# 变更事件类型
+ADDED = 'added'
+REMOVED = 'removed'
+METADATA_CHANGED = 'metadata_changed'
+STATS_CHANGED = 'stats_changed'
+EVENT_KINDS = (ADDED, REMOVED, METADATA_CHANGED, STATS_CHANGED)
+
+# 同一个视频上可能变化的字段：描述信息与计数；bvid、aid、pubdate 等不会变化
+METADATA_FIELDS = ('title', 'description', 'pic', 'length', 'author', 'typeid', 'typename', 'url')
+STATS_FIELDS = ('play', 'comment', 'review')
+
+class ChangeEvent:
+    """两次列表快照之间的一个变更；previous 为上一次快照中的视频，fields 为变化的字段"""
+    
+    __slots__ = ('kind', 'video', 'previous', 'fields')
+    
+    def __init__(self, kind: str, video: Video, previous: Optional[Video] = None, fields: Sequence[str] = ()):
+        self.kind = kind
+        self.video = video
+        self.previous = previous
+        self.fields = tuple(fields)
+    
+    def __repr__(self):
+        fields = f", fields={list(self.fields)}" if self.fields else ""
+        return f"ChangeEvent({self.kind}, {self.video.bvid!r}{fields})"
+
+def _changed_fields(video: Video, previous: Video, fields: Sequence[str]) -> List[str]:
+    return [name for name in fields if getattr(video, name) != getattr(previous, name)]
+
+def diff_snapshots(previous: Dict[str, Video], current: Dict[str, Video],
+                   since: Optional[int] = None) -> List[ChangeEvent]:
+    """按 bvid 对比两次快照（O(n)），事件按 current 的顺序排列，removed 在最后
+    
+    上一次快照中发布时间早于 since 的视频是移出了拉取范围（例如跨过零点），不算删除。
+    """
+    events = []
+    for bvid, video in current.items():
+        old = previous.get(bvid)
+        if old is None:
+            events.append(ChangeEvent(ADDED, video))
+            continue
+        changed = _changed_fields(video, old, METADATA_FIELDS)
+        if changed:
+            events.append(ChangeEvent(METADATA_CHANGED, video, old, changed))
+        changed = _changed_fields(video, old, STATS_FIELDS)
+        if changed:
+            events.append(ChangeEvent(STATS_CHANGED, video, old, changed))
+    
+    for bvid, old in previous.items():
+        if bvid in current:
+            continue
+        if since is not None and old.pubdate is not None and old.pubdate < since:
+            continue
+        events.append(ChangeEvent(REMOVED, old, old))
+    return events
+
+def added_videos(events: Iterable[ChangeEvent]) -> List[Video]:
+    return [event.video for event in events if event.kind == ADDED]
+
+class SnapshotTracker:
+    """保存一个来源上一次拉取到的视频列表，每次拉取只输出与上一次相比的变更事件
+    
+    首次拉取（或 reset 之后）所有视频都是 added；列表没有变化时返回空列表，调用方据此跳过后续处理。
+    """
+    
+    def __init__(self):
+        self._snapshot: Dict[str, Video] = {}
+        self._lock = threading.Lock()
+        self.polls = 0
+        self.unchanged_polls = 0
+        self.counts = dict.fromkeys(EVENT_KINDS, 0)
+        self.last_counts = dict.fromkeys(EVENT_KINDS, 0)
+    
+    def update(self, videos: Iterable[Video], since: Optional[int] = None) -> List[ChangeEvent]:
+        """用新拉取的列表替换快照，返回变更事件"""
+        current = {video.bvid: video for video in videos}
+        with self._lock:
+            events = diff_snapshots(self._snapshot, current, since)
+            self._snapshot = current
+            self.polls += 1
+            self.last_counts = dict.fromkeys(EVENT_KINDS, 0)
+            for event in events:
+                self.last_counts[event.kind] += 1
+                self.counts[event.kind] += 1
+            if not events:
+                self.unchanged_polls += 1
+        
+        for event in events:
+            if event.kind == METADATA_CHANGED:
+                logger.info(f"Video {event.video.bvid} changed: {', '.join(event.fields)}")
+            elif event.kind == REMOVED:
+                logger.info(f"Video {event.video.bvid} disappeared from the list")
+        return events
+    
+    def reset(self):
+        """丢弃快照，下一次拉取的视频全部作为 added 重新交给下游（下游处理失败时调用，避免漏掉视频）"""
+        with self._lock:
+            self._snapshot = {}
+    
+    def get_stats(self) -> Dict:
+        """拉取次数、无变化的次数，以及各类事件的累计数和上一次拉取的数量"""
+        with self._lock:
+            return {
+                'polls': self.polls,
+                'unchanged_polls': self.unchanged_polls,
+                'events': dict(self.counts),
+                'last_events': dict(self.last_counts)
+            }
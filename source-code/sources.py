@@ -0,0 +1,375 @@
+import re
+import json
+import time
+import logging
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bilibili_monitor import BilibiliMonitor
+from config import SOURCE_TIMEOUT, SOURCE_WORKERS, FEED_RATE_LIMIT, HTTP_CONNECT_TIMEOUT
+from http_transport import HttpTransport, get_transport
+from rate_limiter import TokenBucket
+from snapshot_diff import ChangeEvent, SnapshotTracker
+from video import Video
+
+logger = logging.getLogger(__name__)
+
+BILIBILI = 'bilibili'
+
+# 信息源类型 -> 插件类，由 register_source 填充
+SOURCE_TYPES: Dict[str, type] = {}
+
+_BVID_PATTERN = re.compile(r'BV[0-9A-Za-z]{10}')
+_ATOM = '{http://www.w3.org/2005/Atom}'
+
+def register_source(kind: str):
+    """注册信息源插件，订阅配置中 source.type 为 kind 时使用该类"""
+    def decorator(cls):
+        cls.kind = kind
+        SOURCE_TYPES[kind] = cls
+        return cls
+    return decorator
+
+def _parse_time(value) -> Optional[int]:
+    """Unix时间戳、RFC 822（RSS）或 ISO 8601（Atom/JSON）时间转为时间戳"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip()
+    if text.isdigit():
+        return int(text)
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        parsed = parsedate_to_datetime(text)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+def _entry_id(link: str, guid: str) -> str:
+    """条目的去重ID：链接指向B站视频时使用BV号（与B站来源共享去重记录），否则使用 guid 或链接"""
+    match = _BVID_PATTERN.search(link or '')
+    if match:
+        return match.group(0)
+    if guid or link:
+        return guid or link
+    raise ValueError("entry has neither an id nor a link")
+
+class VideoSource:
+    """信息源插件接口
+    
+    子类实现 key（来源标识，相同 key 的订阅共享一次拉取）、fetch（获取原始条目）和 normalize（原始条目 → Video），
+    poll 在此基础上按 since / predicate / is_known 筛选。每个来源有自己的限流器和单轮超时。
+    changes 保存上一次拉取的列表快照，poll_changes 只返回与上一次相比的变更事件。
+    """
+    
+    kind = ''
+    
+    def __init__(self, rate_limit: Optional[float] = None, timeout: float = SOURCE_TIMEOUT):
+        self.rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.timeout = timeout
+        self.changes = SnapshotTracker()
+    
+    @classmethod
+    def from_config(cls, source, **shared) -> 'VideoSource':
+        """由订阅配置中的来源（subscriptions.Source）创建实例"""
+        raise NotImplementedError
+    
+    @property
+    def key(self) -> Tuple:
+        raise NotImplementedError
+    
+    def fetch(self, since: Optional[int] = None) -> Iterable[Any]:
+        """获取原始条目"""
+        raise NotImplementedError
+    
+    def normalize(self, entry: Any) -> Optional[Video]:
+        """原始条目转为 Video，无法识别的条目返回 None 或抛出 ValueError"""
+        raise NotImplementedError
+    
+    def get_detail(self, video: Video) -> Optional[Dict]:
+        """视频详情（用于生成摘要），没有详情接口的来源返回 None"""
+        return None
+    
+    def poll(self, is_known: Optional[Callable[[str], bool]] = None, since: Optional[int] = None,
+             predicate: Optional[Callable[[Video], bool]] = None) -> List[Video]:
+        """拉取一次，返回按发布时间倒序、未处理且满足条件的视频
+        
+        文件类来源不保证条目有序，因此已处理或过早的条目只跳过，不提前停止。
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        videos = []
+        for entry in self.fetch(since):
+            try:
+                video = self.normalize(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed entry from {self!r}: {e}")
+                continue
+            if video is None:
+                continue
+            if since is not None and video.pubdate is not None and video.pubdate < since:
+                continue
+            if predicate and not predicate(video):
+                continue
+            if is_known and is_known(video.bvid):
+                continue
+            videos.append(video)
+        
+        videos.sort(key=lambda video: video.pubdate or 0, reverse=True)
+        return videos
+    
+    def poll_changes(self, since: Optional[int] = None,
+                     predicate: Optional[Callable[[Video], bool]] = None) -> Optional[List[ChangeEvent]]:
+        """拉取 since 之后满足条件的完整列表（不因已处理的视频停止），返回与上一次快照相比的变更事件
+        
+        拉取失败时返回 None 且快照保持不变，接口故障不会表现为视频被删除、恢复后又重新出现。
+        """
+        try:
+            videos = self.poll(since=since, predicate=predicate)
+        except Exception as e:
+            logger.error(f"Error polling {self!r}: {e}")
+            return None
+        return self.changes.update(videos, since)
+    
+    def __repr__(self):
+        return f"{type(self).__name__}{self.key!r}"
+
+@register_source(BILIBILI)
+class BilibiliSource(VideoSource):
+    """B站UP主投稿或合集/系列；请求预算使用监控器共享的令牌桶和熔断器"""
+    
+    def __init__(self, monitor: BilibiliMonitor, timeout: float = SOURCE_TIMEOUT):
+        super().__init__(None, timeout)
+        self.monitor = monitor
+    
+    @classmethod
+    def from_config(cls, source, monitor: Optional[BilibiliMonitor] = None, **shared) -> 'BilibiliSource':
+        monitor = monitor or BilibiliMonitor(up_uid=source.uid, season_id=source.season_id, series_id=source.series_id)
+        return cls(monitor, source.timeout or SOURCE_TIMEOUT)
+    
+    @property
+    def key(self) -> Tuple:
+        return BILIBILI, str(self.monitor.up_uid), self.monitor.season_id or '', self.monitor.series_id or ''
+    
+    def fetch(self, since: Optional[int] = None) -> Iterable[Video]:
+        return self.monitor.iter_videos(since=since)
+    
+    def normalize(self, entry: Video) -> Video:
+        return entry
+    
+    def poll(self, is_known: Optional[Callable[[str], bool]] = None, since: Optional[int] = None,
+             predicate: Optional[Callable[[Video], bool]] = None) -> List[Video]:
+        # 投稿列表按发布时间倒序分页，遇到已处理的视频即可停止翻页
+        return list(self.monitor.iter_videos(is_known=is_known, since=since, predicate=predicate))
+    
+    def get_detail(self, video: Video) -> Optional[Dict]:
+        return self.monitor.get_video_detail(video.bvid)
+
+class FeedSource(VideoSource):
+    """从URL（经共享HTTP传输层）或本地文件读取的信息源"""
+    
+    def __init__(self, url: str, rate_limit: Optional[float] = FEED_RATE_LIMIT, timeout: float = SOURCE_TIMEOUT,
+                 transport: Optional[HttpTransport] = None):
+        super().__init__(rate_limit, timeout)
+        self.url = url
+        self.transport = transport
+    
+    @classmethod
+    def from_config(cls, source, transport: Optional[HttpTransport] = None, **shared) -> 'FeedSource':
+        rate_limit = source.rate_limit if source.rate_limit is not None else FEED_RATE_LIMIT
+        return cls(source.url, rate_limit, source.timeout or SOURCE_TIMEOUT, transport)
+    
+    @property
+    def key(self) -> Tuple:
+        return self.kind, self.url
+    
+    def _read(self) -> bytes:
+        if self.url.startswith(('http://', 'https://')):
+            transport = self.transport or get_transport()
+            response = transport.send('GET', self.url, timeout=(HTTP_CONNECT_TIMEOUT, self.timeout))
+            response.raise_for_status()
+            return response.content
+        with open(self.url, 'rb') as f:
+            return f.read()
+
+@register_source('rss')
+class RssSource(FeedSource):
+    """RSS 2.0 或 Atom 订阅源"""
+    
+    def fetch(self, since: Optional[int] = None) -> List[Dict]:
+        root = ET.fromstring(self._read())
+        if root.tag == f'{_ATOM}feed':
+            return [self._atom_entry(entry) for entry in root.iter(f'{_ATOM}entry')]
+        return [self._rss_item(item) for item in root.iter('item')]
+    
+    @staticmethod
+    def _rss_item(item) -> Dict:
+        return {
+            'id': item.findtext('guid') or '',
+            'link': item.findtext('link') or '',
+            'title': item.findtext('title') or '',
+            'description': item.findtext('description') or '',
+            'published': item.findtext('pubDate'),
+            'author': item.findtext('author') or item.findtext('{http://purl.org/dc/elements/1.1/}creator') or ''
+        }
+    
+    @staticmethod
+    def _atom_entry(entry) -> Dict:
+        link = entry.find(f'{_ATOM}link[@rel="alternate"]')
+        if link is None:
+            link = entry.find(f'{_ATOM}link')
+        return {
+            'id': entry.findtext(f'{_ATOM}id') or '',
+            'link': link.get('href', '') if link is not None else '',
+            'title': entry.findtext(f'{_ATOM}title') or '',
+            'description': entry.findtext(f'{_ATOM}summary') or entry.findtext(f'{_ATOM}content') or '',
+            'published': entry.findtext(f'{_ATOM}published') or entry.findtext(f'{_ATOM}updated'),
+            'author': entry.findtext(f'{_ATOM}author/{_ATOM}name') or ''
+        }
+    
+    def normalize(self, entry: Dict) -> Video:
+        return Video(
+            bvid=_entry_id(entry['link'], entry['id']),
+            title=entry['title'].strip(),
+            description=entry['description'].strip(),
+            pubdate=_parse_time(entry['published']),
+            author=entry['author'],
+            url=entry['link']
+        )
+
+@register_source('json')
+class JsonFileSource(FeedSource):
+    """JSON条目列表（顶层为数组，或 {"items": [...]}），便于测试和接入自建抓取脚本
+    
+    条目字段：id 或 bvid、title、description、pubdate（时间戳或ISO时间）、url、author。
+    """
+    
+    def fetch(self, since: Optional[int] = None) -> List[Dict]:
+        document = json.loads(self._read())
+        items = document.get('items') if isinstance(document, dict) else document
+        if not isinstance(items, list):
+            raise ValueError(f"{self.url}: expected a list of items")
+        return items
+    
+    def normalize(self, entry: Dict) -> Video:
+        url = entry.get('url') or ''
+        return Video(
+            bvid=entry.get('bvid') or _entry_id(url, str(entry.get('id') or '')),
+            title=entry.get('title') or '',
+            description=entry.get('description') or '',
+            pubdate=_parse_time(entry.get('pubdate')),
+            author=entry.get('author') or '',
+            url=url
+        )
+
+def create_source(source, **shared) -> VideoSource:
+    """按 source.type 创建信息源插件；shared 为可共享的基础设施（monitor、transport）"""
+    cls = SOURCE_TYPES.get(source.type)
+    if cls is None:
+        raise ValueError(f"unknown source type {source.type!r}, expected one of {sorted(SOURCE_TYPES)}")
+    return cls.from_config(source, **shared)
+
+class SourceRegistry:
+    """已配置信息源的并发轮询
+    
+    所有来源共用一个有界线程池（workers 个线程），各自使用自己的限流器，超过来源的 timeout 即放弃本轮结果，
+    因此来源数不超过 workers 时一轮耗时约等于最慢的来源（至多为最大 timeout），而不是所有来源之和。
+    线程无法从外部中断：超时的拉取仍在后台占用一个线程直到其HTTP超时，完成前该来源的后续轮询会被跳过；
+    超时时还在排队、尚未开始的拉取会被取消。线程数因此始终不超过 workers。
+    """
+    
+    def __init__(self, sources: Iterable[VideoSource] = (), workers: int = SOURCE_WORKERS):
+        self.sources: Dict[Tuple, VideoSource] = {}
+        self.workers = max(1, workers)
+        self._stats: Dict[Tuple, Dict] = {}
+        self._running: Dict[Tuple, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        for source in sources:
+            self.add(source)
+    
+    def add(self, source: VideoSource) -> VideoSource:
+        """添加来源；相同 key 的来源已存在时返回已有实例"""
+        with self._lock:
+            if source.key in self.sources:
+                return self.sources[source.key]
+            self.sources[source.key] = source
+            self._stats[source.key] = {'polls': 0, 'errors': 0, 'timeouts': 0, 'skipped': 0, 'videos': 0, 'last_ms': 0.0}
+            return source
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='source')
+        return self._executor
+    
+    def poll(self, since: Optional[int] = None,
+             filters: Optional[Dict[Tuple, Tuple[Optional[Callable], Optional[Callable]]]] = None
+             ) -> Dict[Tuple, Optional[List[Video]]]:
+        """并发拉取所有来源（或 filters 中列出的来源）
+        
+        filters 为 {来源key: (is_known, predicate)}；返回 {来源key: 视频列表}，出错或超时的来源为 None。
+        """
+        keys = list(filters) if filters is not None else list(self.sources)
+        with self._lock:
+            executor = self._get_executor()
+        
+        started = time.monotonic()
+        futures: Dict[Tuple, Future] = {}
+        results: Dict[Tuple, Optional[List[Video]]] = {}
+        for key in keys:
+            previous = self._running.get(key)
+            if previous is not None and not previous.done():
+                logger.warning(f"Source {key} is still running from a previous cycle, skipping")
+                self._stats[key]['skipped'] += 1
+                results[key] = None
+                continue
+            is_known, predicate = filters[key] if filters is not None else (None, None)
+            futures[key] = self._running[key] = executor.submit(self._poll_one, key, since, is_known, predicate)
+        
+        for key, future in futures.items():
+            source = self.sources[key]
+            # 各来源的截止时间从本轮开始计算，依次等待不会累加超时
+            remaining = started + source.timeout - time.monotonic()
+            try:
+                results[key] = future.result(timeout=max(0.0, remaining))
+            except FutureTimeoutError:
+                if future.cancel():
+                    logger.warning(f"Source {key} did not start within {source.timeout}s "
+                                   f"(all {self.workers} workers busy), skipping this cycle")
+                else:
+                    logger.warning(f"Source {key} did not finish within {source.timeout}s, skipping this cycle")
+                self._stats[key]['timeouts'] += 1
+                results[key] = None
+            except Exception as e:
+                logger.error(f"Error polling source {key}: {e}")
+                self._stats[key]['errors'] += 1
+                results[key] = None
+        
+        logger.info(f"Polled {len(futures)} sources in {time.monotonic() - started:.2f}s")
+        return results
+    
+    def _poll_one(self, key: Tuple, since: Optional[int], is_known, predicate) -> List[Video]:
+        start = time.perf_counter()
+        videos = self.sources[key].poll(is_known=is_known, since=since, predicate=predicate)
+        stats = self._stats[key]
+        stats['polls'] += 1
+        stats['videos'] += len(videos)
+        stats['last_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return videos
+    
+    def get_stats(self) -> Dict:
+        """每个来源的拉取次数、错误/超时/跳过次数、上次耗时和列表变更事件统计"""
+        return {':'.join(str(part) for part in key if part): dict(stats, changes=self.sources[key].changes.get_stats())
+                for key, stats in self._stats.items()}
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
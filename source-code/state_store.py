@@ -0,0 +1,484 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from datetime import datetime
+from dedup_index import AvidIndex
+from video import Video
+
+logger = logging.getLogger(__name__)
+
+class FileStateStore:
+    """基于文本文件的状态存储：已处理视频为追加日志，定时推送记录为文本日志
+    
+    去重查询走 AvidIndex：启动时mmap索引镜像，只回放镜像之后追加的日志。
+    """
+    
+    backend = 'file'
+    
+    # 日志中冗余行（重复ID）超过有效记录数的该倍数时触发压缩
+    COMPACT_RATIO = 2.0
+    COMPACT_MIN_LINES = 1000
+    # 镜像之后追加的日志超过该行数时重写索引镜像
+    IMAGE_SAVE_LINES = 1000
+    
+    def __init__(self, processed_videos_file: str, daily_push_log_file: str):
+        self.processed_videos_file = processed_videos_file
+        self.daily_push_log_file = daily_push_log_file
+        self.index_file = f"{os.path.splitext(processed_videos_file)[0]}.idx"
+        self._index = AvidIndex()
+        self._log_lines = 0
+        self._log_offset = 0
+        self._log_inode = None
+        self._image_lines = 0
+        self._loaded = False
+    
+    def _reset_index(self, inode=None):
+        self._index.clear()
+        self._log_lines = 0
+        self._log_offset = 0
+        self._log_inode = inode
+        self._image_lines = 0
+    
+    def _replay_log(self):
+        """回放追加日志：只读取上次位置之后新增的尾部"""
+        try:
+            if not os.path.exists(self.processed_videos_file):
+                self._reset_index()
+                return
+            
+            st = os.stat(self.processed_videos_file)
+            # 文件被其他进程压缩或替换时，从头回放
+            if st.st_ino != self._log_inode or st.st_size < self._log_offset:
+                self._reset_index(st.st_ino)
+            
+            if st.st_size == self._log_offset:
+                return
+            
+            with open(self.processed_videos_file, 'rb') as f:
+                f.seek(self._log_offset)
+                chunk = f.read()
+            
+            # 只消费完整的行，未写完的行留到下次回放
+            complete = chunk.rfind(b'\n') + 1
+            for line in chunk[:complete].decode('utf-8').splitlines():
+                video_id = line.strip()
+                if video_id:
+                    self._index.add(video_id)
+                    self._log_lines += 1
+            self._log_offset += complete
+            
+        except Exception as e:
+            logger.error(f"Error loading processed videos: {e}")
+    
+    def _load_image(self):
+        """mmap加载索引镜像，镜像与日志不匹配时放弃"""
+        index = AvidIndex.load(self.index_file)
+        if index is None or not os.path.exists(self.processed_videos_file):
+            return
+        st = os.stat(self.processed_videos_file)
+        if index.log_inode != st.st_ino or index.log_offset > st.st_size:
+            logger.debug("Dedup index image is stale, rebuilding from log")
+            index.close()
+            return
+        self._index.close()
+        self._index = index
+        self._log_inode = index.log_inode
+        self._log_offset = index.log_offset
+        self._log_lines = index.log_lines
+        self._image_lines = index.log_lines
+    
+    def _save_image(self):
+        """写出当前索引镜像"""
+        try:
+            self._index.log_offset = self._log_offset
+            self._index.log_inode = self._log_inode or 0
+            self._index.log_lines = self._log_lines
+            self._index.save(self.index_file)
+            self._image_lines = self._log_lines
+        except Exception as e:
+            logger.warning(f"Failed to save dedup index image: {e}")
+    
+    def _ensure_loaded(self):
+        """确保内存索引与日志文件同步（仅在文件变化时读取新增部分）"""
+        if not self._loaded:
+            self._load_image()
+            self._replay_log()
+            self._loaded = True
+            if not self._maybe_compact() and self._log_lines - self._image_lines >= self.IMAGE_SAVE_LINES:
+                self._save_image()
+        else:
+            self._replay_log()
+    
+    def _maybe_compact(self) -> bool:
+        """冗余行过多时压缩日志"""
+        redundant = self._log_lines - len(self._index)
+        if self._log_lines >= self.COMPACT_MIN_LINES and redundant > len(self._index) * self.COMPACT_RATIO:
+            self._rewrite_log(self._read_log_ids())
+            return True
+        return False
+    
+    def _read_log_ids(self) -> List[str]:
+        """按写入顺序读取日志中的视频ID（去重）"""
+        if not os.path.exists(self.processed_videos_file):
+            return []
+        with open(self.processed_videos_file, 'r', encoding='utf-8') as f:
+            return list(dict.fromkeys(line.strip() for line in f if line.strip()))
+    
+    def _rewrite_log(self, video_ids: List[str]):
+        """原子地重写日志（临时文件 + rename），并重建索引镜像"""
+        tmp_file = f"{self.processed_videos_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(''.join(f"{video_id}\n" for video_id in video_ids))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.processed_videos_file)
+        
+        st = os.stat(self.processed_videos_file)
+        self._reset_index(st.st_ino)
+        self._index.update(video_ids)
+        self._log_lines = len(video_ids)
+        self._log_offset = st.st_size
+        self._save_image()
+        logger.debug(f"Compacted processed video log to {len(video_ids)} records")
+    
+    def contains(self, video_id: str) -> bool:
+        """检查视频是否已处理"""
+        self._ensure_loaded()
+        return video_id in self._index
+    
+    def add_videos(self, videos: List[Video]):
+        """批量追加视频ID到日志，每批只fsync一次"""
+        self._ensure_loaded()
+        video_ids = [video.bvid for video in videos if video.bvid]
+        new_ids = [vid for vid in dict.fromkeys(video_ids) if vid not in self._index]
+        if not new_ids:
+            return
+        
+        with open(self.processed_videos_file, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{video_id}\n" for video_id in new_ids))
+            f.flush()
+            os.fsync(f.fileno())
+        
+        st = os.stat(self.processed_videos_file)
+        # 仅当期间没有其他进程写入时才直接推进偏移量，否则交给下次回放
+        expected = self._log_offset + sum(len(f"{vid}\n".encode('utf-8')) for vid in new_ids)
+        if self._log_inode in (None, st.st_ino) and st.st_size == expected:
+            self._log_inode = st.st_ino
+            self._log_offset = expected
+            self._index.update(new_ids)
+            self._log_lines += len(new_ids)
+        else:
+            self._replay_log()
+        
+        if self._log_lines - self._image_lines >= self.IMAGE_SAVE_LINES:
+            self._save_image()
+    
+    def processed_ids(self) -> List[str]:
+        """按写入顺序返回所有已处理的视频ID"""
+        return self._read_log_ids()
+    
+    def recent_pubdates(self, limit: int) -> List[int]:
+        """文本日志不记录发布时间"""
+        return []
+    
+    def count(self) -> int:
+        """已处理视频数量"""
+        self._ensure_loaded()
+        return len(self._index)
+    
+    def last_modified(self) -> Optional[float]:
+        """最后一次写入的时间戳"""
+        if os.path.exists(self.processed_videos_file):
+            return os.path.getmtime(self.processed_videos_file)
+        return None
+    
+    def keep_last(self, keep_last_n: int) -> int:
+        """只保留最近写入的N条记录，返回删除的数量"""
+        video_ids = self._read_log_ids()
+        if len(video_ids) <= keep_last_n:
+            return 0
+        self._rewrite_log(video_ids[-keep_last_n:])
+        return len(video_ids) - keep_last_n
+    
+    def is_push_done(self, run_date: str) -> bool:
+        """检查指定日期是否已完成定时推送（只读取日志最后一行）"""
+        if not os.path.exists(self.daily_push_log_file):
+            return False
+        
+        with open(self.daily_push_log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 256))
+            tail = f.read().decode('utf-8', errors='ignore')
+        lines = tail.strip().splitlines()
+        last_line = lines[-1].strip() if lines else ''
+        return run_date in last_line
+    
+    def record_push_run(self, completed_at: datetime, video_count: int = 0):
+        """记录一次完成的定时推送"""
+        os.makedirs(os.path.dirname(self.daily_push_log_file) or '.', exist_ok=True)
+        log_entry = f"{completed_at.strftime('%Y-%m-%d %H:%M:%S')} - Daily push completed\n"
+        with open(self.daily_push_log_file, 'a', encoding='utf-8') as f:
+            f.write(log_entry)
+    
+    def push_run_count(self) -> int:
+        """已记录的定时推送次数"""
+        if not os.path.exists(self.daily_push_log_file):
+            return 0
+        with open(self.daily_push_log_file, 'rb') as f:
+            return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(65536), b''))
+    
+    def reset(self):
+        """清空已处理视频记录"""
+        self._reset_index()
+        for path in (self.processed_videos_file, self.index_file):
+            if os.path.exists(path):
+                os.remove(path)
+    
+    def close(self):
+        """保存索引镜像并释放mmap"""
+        if self._loaded and self._log_lines != self._image_lines:
+            self._save_image()
+        self._index.close()
+
+
+class SQLiteStateStore:
+    """基于SQLite（WAL模式）的状态存储，去重、当日推送和统计均为索引查询"""
+    
+    backend = 'sqlite'
+    
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS videos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL DEFAULT '',
+        bvid TEXT NOT NULL,
+        aid INTEGER,
+        pubdate INTEGER,
+        pushed_at INTEGER NOT NULL,
+        UNIQUE (channel, bvid)
+    );
+    CREATE INDEX IF NOT EXISTS idx_videos_channel_pubdate ON videos (channel, pubdate);
+    CREATE INDEX IF NOT EXISTS idx_videos_channel_pushed_at ON videos (channel, pushed_at);
+    
+    CREATE TABLE IF NOT EXISTS push_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL DEFAULT '',
+        run_date TEXT NOT NULL,
+        completed_at INTEGER NOT NULL,
+        video_count INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_push_runs_channel_date ON push_runs (channel, run_date);
+    
+    -- 按频道维护的计数器，统计查询无需扫描videos表
+    CREATE TABLE IF NOT EXISTS channel_stats (
+        channel TEXT PRIMARY KEY,
+        total_videos INTEGER NOT NULL DEFAULT 0,
+        total_push_runs INTEGER NOT NULL DEFAULT 0,
+        last_pushed_at INTEGER
+    );
+    
+    CREATE TRIGGER IF NOT EXISTS trg_videos_insert AFTER INSERT ON videos BEGIN
+        INSERT OR IGNORE INTO channel_stats (channel) VALUES (NEW.channel);
+        UPDATE channel_stats
+           SET total_videos = total_videos + 1,
+               last_pushed_at = MAX(COALESCE(last_pushed_at, 0), NEW.pushed_at)
+         WHERE channel = NEW.channel;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_videos_delete AFTER DELETE ON videos BEGIN
+        UPDATE channel_stats SET total_videos = total_videos - 1 WHERE channel = OLD.channel;
+    END;
+    CREATE TRIGGER IF NOT EXISTS trg_push_runs_insert AFTER INSERT ON push_runs BEGIN
+        INSERT OR IGNORE INTO channel_stats (channel) VALUES (NEW.channel);
+        UPDATE channel_stats SET total_push_runs = total_push_runs + 1 WHERE channel = NEW.channel;
+    END;
+    
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+    
+    def __init__(self, db_file: str, channel: str = ''):
+        self.db_file = db_file
+        self.channel = channel
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+    
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+    
+    def contains(self, video_id: str) -> bool:
+        """检查视频是否已处理（唯一索引查询）"""
+        row = self._execute(
+            'SELECT 1 FROM videos WHERE channel = ? AND bvid = ? LIMIT 1',
+            (self.channel, video_id)
+        ).fetchone()
+        return row is not None
+    
+    def add_videos(self, videos: List[Video], pushed_at: Optional[int] = None):
+        """批量写入已处理视频，单个事务提交"""
+        pushed_at = int(pushed_at or time.time())
+        rows = [
+            (self.channel, video.bvid, video.aid, _as_timestamp(video.pubdate), pushed_at)
+            for video in videos if video.bvid
+        ]
+        if not rows:
+            return
+        with self._lock:
+            with self._conn:
+                self._conn.execute('BEGIN IMMEDIATE')
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO videos (channel, bvid, aid, pubdate, pushed_at) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+    
+    def processed_ids(self) -> List[str]:
+        """按写入顺序返回所有已处理的视频ID"""
+        rows = self._execute('SELECT bvid FROM videos WHERE channel = ? ORDER BY id', (self.channel,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def recent_pubdates(self, limit: int) -> List[int]:
+        """最近 limit 个已处理视频的发布时间（走 channel+pubdate 索引）"""
+        rows = self._execute(
+            'SELECT pubdate FROM videos WHERE channel = ? AND pubdate IS NOT NULL ORDER BY pubdate DESC LIMIT ?',
+            (self.channel, limit)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def _channel_stats(self) -> Optional[tuple]:
+        return self._execute(
+            'SELECT total_videos, total_push_runs, last_pushed_at FROM channel_stats WHERE channel = ?',
+            (self.channel,)
+        ).fetchone()
+    
+    def count(self) -> int:
+        """已处理视频数量（读取计数器）"""
+        row = self._channel_stats()
+        return row[0] if row else 0
+    
+    def push_run_count(self) -> int:
+        """已记录的定时推送次数（读取计数器）"""
+        row = self._channel_stats()
+        return row[1] if row else 0
+    
+    def last_modified(self) -> Optional[float]:
+        """最后一次写入已处理视频的时间戳"""
+        row = self._channel_stats()
+        return row[2] if row and row[2] else None
+    
+    def keep_last(self, keep_last_n: int) -> int:
+        """只保留最近写入的N条记录，返回删除的数量"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute('BEGIN IMMEDIATE')
+                cursor = self._conn.execute(
+                    'DELETE FROM videos WHERE channel = ? AND id <= ('
+                    '  SELECT id FROM videos WHERE channel = ? ORDER BY id DESC LIMIT 1 OFFSET ?'
+                    ')',
+                    (self.channel, self.channel, keep_last_n)
+                )
+                return cursor.rowcount
+    
+    def is_push_done(self, run_date: str) -> bool:
+        """检查指定日期是否已完成定时推送（索引查询）"""
+        row = self._execute(
+            'SELECT 1 FROM push_runs WHERE channel = ? AND run_date = ? LIMIT 1',
+            (self.channel, run_date)
+        ).fetchone()
+        return row is not None
+    
+    def record_push_run(self, completed_at: datetime, video_count: int = 0):
+        """记录一次完成的定时推送"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT INTO push_runs (channel, run_date, completed_at, video_count) VALUES (?, ?, ?, ?)',
+                    (self.channel, completed_at.strftime('%Y-%m-%d'), int(completed_at.timestamp()), video_count)
+                )
+    
+    def reset(self):
+        """清空当前频道的已处理视频记录"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute('DELETE FROM videos WHERE channel = ?', (self.channel,))
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key: str, value: str):
+        with self._lock:
+            with self._conn:
+                self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+    
+    def migrate_from_files(self, processed_videos_file: str, daily_push_log_file: str, video_cache_file: str) -> Dict:
+        """从旧的文本文件导入状态（每个频道只执行一次，不修改原文件）"""
+        marker = f"migrated_files:{self.channel}"
+        if self.get_meta(marker):
+            return {}
+        
+        result = {'videos': 0, 'push_runs': 0}
+        
+        # video_cache.json 中保留了aid和发布时间，用来补全旧记录
+        cached = {}
+        if os.path.exists(video_cache_file):
+            try:
+                with open(video_cache_file, 'r', encoding='utf-8') as f:
+                    for video in json.load(f):
+                        if isinstance(video, dict) and video.get('bvid'):
+                            cached[video['bvid']] = Video.from_json(video)
+            except Exception as e:
+                logger.warning(f"Failed to read video cache during migration: {e}")
+        
+        if os.path.exists(processed_videos_file):
+            pushed_at = int(os.path.getmtime(processed_videos_file))
+            with open(processed_videos_file, 'r', encoding='utf-8') as f:
+                video_ids = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+            videos = [cached.get(video_id) or Video(video_id) for video_id in video_ids]
+            before = self.count()
+            self.add_videos(videos, pushed_at=pushed_at)
+            result['videos'] = self.count() - before
+        
+        if os.path.exists(daily_push_log_file):
+            with open(daily_push_log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        completed_at = datetime.strptime(line[:19], '%Y-%m-%d %H:%M:%S')
+                    except ValueError:
+                        continue
+                    self.record_push_run(completed_at)
+                    result['push_runs'] += 1
+        
+        self.set_meta(marker, datetime.now().isoformat())
+        if result['videos'] or result['push_runs']:
+            logger.info(f"Migrated legacy state files into {self.db_file}: {result}")
+        return result
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def _as_timestamp(value) -> Optional[int]:
+    """将发布时间统一为整数时间戳"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(float(value))
+        except ValueError:
+            try:
+                return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
+            except ValueError:
+                return None
+    return None
@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from config import (WECHAT_WEBHOOK_URL, BILIBILI_UP_UID, BILIBILI_SEASON_ID, BILIBILI_SERIES_ID,
+                    AI_NEWS_KEYWORDS, DAILY_PUSH_TIME, ENABLE_DAILY_PUSH, SUBSCRIPTIONS_FILE)
+from sources import BILIBILI, SOURCE_TYPES
+from video import Video
+
+logger = logging.getLogger(__name__)
+
+# 名为 default 的订阅使用未分频道的状态（即单订阅部署时的去重记录）
+DEFAULT_SUBSCRIPTION = 'default'
+
+# 订阅名会拼进状态文件名（processed_videos_<频道>.txt 等），只允许字母、数字、下划线和连字符
+_NAME_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,64}')
+_PUSH_TIME_PATTERN = re.compile(r'([01]\d|2[0-3]):[0-5]\d')
+
+class Source:
+    """上游来源配置：B站UP主投稿或其合集(season)/系列(series)，或其他类型的信息源（见 sources.SOURCE_TYPES）
+    
+    url 为 rss/json 来源的地址或本地文件路径；rate_limit（次/秒）和 timeout（秒）未配置时使用全局默认值。
+    """
+    
+    __slots__ = ('uid', 'season_id', 'series_id', 'type', 'url', 'rate_limit', 'timeout')
+    
+    def __init__(self, uid: str = '', season_id: str = '', series_id: str = '', type: str = BILIBILI,
+                 url: str = '', rate_limit: Optional[float] = None, timeout: Optional[float] = None):
+        self.uid = str(uid or '')
+        self.season_id = str(season_id or '')
+        self.series_id = str(series_id or '')
+        self.type = type
+        self.url = url
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+    
+    @property
+    def key(self) -> Tuple[str, ...]:
+        """相同 key 的订阅共享同一次上游拉取"""
+        if self.type == BILIBILI:
+            return BILIBILI, self.uid, self.season_id, self.series_id
+        return self.type, self.url
+    
+    @property
+    def is_collection(self) -> bool:
+        return bool(self.season_id or self.series_id)
+    
+    @property
+    def filters_by_default(self) -> bool:
+        """UP主投稿混有其他内容，未配置关键词时默认按AI早报关键词过滤；合集和其他信息源不过滤"""
+        return self.type == BILIBILI and not self.is_collection
+    
+    def __repr__(self):
+        if self.type == BILIBILI:
+            return f"Source(uid={self.uid!r}, season_id={self.season_id!r}, series_id={self.series_id!r})"
+        return f"Source(type={self.type!r}, url={self.url!r})"
+
+class Subscription:
+    """一个订阅：把某个来源中符合过滤条件的视频推送到一个企业微信webhook
+    
+    每个订阅有独立的去重状态（状态库中的频道）和每日推送时间。
+    keywords 为空列表时不过滤；未配置时，UP主投稿来源默认按AI早报关键词过滤。
+    """
+    
+    def __init__(self, name: str, webhook_url: str, source: Source, keywords: Optional[List[str]] = None,
+                 exclude_keywords: Optional[List[str]] = None, push_time: str = DAILY_PUSH_TIME,
+                 daily_push: bool = ENABLE_DAILY_PUSH):
+        self.name = name
+        self.webhook_url = webhook_url
+        self.source = source
+        if keywords is None:
+            keywords = AI_NEWS_KEYWORDS if source.filters_by_default else []
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.exclude_keywords = [keyword.lower() for keyword in exclude_keywords or []]
+        self.push_time = push_time
+        self.daily_push = daily_push
+    
+    @property
+    def channel(self) -> str:
+        """状态库中的频道名"""
+        return '' if self.name == DEFAULT_SUBSCRIPTION else self.name
+    
+    def matches(self, video: Video) -> bool:
+        """视频标题是否通过本订阅的过滤条件"""
+        title = video.title.lower()
+        if self.keywords and not any(keyword in title for keyword in self.keywords):
+            return False
+        return not any(keyword in title for keyword in self.exclude_keywords)
+    
+    def __repr__(self):
+        return f"Subscription(name={self.name!r}, source={self.source!r}, push_time={self.push_time!r})"
+
+def default_subscription() -> Subscription:
+    """由环境变量（WECHAT_WEBHOOK_URL、BILIBILI_UP_UID 等）构成的单个订阅"""
+    return Subscription(DEFAULT_SUBSCRIPTION, WECHAT_WEBHOOK_URL,
+                        Source(BILIBILI_UP_UID, BILIBILI_SEASON_ID, BILIBILI_SERIES_ID))
+
+def _parse_subscription(entry: Dict, index: int) -> Subscription:
+    if not isinstance(entry, dict):
+        raise ValueError(f"subscriptions[{index}]: expected an object")
+    name = entry.get('name')
+    if not name or not isinstance(name, str):
+        raise ValueError(f"subscriptions[{index}]: 'name' is required")
+    if not _NAME_PATTERN.fullmatch(name):
+        raise ValueError(f"subscriptions[{index}]: invalid name {name!r} "
+                         f"(use up to 64 letters, digits, '_' or '-')")
+    source = entry.get('source') or {}
+    source_type = source.get('type', BILIBILI)
+    if source_type not in SOURCE_TYPES:
+        raise ValueError(f"subscription '{name}': unknown source type {source_type!r}")
+    if source_type == BILIBILI and not source.get('uid'):
+        raise ValueError(f"subscription '{name}': 'source.uid' is required")
+    if source_type != BILIBILI and not source.get('url'):
+        raise ValueError(f"subscription '{name}': 'source.url' is required for {source_type} sources")
+    webhook_url = entry.get('webhook_url')
+    if not webhook_url:
+        raise ValueError(f"subscription '{name}': 'webhook_url' is required")
+    push_time = entry.get('push_time', DAILY_PUSH_TIME)
+    if not isinstance(push_time, str) or not _PUSH_TIME_PATTERN.fullmatch(push_time):
+        raise ValueError(f"subscription '{name}': 'push_time' must be HH:MM, got {push_time!r}")
+    return Subscription(
+        name=name,
+        webhook_url=webhook_url,
+        source=Source(source.get('uid', ''), source.get('season_id', ''), source.get('series_id', ''), source_type,
+                      source.get('url', ''), source.get('rate_limit'), source.get('timeout')),
+        keywords=entry.get('keywords'),
+        exclude_keywords=entry.get('exclude_keywords'),
+        push_time=push_time,
+        daily_push=bool(entry.get('daily_push', ENABLE_DAILY_PUSH))
+    )
+
+def load_subscriptions(path: str = SUBSCRIPTIONS_FILE) -> List[Subscription]:
+    """加载订阅配置；文件不存在时返回由环境变量构成的单个订阅
+    
+    配置格式错误时抛出 ValueError，不会静默忽略。
+    """
+    if not path or not os.path.exists(path):
+        return [default_subscription()]
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    entries = document.get('subscriptions') if isinstance(document, dict) else None
+    if not entries:
+        raise ValueError(f"{path}: no subscriptions defined")
+    
+    subscriptions = [_parse_subscription(entry, index) for index, entry in enumerate(entries)]
+    names = [subscription.name for subscription in subscriptions]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"{path}: duplicate subscription names {duplicates}")
+    
+    sources = len({subscription.source.key for subscription in subscriptions})
+    logger.info(f"Loaded {len(subscriptions)} subscriptions over {sources} distinct sources from {path}")
+    return subscriptions
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+测试按上传时段自适应的轮询
+"""
+
+import sys
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+import pytz
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from adaptive_poller import AdaptivePoller, UploadProfile
+from config import CHECK_INTERVAL, ADAPTIVE_DAILY_BUDGET
+from state_store import SQLiteStateStore
+from video import Video
+
+CHINA = pytz.timezone('Asia/Shanghai')
+
+def _at(day: datetime, minutes: float) -> int:
+    """day 当天（中国时区）第 minutes 分钟的时间戳"""
+    midnight = CHINA.localize(datetime.combine(day.date(), datetime.min.time()))
+    return int((midnight + timedelta(minutes=minutes)).timestamp())
+
+def _uploads(rng, first_day: datetime, days: int):
+    """每天 07:30 前后（标准差8分钟）上传一次"""
+    return [_at(first_day + timedelta(days=d), 450 + rng.gauss(0, 8)) for d in range(days)]
+
+def test_profile_window():
+    """规律上传学到窄窗口；样本不足或上传时间分散时没有窗口"""
+    print("🧪 测试上传时段学习")
+    rng = random.Random(7)
+    day = datetime(2024, 6, 1)
+    profile = UploadProfile(CHINA)
+    for pubdate in _uploads(rng, day, 20):
+        profile.add(pubdate)
+    start, width = profile.window()
+    assert start <= 450 < start + width and width <= 90, (start, width)
+    
+    sparse = UploadProfile(CHINA)
+    for pubdate in _uploads(rng, day, 3):
+        sparse.add(pubdate)
+    assert sparse.window() is None
+    
+    irregular = UploadProfile(CHINA)
+    for d in range(20):
+        irregular.add(_at(day + timedelta(days=d), rng.uniform(0, 1440)))
+    assert irregular.window() is None
+    
+    # 跨零点的窗口
+    midnight = UploadProfile(CHINA)
+    for d in range(10):
+        midnight.add(_at(day + timedelta(days=d), 1435 + (d % 3) * 5))
+    start, width = midnight.window()
+    assert start + width > 1440, (start, width)
+    print("✅ 上传时段学习正常")
+
+def test_delays():
+    """窗口内密集检查，上传后退避，窗口外不睡过窗口开始，预算用完等到次日"""
+    print("🧪 测试检查间隔")
+    rng = random.Random(3)
+    day = datetime(2024, 6, 21)
+    poller = AdaptivePoller(CHINA, min_interval=120, max_interval=6 * 3600, daily_budget=24)
+    poller.observe(_uploads(rng, day - timedelta(days=20), 20))
+    start, end = poller.profile.current_window(CHINA.localize(day))
+    
+    early = start - timedelta(hours=3)
+    delay = poller.next_delay(early)
+    assert 0 < delay <= (start - early).total_seconds()
+    # 剩余预算不足以每2分钟检查到窗口结束时，间隔略微拉长
+    assert 120 <= poller.next_delay(start + timedelta(minutes=1)) < 180
+    
+    poller.observe([int((start + timedelta(minutes=5)).timestamp())])
+    first = poller.next_delay(start + timedelta(minutes=6))
+    second = poller.next_delay(start + timedelta(minutes=6) + timedelta(seconds=first))
+    assert first > 120 and second > first  # 指数退避
+    
+    poller.polls_today = poller.daily_budget
+    late = CHINA.localize(datetime(2024, 6, 21, 20, 0))
+    assert poller.next_delay(late) == 4 * 3600
+    print("✅ 检查间隔正常")
+
+def _simulate(next_delay, uploads, first_day: datetime, days: int):
+    """按 next_delay 轮询 days 天，返回 (平均通知延迟分钟, 每天检查次数)"""
+    now = CHINA.localize(first_day).timestamp()
+    end = now + days * 86400
+    pending = list(uploads)
+    delays = []
+    polls = 0
+    while now < end:
+        polls += 1
+        seen = [pubdate for pubdate in pending if pubdate <= now]
+        for pubdate in seen:
+            delays.append(now - pubdate)
+            pending.remove(pubdate)
+        now += next_delay(now, seen)
+    return sum(delays) / len(delays) / 60, polls / days
+
+def test_budget_spread_after_upload():
+    """窗口内的视频出现后，剩余预算分布到当天结束，当天之后的检查间隔不超过 max_interval"""
+    print("🧪 测试上传后的预算分布")
+    rng = random.Random(5)
+    day = datetime(2024, 6, 21)
+    poller = AdaptivePoller(CHINA, min_interval=120, max_interval=6 * 3600, daily_budget=10)
+    poller.observe(_uploads(rng, day - timedelta(days=20), 20))
+    upload = _at(day, 450)
+    
+    now = CHINA.localize(day).timestamp()
+    day_end = now + 86400
+    seen_at = None
+    polls = []
+    while now < day_end:
+        if seen_at is None and now >= upload:
+            poller.observe([upload])
+            seen_at = now
+        if seen_at is not None:
+            polls.append(now)
+        now += poller.next_delay(datetime.fromtimestamp(now, CHINA))
+    polls.append(now)  # 当天最后一次检查之后的下一次检查
+    
+    gaps = [later - earlier for earlier, later in zip(polls, polls[1:])]
+    assert poller.polls_today <= 10
+    assert max(gaps) <= 6 * 3600, [round(gap / 3600, 1) for gap in gaps]
+    assert polls[-2] >= day_end - 6 * 3600  # 18:00 之后仍在检查
+    print("✅ 上传后的预算分布正常")
+
+def test_time_to_notify():
+    """相同的每日请求预算下，平均通知延迟从半小时降到几分钟"""
+    print("🧪 测试平均通知延迟")
+    rng = random.Random(1)
+    first_day = datetime(2024, 6, 1)
+    history = _uploads(rng, first_day - timedelta(days=20), 20)
+    uploads = _uploads(rng, first_day, 30)
+    
+    poller = AdaptivePoller(CHINA, min_interval=120, max_interval=6 * 3600, daily_budget=24)
+    poller.observe(history)
+    
+    def adaptive(now, seen):
+        poller.observe(seen)
+        return poller.next_delay(datetime.fromtimestamp(now, CHINA))
+    
+    adaptive_delay, adaptive_polls = _simulate(adaptive, uploads, first_day, 30)
+    fixed_delay, fixed_polls = _simulate(lambda now, seen: 3600, uploads, first_day, 30)  # 每天24次
+    print(f"   自适应: {adaptive_delay:.1f} 分钟, {adaptive_polls:.1f} 次/天; 固定1小时: {fixed_delay:.1f} 分钟, {fixed_polls:.1f} 次/天")
+    assert adaptive_polls <= 24
+    assert adaptive_delay < 5 and fixed_delay > 20
+    print("✅ 平均通知延迟正常")
+
+def test_default_budget_matches_fixed_interval():
+    """默认配置下每天的检查次数不超过固定 CHECK_INTERVAL 间隔的次数"""
+    print("🧪 测试默认预算不增加请求量")
+    assert ADAPTIVE_DAILY_BUDGET == max(1, 1440 // CHECK_INTERVAL)
+    rng = random.Random(2)
+    first_day = datetime(2024, 6, 1)
+    poller = AdaptivePoller(CHINA)
+    poller.observe(_uploads(rng, first_day - timedelta(days=20), 20))
+    
+    def adaptive(now, seen):
+        poller.observe(seen)
+        return poller.next_delay(datetime.fromtimestamp(now, CHINA))
+    
+    uploads = _uploads(rng, first_day, 30)
+    adaptive_delay, adaptive_polls = _simulate(adaptive, uploads, first_day, 30)
+    fixed_delay, fixed_polls = _simulate(lambda now, seen: CHECK_INTERVAL * 60, uploads, first_day, 30)
+    print(f"   自适应: {adaptive_delay:.1f} 分钟, {adaptive_polls:.1f} 次/天; "
+          f"固定{CHECK_INTERVAL}分钟: {fixed_delay:.1f} 分钟, {fixed_polls:.1f} 次/天")
+    assert adaptive_polls <= fixed_polls
+    assert adaptive_delay < fixed_delay
+    print("✅ 默认预算不增加请求量")
+
+def test_recent_pubdates_from_state():
+    """上传时段可由状态库中已处理视频的发布时间初始化"""
+    print("🧪 测试从状态库读取发布时间")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStateStore(os.path.join(tmp, 'state.db'), 'team')
+        store.add_videos([Video(f'BV1{i}', pubdate=1700000000 + i) for i in range(5)] + [Video('BV1none')])
+        assert store.recent_pubdates(3) == [1700000004, 1700000003, 1700000002]
+        store.close()
+    print("✅ 从状态库读取发布时间正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试自适应轮询")
+    print("=" * 50)
+    
+    tests = [test_profile_window, test_delays, test_budget_spread_after_upload, test_time_to_notify, test_default_budget_matches_fixed_interval,
+             test_recent_pubdates_from_state]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+测试 asyncio 运行模式（使用本地模拟的Bilibili API服务）
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from async_runtime import AsyncBilibiliMonitor, AsyncWeChatNotifier
+from http_transport import AsyncHttpTransport
+from test_bilibili_monitor import FakeBilibiliServer, _make_monitor, _view_response
+
+def _slow_view(delay):
+    def route(params):
+        time.sleep(delay)
+        return _view_response(params)
+    return route
+
+class SlowNotifier:
+    """模拟响应很慢的webhook，记录每条消息开始发送的时间"""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.started = []
+    
+    def send_text_message(self, content):
+        self.started.append(time.monotonic())
+        time.sleep(self.delay)
+        return True
+
+def _async_monitor(server, tmp):
+    monitor = _make_monitor(server, tmp)
+    http = AsyncHttpTransport(monitor.transport, max_workers=8)
+    return AsyncBilibiliMonitor(monitor, http), http
+
+def test_concurrent_details():
+    """不同视频的详情并发请求，相同 bvid 只请求一次，之后命中缓存"""
+    print("🧪 测试并发获取视频详情")
+    with FakeBilibiliServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.routes['/x/web-interface/view'] = _slow_view(0.3)
+        monitor, http = _async_monitor(server, tmp)
+        monitor.monitor.detail_cache.max_size = 10
+        
+        async def scenario():
+            start = time.monotonic()
+            details = await monitor.get_video_details(['BV1a', 'BV1b', 'BV1a', 'BV1c', 'BV1b'])
+            return details, time.monotonic() - start
+        
+        details, elapsed = asyncio.run(scenario())
+        assert [detail['bvid'] for detail in details] == ['BV1a', 'BV1b', 'BV1a', 'BV1c', 'BV1b']
+        assert server.count('/x/web-interface/view') == 3
+        assert elapsed < 0.8, elapsed  # 串行需要0.9秒以上
+        
+        asyncio.run(monitor.get_video_detail('BV1c'))
+        assert server.count('/x/web-interface/view') == 3
+        http.close()
+    print("✅ 并发获取视频详情正常")
+
+def test_rate_limit_waits_on_loop():
+    """令牌不足时在事件循环中等待，其他协程照常运行"""
+    print("🧪 测试事件循环内限流")
+    with FakeBilibiliServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.routes['/x/web-interface/view'] = _view_response
+        monitor, http = _async_monitor(server, tmp)
+        monitor.monitor.rate_limiter.rate = 10.0
+        monitor.monitor.rate_limiter.burst = 1
+        monitor.monitor.detail_cache.max_size = 10
+        
+        async def scenario():
+            ticks = []
+            
+            async def ticker():
+                for _ in range(5):
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.05)
+            
+            start = time.monotonic()
+            _, details = await asyncio.gather(ticker(), monitor.get_video_details(['BV1a', 'BV1b', 'BV1c', 'BV1d']))
+            return ticks, details, time.monotonic() - start
+        
+        ticks, details, elapsed = asyncio.run(scenario())
+        assert all(detail is not None for detail in details)
+        assert elapsed >= 0.25, elapsed  # 10次/秒，第一个令牌之后每个请求间隔0.1秒
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.4
+        http.close()
+    print("✅ 事件循环内限流正常")
+
+def test_slow_webhook_does_not_block_polling():
+    """webhook 慢时通知按间隔依次发送，同时详情请求不受影响"""
+    print("🧪 测试慢webhook不阻塞轮询")
+    with FakeBilibiliServer() as server, tempfile.TemporaryDirectory() as tmp:
+        server.routes['/x/web-interface/view'] = _view_response
+        monitor, http = _async_monitor(server, tmp)
+        slow = SlowNotifier(0.4)
+        notifier = AsyncWeChatNotifier(slow, min_interval=0.2)
+        
+        async def scenario():
+            sends = asyncio.gather(notifier.send_text_message('a'), notifier.send_text_message('b'))
+            await asyncio.sleep(0.05)
+            start = time.monotonic()
+            detail = await monitor.get_video_detail('BV1a')
+            detail_elapsed = time.monotonic() - start
+            results = await sends
+            return detail, detail_elapsed, results
+        
+        detail, detail_elapsed, results = asyncio.run(scenario())
+        assert detail['bvid'] == 'BV1a'
+        assert detail_elapsed < 0.3, detail_elapsed
+        assert results == [True, True]
+        # 第二条在第一条完成（0.4秒）并间隔0.2秒后才开始
+        assert slow.started[1] - slow.started[0] >= 0.55, slow.started
+        notifier.close()
+        http.close()
+    print("✅ 慢webhook不阻塞轮询")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试 asyncio 运行模式")
+    print("=" * 50)
+    
+    tests = [test_concurrent_details, test_rate_limit_waits_on_loop, test_slow_webhook_does_not_block_polling]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
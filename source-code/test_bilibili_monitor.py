@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+测试Bilibili监控器（使用本地模拟的Bilibili API服务）
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bilibili_monitor import BilibiliMonitor, VideoListError
+from detail_cache import DetailCache
+from list_cache import ListCache
+from video import Video
+from rate_limiter import TokenBucket
+from sources import BilibiliSource
+from circuit_breaker import CircuitBreakerRegistry
+from wbi_signer import WbiSigner, get_mixin_key, sign_params
+
+class FakeBilibiliServer:
+    """本地模拟的Bilibili API，按路径返回预设的JSON并记录请求"""
+    
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+                server.requests.append((parsed.path, params))
+                route = server.routes.get(parsed.path)
+                body = route(params) if route else {'code': -404, 'message': 'not found', 'ttl': 1}
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+    
+    def count(self, path):
+        return sum(1 for request_path, _ in self.requests if request_path == path)
+
+def _view_response(params):
+    bvid = params.get('bvid')
+    return {'code': 0, 'message': '0', 'ttl': 1, 'data': {
+        'aid': 1, 'bvid': bvid, 'title': f'title {bvid}', 'desc': 'desc',
+        'owner': {'mid': 1, 'name': 'up', 'face': ''}, 'stat': {'aid': 1, 'view': 10}
+    }}
+
+def _make_monitor(server, tmp):
+    monitor = BilibiliMonitor(api_base=server.base_url)
+    monitor.rate_limiter.rate = 1000.0
+    monitor.rate_limiter.burst = 1000
+    monitor.list_cache = ListCache(os.path.join(tmp, 'list_cache.json'), ttl=300)
+    monitor.detail_cache = DetailCache(ttl=600, max_size=2, cache_file=os.path.join(tmp, 'detail_cache.json'))
+    monitor.wbi_signer = WbiSigner(monitor.transport, server.base_url, os.path.join(tmp, 'wbi_keys.json'))
+    monitor.breakers = CircuitBreakerRegistry(os.path.join(tmp, 'circuit_breakers.json'))
+    return monitor
+
+class WbiRoutes:
+    """模拟nav接口和需要WBI签名的投稿列表接口"""
+    
+    def __init__(self, img_key, sub_key):
+        self.set_keys(img_key, sub_key)
+    
+    def set_keys(self, img_key, sub_key):
+        self.img_key = img_key
+        self.sub_key = sub_key
+    
+    def nav(self, params):
+        return {'code': -101, 'message': '账号未登录', 'ttl': 1, 'data': {'wbi_img': {
+            'img_url': f'https://i0.hdslb.com/bfs/wbi/{self.img_key}.png',
+            'sub_url': f'https://i0.hdslb.com/bfs/wbi/{self.sub_key}.png'
+        }}}
+    
+    def arc_search(self, params):
+        unsigned = {k: v for k, v in params.items() if k not in ('wts', 'w_rid')}
+        expected = sign_params(unsigned, get_mixin_key(self.img_key, self.sub_key), params.get('wts'))
+        if params.get('w_rid') != expected['w_rid']:
+            return {'code': -352, 'message': '风控校验失败', 'ttl': 1}
+        vlist = [
+            {'bvid': 'BV1aaa', 'aid': 1, 'title': 'AI早报 1', 'created': 1700000000},
+            {'bvid': 'BV1bbb', 'aid': 2, 'title': 'AI早报 2', 'created': 1700086400}
+        ]
+        return {'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+    
+    def install(self, server):
+        server.routes['/x/web-interface/nav'] = self.nav
+        server.routes['/x/space/wbi/arc/search'] = self.arc_search
+
+def test_detail_cache():
+    """同一视频在TTL内只请求一次详情，且跨进程复用磁盘缓存"""
+    print("🧪 测试视频详情缓存")
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        server.routes['/x/web-interface/view'] = _view_response
+        monitor = _make_monitor(server, tmp)
+        
+        assert monitor.get_video_detail('BV1aaa')['title'] == 'title BV1aaa'
+        assert monitor.get_video_detail('BV1aaa')['title'] == 'title BV1aaa'
+        assert server.count('/x/web-interface/view') == 1
+        stats = monitor.get_stats()['detail_cache']
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        
+        # 新实例从磁盘加载缓存，不再发起请求
+        restarted = _make_monitor(server, tmp)
+        assert restarted.get_video_detail('BV1aaa') is not None
+        assert server.count('/x/web-interface/view') == 1
+        
+        # 超出容量时淘汰最久未使用的条目
+        restarted.get_video_detail('BV1bbb')
+        restarted.get_video_detail('BV1ccc')
+        assert restarted.detail_cache.get_stats()['evictions'] == 1
+        restarted.get_video_detail('BV1aaa')
+        assert server.count('/x/web-interface/view') == 4
+    print("✅ 视频详情缓存正常")
+
+def test_rate_limiter():
+    """多个进程（各自打开状态文件）和线程共享同一个令牌桶预算"""
+    print("🧪 测试令牌桶限流")
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = os.path.join(tmp, 'rate_limit.state')
+        buckets = [TokenBucket(rate=20, burst=2, state_file=state_file) for _ in range(2)]
+        
+        # 突发额度内不等待
+        assert buckets[0].acquire() == 0 and buckets[1].acquire() == 0
+        
+        # 额度用完后，两个桶合计 12 个请求至少需要 12 / 20 秒
+        start = time.time()
+        threads = [threading.Thread(target=lambda b=b: [b.acquire() for _ in range(3)])
+                   for b in buckets for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.time() - start
+        assert 0.55 <= elapsed < 2, elapsed
+        assert sum(b.get_stats()['acquired'] for b in buckets) == 14
+        
+        for bucket in buckets:
+            bucket.close()
+    print("✅ 令牌桶限流正常")
+
+def test_single_flight():
+    """并发请求同一视频详情时只发出一次请求，其余调用共享结果"""
+    print("🧪 测试并发请求合并")
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        def slow_view(params):
+            time.sleep(0.3)
+            return _view_response(params)
+        server.routes['/x/web-interface/view'] = slow_view
+        monitor = _make_monitor(server, tmp)
+        
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(monitor.get_video_detail('BV1aaa'))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(results) == 5 and all(r['title'] == 'title BV1aaa' for r in results)
+        assert server.count('/x/web-interface/view') == 1
+        assert monitor.get_stats()['single_flight']['saved'] == 4
+        assert monitor.get_stats()['single_flight']['in_flight'] == 0
+    print("✅ 并发请求合并正常")
+
+def test_list_cache():
+    """列表缓存按分页参数区分，内容不变时不重写文件，写入是原子的"""
+    print("🧪 测试视频列表缓存")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'list_cache.json')
+        cache = ListCache(cache_file, ttl=300)
+        probe_key = ListCache.make_key('list', '42', 1, 1)
+        page_key = ListCache.make_key('list', '42', 1, 20)
+        videos = [{'bvid': f'BV1{i}', 'title': f'AI早报 {i}'} for i in range(20)]
+        
+        cache.put(page_key, videos)
+        cache.put(probe_key, videos[:1])
+        assert cache.get(page_key) == videos and cache.get(probe_key) == videos[:1]
+        assert cache.get(ListCache.make_key('list', '43', 1, 20)) is None
+        
+        # 内容未变化：跳过磁盘写入，但刷新新鲜度
+        mtime = os.stat(cache_file).st_mtime_ns
+        cache.put(page_key, [dict(video) for video in videos])
+        assert cache.get_stats()['writes'] == 2 and cache.get_stats()['skipped_writes'] == 1
+        assert os.stat(cache_file).st_mtime_ns == mtime
+        assert not os.path.exists(f"{cache_file}.tmp")
+        
+        # 另一个进程读取同一文件；过期后只在兜底时返回
+        other = ListCache(cache_file, ttl=0)
+        assert other.get(page_key) is None
+        assert other.get(page_key, allow_stale=True) == videos
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            assert '\n' not in f.read()
+    print("✅ 视频列表缓存正常")
+
+def test_video_record():
+    """Video 只有一个发布时间字段，序列化后可还原，兼容旧缓存格式"""
+    print("🧪 测试Video记录类型")
+    item = {'bvid': 'BV1aaa', 'aid': 1, 'title': 'AI早报', 'created': 1700000000, 'play': '--', 'length': '05:00'}
+    video = Video.from_api(item, '42')
+    assert video.pubdate == 1700000000 and video.play == 0 and video.mid == '42'
+    assert video.video_url == 'https://www.bilibili.com/video/BV1aaa'
+    assert not hasattr(video, '__dict__')
+    assert Video.from_json(json.loads(json.dumps(video.to_json()))) == video
+    assert 'created' not in video.to_json()
+    
+    legacy = {'bvid': 'BV1aaa', 'title': 'AI早报', 'created': 1700000000, 'video_url': 'x'}
+    assert Video.from_json(legacy).pubdate == 1700000000
+    print("✅ Video记录类型正常")
+
+def test_wbi_sign_vector():
+    """WBI签名与公开文档中的示例一致"""
+    print("🧪 测试WBI签名算法")
+    mixin_key = get_mixin_key('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45')
+    assert mixin_key == 'ea1db124af3c7062474693fa704f4ff8'
+    signed = sign_params({'foo': '114', 'bar': '514', 'zab': 1919810}, mixin_key, wts=1702204169)
+    assert signed['w_rid'] == '8f6f2b5b3d485fe1886cec6a0be8c5d4'
+    print("✅ WBI签名算法正常")
+
+def test_wbi_signed_primary_api():
+    """签名后的主接口一次成功，不再回退到备用接口；密钥轮换后自动刷新"""
+    print("🧪 测试WBI签名的主接口请求")
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        routes = WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45')
+        routes.install(server)
+        monitor = _make_monitor(server, tmp)
+        
+        videos = monitor.get_latest_videos(10)
+        assert [video.bvid for video in videos] == ['BV1aaa', 'BV1bbb']
+        assert server.count('/x/space/wbi/arc/search') == 1
+        assert server.count('/x/space/arc/search') == 0
+        assert server.count('/x/web-interface/nav') == 1
+        
+        # 新进程复用磁盘上的mixin key
+        monitor.list_cache.clear()
+        restarted = _make_monitor(server, tmp)
+        assert len(restarted.get_latest_videos(10)) == 2
+        assert server.count('/x/web-interface/nav') == 1
+        
+        # 密钥轮换：签名被拒后刷新密钥并重试一次
+        routes.set_keys('0' * 32, 'f' * 32)
+        restarted.list_cache.clear()
+        assert len(restarted.get_latest_videos(10)) == 2
+        assert server.count('/x/web-interface/nav') == 2
+        assert server.count('/x/space/wbi/arc/search') == 4
+        assert server.count('/x/space/arc/search') == 0
+    print("✅ WBI签名的主接口请求正常")
+
+def test_circuit_breaker():
+    """主接口持续失败后熔断，直接走备用接口；熔断超时后探测恢复"""
+    print("🧪 测试接口熔断")
+    primary, alternative = '/x/space/wbi/arc/search', '/x/space/arc/search'
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        routes = WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45')
+        routes.install(server)
+        server.routes[primary] = lambda params: {'code': -799, 'message': '请求过于频繁', 'ttl': 1}
+        server.routes[alternative] = lambda params: {'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': [
+            {'bvid': 'BV1alt', 'aid': 3, 'title': 'AI早报 3', 'created': 1700000000}]}}}
+        monitor = _make_monitor(server, tmp)
+        monitor.list_cache.ttl = -1  # 每次都请求接口
+        
+        for _ in range(3):
+            assert [video.bvid for video in monitor.get_latest_videos(10)] == ['BV1alt']
+        assert server.count(primary) == 3
+        
+        # 熔断后不再请求主接口，状态对其他进程（--mode status）可见
+        monitor.get_latest_videos(10)
+        assert server.count(primary) == 3 and server.count(alternative) == 4
+        stats = CircuitBreakerRegistry(os.path.join(tmp, 'circuit_breakers.json')).get_stats()
+        assert stats['primary']['state'] == 'open' and stats['alternative']['state'] == 'closed'
+        
+        # 熔断超时后先探测主接口，成功即恢复
+        server.routes[primary] = routes.arc_search
+        monitor.breakers.get('primary').opened_at -= monitor.breakers.reset_timeout
+        assert [video.bvid for video in monitor.get_latest_videos(10)] == ['BV1aaa', 'BV1bbb']
+        assert server.count(primary) == 4 and server.count(alternative) == 4
+        assert monitor.get_stats()['circuit_breakers']['primary']['state'] == 'closed'
+        monitor.get_latest_videos(10)
+        assert server.count(primary) == 5
+    print("✅ 接口熔断正常")
+
+def _season_route(archives):
+    """按 page_num/page_size 分页返回合集成员"""
+    def route(params):
+        page_num = int(params['page_num'])
+        page_size = int(params['page_size'])
+        page = archives[(page_num - 1) * page_size:page_num * page_size]
+        return {'code': 0, 'message': '0', 'ttl': 1, 'data': {
+            'archives': page,
+            'page': {'page_num': page_num, 'page_size': page_size, 'total': len(archives)}
+        }}
+    return route
+
+def test_collection_source():
+    """配置合集后只拉取合集成员，支持分页，失败时回退到关键词筛选"""
+    print("🧪 测试合集视频获取")
+    archives = [
+        {'aid': i, 'bvid': f'BV1col{i}', 'title': f'第{i}期', 'pubdate': 1700000000 - i * 86400,
+         'duration': 125, 'stat': {'view': 100}}
+        for i in range(1, 6)
+    ]
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        server.routes['/x/polymer/web-space/seasons_archives_list'] = _season_route(archives)
+        WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+        monitor = _make_monitor(server, tmp)
+        monitor.season_id = '42'
+        
+        # 标题中没有关键词也会被视为AI早报
+        videos = monitor.get_ai_news_videos()
+        assert [video.bvid for video in videos] == [a['bvid'] for a in archives]
+        assert videos[0].length == '02:05' and videos[0].pubdate == archives[0]['pubdate']
+        assert server.count('/x/space/wbi/arc/search') == 0
+        
+        # 分页直到取完
+        paged = monitor.get_collection_videos(page_size=2, max_pages=10)
+        assert len(paged) == 5
+        assert server.count('/x/polymer/web-space/seasons_archives_list') == 1 + 3
+        
+        # 合集接口失败时回退到关键词筛选
+        server.routes['/x/polymer/web-space/seasons_archives_list'] = lambda params: {'code': -400, 'message': 'bad', 'ttl': 1}
+        fallback = monitor.get_ai_news_videos()
+        assert [video.bvid for video in fallback] == ['BV1aaa', 'BV1bbb']
+        
+        # 逐页获取（调度器和来源插件使用的路径）同样回退，合集为空时也回退
+        assert [video.bvid for video in monitor.iter_ai_news_videos()] == ['BV1aaa', 'BV1bbb']
+        assert [video.bvid for video in BilibiliSource(monitor).poll()] == ['BV1aaa', 'BV1bbb']
+        monitor.breakers = CircuitBreakerRegistry(os.path.join(tmp, 'circuit_breakers_2.json'))  # 上面的失败已使合集接口熔断
+        server.routes['/x/polymer/web-space/seasons_archives_list'] = _season_route([])
+        assert [video.bvid for video in monitor.iter_videos()] == ['BV1aaa', 'BV1bbb']
+        
+        # 关闭回退时只使用合集：为空时没有视频，失败时抛出异常（与空列表区分）
+        monitor.keyword_fallback = False
+        assert list(monitor.iter_ai_news_videos()) == []
+        server.routes['/x/polymer/web-space/seasons_archives_list'] = lambda params: {'code': -400, 'message': 'bad', 'ttl': 1}
+        try:
+            list(monitor.iter_ai_news_videos())
+            assert False, "collection failure should raise"
+        except VideoListError:
+            pass
+    print("✅ 合集视频获取正常")
+
+def test_iter_videos():
+    """逐页获取在遇到已处理视频或时间截止点时立即停止"""
+    print("🧪 测试增量分页获取")
+    archives = [
+        {'aid': i, 'bvid': f'BV1col{i}', 'title': f'第{i}期', 'pubdate': 1700000000 - i * 86400}
+        for i in range(1, 26)
+    ]
+    path = '/x/polymer/web-space/seasons_archives_list'
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        server.routes[path] = _season_route(archives)
+        monitor = _make_monitor(server, tmp)
+        monitor.season_id = '42'
+        
+        # 首次运行（无已处理记录）会翻到最后一页
+        assert len(list(monitor.iter_ai_news_videos(page_size=10))) == 25
+        assert server.count(path) == 3
+        
+        # 常规轮询：前两个视频是新的，第三个已处理，只请求一页
+        known = {a['bvid'] for a in archives[2:]}
+        new = list(monitor.iter_ai_news_videos(is_known=known.__contains__, page_size=10))
+        assert [video.bvid for video in new] == ['BV1col1', 'BV1col2']
+        assert server.count(path) == 4
+        
+        # 追赶：已处理的视频在第二页
+        known = {a['bvid'] for a in archives[12:]}
+        assert len(list(monitor.iter_ai_news_videos(is_known=known.__contains__, page_size=10))) == 12
+        assert server.count(path) == 6
+        
+        # 发布时间截止
+        since = archives[4]['pubdate']
+        assert len(list(monitor.iter_ai_news_videos(since=since, page_size=10))) == 5
+        assert server.count(path) == 7
+        
+        # 生成器是惰性的：只取第一个视频时只请求一页
+        next(monitor.iter_ai_news_videos(page_size=10))
+        assert server.count(path) == 8
+    print("✅ 增量分页获取正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试Bilibili监控器")
+    print("=" * 50)
+    
+    tests = [test_detail_cache, test_rate_limiter, test_single_flight, test_list_cache, test_video_record,
+             test_wbi_sign_vector, test_wbi_signed_primary_api, test_collection_source,
+             test_circuit_breaker, test_iter_videos]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from content_summarizer import ContentSummarizer
+from video import Video
 
 def test_bullet_points():
     """测试bullet points格式化功能"""
@@ -97,9 +98,10 @@ def test_summary_generation():
     summarizer = ContentSummarizer()
     
     # 模拟视频数据
-    test_video = {
-        'title': '【AI 早报 2025-09-25】Google AI Pro和Ultra订阅用户的Gemini CLI限额提升',
-        'description': """今日AI早报内容：
+    test_video = Video(
+        bvid='BV1N3n4zpEk2',
+        title='【AI 早报 2025-09-25】Google AI Pro和Ultra订阅用户的Gemini CLI限额提升',
+        description="""今日AI早报内容：
         
         Google AI更新: 09:30
         Google发布了新的AI Pro和Ultra订阅服务，为Gemini CLI用户提供更高的API限额，Pro用户每分钟可调用1500次，Ultra用户无限制调用。
@@ -111,12 +113,11 @@ def test_summary_generation():
         微软发布Copilot Studio，让企业用户能够自定义AI助手，集成到现有工作流程中。
         
         Meta AI进展: 14:30
-        Meta发布了新的Code Llama模型，专门优化代码生成任务，在编程测试中表现优异。""",
-        'video_url': 'https://www.bilibili.com/video/BV1N3n4zpEk2'
-    }
+        Meta发布了新的Code Llama模型，专门优化代码生成任务，在编程测试中表现优异。"""
+    )
     
     test_video_detail = {
-        'description': test_video['description'],
+        'description': test_video.description,
         'tags': ['AI', '人工智能', '科技资讯', 'Google', 'OpenAI']
     }
     
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+测试内容概要的条目切分：流式切分与原先的实现（每条用 time_matches.index 找下一处匹配，切分完再截断）输出完全一致
+"""
+
+import sys
+import os
+import re
+import types
+import random
+from itertools import islice
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import content_summarizer
+from content_summarizer import ContentSummarizer, MAX_BULLET_ENTRIES, clean_description_text, iter_time_bullets
+
+def legacy_clean_description(description: str) -> str:
+    """原 _clean_description 的切分与格式化（清理步骤相同）"""
+    clean_text = clean_description_text(description)
+    time_pattern = r'([^:\n]+):\s*(\d{1,2}:\d{2}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}月\d{1,2}日|\d{1,2}/\d{1,2}|\d{1,2}-\d{1,2}|今天|昨天|明天|本周|上周|下周)'
+    time_matches = list(re.finditer(time_pattern, clean_text))
+    bullet_points = []
+    if time_matches:
+        for match in time_matches:
+            title_part = match.group(1).strip()
+            time_part = match.group(2).strip()
+            next_match_start = time_matches[time_matches.index(match) + 1].start() if time_matches.index(match) + 1 < len(time_matches) else len(clean_text)
+            content_part = clean_text[match.end():next_match_start].strip()
+            if title_part and content_part:
+                content_part = re.sub(r'\s+', ' ', content_part)
+                entry = f"{title_part} ({time_part}): {content_part}"
+            elif title_part:
+                entry = f"{title_part} ({time_part})"
+            else:
+                continue
+            if len(entry.strip()) > 10:
+                bullet_points.append(entry.strip())
+    if not bullet_points:
+        for para in clean_text.split('\n'):
+            para = para.strip()
+            if para and len(para) > 10:
+                if not re.match(r'^[^\w\u4e00-\u9fff]*$', para):
+                    bullet_points.append(para)
+    if not bullet_points:
+        for line in clean_text.split('\n'):
+            line = line.strip()
+            if line and len(line) > 3 and not re.match(r'^[^\w\u4e00-\u9fff]*$', line):
+                bullet_points.append(line)
+    if bullet_points:
+        bullet_points = bullet_points[:8]
+        formatted_points = []
+        for point in bullet_points:
+            if len(point) > 200:
+                point = point[:197] + "..."
+            formatted_points.append(f"• {point}")
+        return '\n'.join(formatted_points)
+    return ''
+
+CASES = [
+    "今日AI早报内容概要：\n\nGoogle AI更新: 09:30\nGoogle发布了新的AI Pro和Ultra订阅服务。\n\nOpenAI ChatGPT更新: 10:15  \n",
+    "本周AI资讯汇总：\n\nMeta AI发布: 9月23日\nMeta发布了新的Code Llama模型。\nAnthropic Claude更新: 9月24日",
+    "AI早报主要内容包括：\n人工智能技术的最新发展动态\n各大科技公司的AI产品更新",
+    "重要AI新闻: 今天\n各大公司都在加速AI发展\n\nGoogle发布Gemini: 08:30\n新版本大幅提升性能",
+    ": 10:15 只有时间没有标题",
+    "短: 1/2",                                   # 太短的条目被过滤，退回按段落分割
+    "A: 2025-09-25 " + "很长的内容" * 60,       # 超过200字符的条目被截断
+    "!!! ???",
+    "",
+]
+
+def test_matches_legacy():
+    """固定用例、随机拼接和超过条目上限的长描述，输出与原实现逐字相同"""
+    print("🧪 测试条目切分与原实现一致")
+    summarizer = ContentSummarizer()
+    for case in CASES:
+        assert summarizer._clean_description(case) == legacy_clean_description(case), case
+    
+    atoms = [
+        'Google AI更新', 'Meta', '发布', ': ', ':', ' ', '\n', '⬛', '09:30', '9月23日', '2025-09-25', '3/4', '12-01',
+        '今天', '上周', '新版本大幅提升性能', '!!', '收起', 'https://a.b/c', 'BV1x', 'A', '短'
+    ]
+    rng = random.Random(25)
+    for _ in range(3000):
+        text = ''.join(rng.choice(atoms) for _ in range(rng.randrange(1, 40)))
+        assert summarizer._clean_description(text) == legacy_clean_description(text), repr(text)
+    
+    long_description = ''.join(f"⬛ 第{i}条资讯: {i % 24:02d}:{i % 60:02d} 内容{i}" for i in range(500))
+    result = summarizer._clean_description(long_description)
+    assert result == legacy_clean_description(long_description)
+    assert result.count('• ') == MAX_BULLET_ENTRIES
+    print("✅ 条目切分与原实现一致")
+
+class _CountingPattern:
+    """记录 finditer 实际产出了多少处匹配"""
+    
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.consumed = 0
+    
+    def finditer(self, text):
+        for match in self.pattern.finditer(text):
+            self.consumed += 1
+            yield match
+
+def test_stops_after_max_entries():
+    """条目惰性产出，取够条目后不再扫描剩余文本"""
+    print("🧪 测试取够条目后停止扫描")
+    bullets = iter_time_bullets("新闻一: 09:30 内容一 新闻二: 10:15 内容二")
+    assert isinstance(bullets, types.GeneratorType)
+    assert next(bullets) == "新闻一 (09:30)"
+    assert next(bullets) == "内容一 新闻二 (10:15): 内容二"
+    
+    # 只多读一处匹配（用来确定第8条内容的结尾），其余文本不再扫描
+    counting = _CountingPattern(content_summarizer._TIME_PATTERN)
+    saved = content_summarizer._TIME_PATTERN
+    content_summarizer._TIME_PATTERN = counting
+    try:
+        text = ''.join(f"第{i}条资讯: 09:{i % 60:02d} 内容 " for i in range(100000))
+        entries = list(islice(iter_time_bullets(text), MAX_BULLET_ENTRIES))
+    finally:
+        content_summarizer._TIME_PATTERN = saved
+    # 时间之后的文字被下一条的标题吞并（与原实现相同）
+    assert entries[:2] == ["第0条资讯 (09:00)", "内容 第1条资讯 (09:01)"] and len(entries) == MAX_BULLET_ENTRIES
+    assert counting.consumed == MAX_BULLET_ENTRIES + 1, counting.consumed
+    print("✅ 取够条目后停止扫描")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试内容概要条目切分")
+    print("=" * 50)
+    
+    tests = [test_matches_legacy, test_stops_after_max_entries]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+测试每日推送预热（使用本地模拟的Bilibili API服务）
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import AINewsScheduler, prewarm_time
+from subscriptions import Source, Subscription
+from test_bilibili_monitor import FakeBilibiliServer, WbiRoutes, _make_monitor, _view_response
+from test_subscriptions import RecordingNotifier
+
+def test_prewarm_time():
+    """预热时刻按推送时间提前，可跨零点"""
+    print("🧪 测试预热时刻计算")
+    assert prewarm_time('09:30', 10) == '09:20'
+    assert prewarm_time('00:05', 10) == '23:55'
+    assert prewarm_time('09:30', 0) is None
+    print("✅ 预热时刻计算正常")
+
+def test_prewarm_then_push():
+    """预热时获取详情并生成摘要，推送时只补查晚到的视频，再按顺序发送"""
+    print("🧪 测试预热与推送")
+    now = int(time.time())
+    vlist = [
+        {'bvid': 'BV1early1', 'aid': 1, 'title': 'AI早报 第一期', 'created': now - 60},
+        {'bvid': 'BV1early2', 'aid': 2, 'title': 'AI早报 第二期', 'created': now - 120}
+    ]
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)  # 状态库位于相对路径 data/ 下
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/space/wbi/arc/search'] = lambda params: {
+                'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+            server.routes['/x/web-interface/view'] = _view_response
+            
+            # 推送时间设在今天最晚的时刻，使当前时间落在推送窗口内
+            subscription = Subscription('morning', 'https://example.com/a', Source('1'), push_time='23:59')
+            scheduler = AINewsScheduler(subscription, _make_monitor(server, tmp))
+            notifier = scheduler.wechat_notifier = RecordingNotifier()
+            
+            assert scheduler.prewarm_daily_push() == 2
+            assert server.count('/x/web-interface/view') == 2
+            assert notifier.summaries == []  # 预热只暂存，不发送
+            
+            # 预热之后又发布了一个视频：推送时只为它请求详情
+            vlist.insert(0, {'bvid': 'BV1late', 'aid': 3, 'title': 'AI早报 加更', 'created': now - 1})
+            scheduler.daily_push_check()
+            assert server.count('/x/space/wbi/arc/search') == 2
+            assert server.count('/x/web-interface/view') == 3
+            bvids = ['BV1late', 'BV1early1', 'BV1early2']
+            assert [bvid for summary in notifier.summaries for bvid in bvids if bvid in summary] == bvids
+            
+            report = scheduler.last_push
+            assert report['messages'] == 3 and report['staged'] == 2 and report['late'] == 1
+            assert report['first_latency_s'] is not None and report['last_latency_s'] >= report['first_latency_s']
+            assert any('推送延迟' in text for text in notifier.texts)
+            
+            # 已推送的日期不再预热，也不重复发送
+            assert scheduler.prewarm_daily_push() == 0
+            scheduler.daily_push_check()
+            assert len(notifier.summaries) == 3
+        finally:
+            os.chdir(cwd)
+    print("✅ 预热与推送正常")
+
+def test_push_reaches_window_start():
+    """实时检查只处理当天的视频：推送窗口内已处理视频之后（更早）的视频仍需预热和推送"""
+    print("🧪 测试推送遍历到窗口起点")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/web-interface/view'] = _view_response
+            subscription = Subscription('morning', 'https://example.com/a', Source('1'), push_time='23:59')
+            scheduler = AINewsScheduler(subscription, _make_monitor(server, tmp))
+            notifier = scheduler.wechat_notifier = RecordingNotifier()
+            
+            # 昨天20:00发布、当天没有检查到的视频，和今天早上已被实时检查处理的视频
+            midnight = int(scheduler._today_start().timestamp())
+            vlist = [
+                {'bvid': 'BV1today', 'aid': 1, 'title': 'AI早报 今天', 'created': midnight + 8 * 3600},
+                {'bvid': 'BV1yesterday', 'aid': 2, 'title': 'AI早报 昨晚', 'created': midnight - 4 * 3600}
+            ]
+            server.routes['/x/space/wbi/arc/search'] = lambda params: {
+                'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+            scheduler.data_manager.mark_videos_as_processed(scheduler.bilibili_monitor._format_videos(vlist[:1]))
+            
+            # 预热同样遍历到窗口起点，暂存已处理视频之后的视频
+            assert scheduler.prewarm_daily_push() == 1 and list(scheduler._staged) == ['BV1yesterday']
+            scheduler.daily_push_check()
+            assert notifier.sent(['BV1today', 'BV1yesterday']) == ['BV1yesterday']
+            assert scheduler.last_push['staged'] == 1 and scheduler.last_push['late'] == 0
+        finally:
+            os.chdir(cwd)
+    print("✅ 推送遍历到窗口起点")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试每日推送预热")
+    print("=" * 50)
+    
+    tests = [test_prewarm_time, test_prewarm_then_push, test_push_reaches_window_start]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
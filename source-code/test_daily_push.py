@@ -13,6 +13,7 @@ import pytz
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from scheduler import AINewsScheduler
+from video import Video
 from config import CHINA_TIMEZONE, DAILY_PUSH_TIME, ENABLE_DAILY_PUSH
 
 def setup_logging():
@@ -51,16 +52,8 @@ def test_video_time_filtering():
     
     # 模拟视频数据
     mock_videos = [
-        {
-            'bvid': 'BV1test1',
-            'title': '测试视频1',
-            'created': int(datetime.now().timestamp()) - 3600,  # 1小时前
-        },
-        {
-            'bvid': 'BV1test2', 
-            'title': '测试视频2',
-            'created': int(datetime.now().timestamp()) - 86400,  # 1天前
-        }
+        Video('BV1test1', title='测试视频1', pubdate=int(datetime.now().timestamp()) - 3600),  # 1小时前
+        Video('BV1test2', title='测试视频2', pubdate=int(datetime.now().timestamp()) - 86400)  # 1天前
     ]
     
     # 测试时间筛选
@@ -68,8 +61,8 @@ def test_video_time_filtering():
     print(f"找到 {len(daily_videos)} 个适合定时推送的视频")
     
     for video in daily_videos:
-        created_time = datetime.fromtimestamp(video['created'], tz=scheduler.china_tz)
-        print(f"  - {video['title']} (发布于: {created_time.strftime('%Y-%m-%d %H:%M:%S')})")
+        created_time = datetime.fromtimestamp(video.pubdate, tz=scheduler.china_tz)
+        print(f"  - {video.title} (发布于: {created_time.strftime('%Y-%m-%d %H:%M:%S')})")
     
     return True
 
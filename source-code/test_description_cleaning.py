@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+测试描述清理引擎：与原先的逐步清理（每次调用编译正则、多次 re.sub 和逐个 str.replace）结果完全一致
+"""
+
+import sys
+import os
+import re
+import random
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import content_summarizer
+from content_summarizer import UNWANTED_PHRASES, clean_description_text
+
+def legacy_clean(clean_text: str) -> str:
+    """原 _clean_description 中的清理步骤（不含HTML解析）"""
+    clean_text = clean_text.replace('⬛', '\n\n')
+    emoji_pattern = re.compile(
+        "["
+        "\U0001F600-\U0001F64F"
+        "\U0001F300-\U0001F5FF"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F1E0-\U0001F1FF"
+        "\U0001F900-\U0001F9FF"
+        "\U0001FA70-\U0001FAFF"
+        "\U00002600-\U000026FF"
+        "\U00002700-\U000027BF"
+        "\U0001F000-\U0001F02F"
+        "\U0001F0A0-\U0001F0FF"
+        "]+", flags=re.UNICODE)
+    clean_text = emoji_pattern.sub('', clean_text)
+    clean_text = re.sub(r'https?://[^\s\n\r\t]+', ' ', clean_text)
+    clean_text = re.sub(r'www\.[^\s\n\r\t]+', ' ', clean_text)
+    clean_text = re.sub(r'\S+@\S+\.\S+', ' ', clean_text)
+    clean_text = re.sub(r'BV[0-9A-Za-z]+', ' ', clean_text)
+    clean_text = re.sub(r'av[0-9]+', ' ', clean_text)
+    clean_text = re.sub(r'\s+', ' ', clean_text)
+    for phrase in UNWANTED_PHRASES:
+        clean_text = clean_text.replace(phrase, '')
+    return clean_text
+
+# 覆盖 test_bullet_points.py 中的各类描述，以及链接/短语互相嵌套的边界情况
+CASES = [
+    "今日AI早报内容概要：\n\nGoogle AI更新: 09:30\nGoogle发布了新的AI Pro和Ultra订阅服务。\n\nOpenAI ChatGPT更新: 10:15  \n",
+    "本周AI资讯汇总：\n\nMeta AI发布: 9月23日\nMeta发布了新的Code Llama模型。",
+    "🚀 AI早报 ⬛ 详情：https://example.com/a?b=1 ⬛ 联系 me@example.com 🎉 BV1N3n4zpEk2 av170001",
+    "点击查看更多精彩内容",        # 短语重叠：逐个替换的结果取决于短语顺序
+    "查看更收起多",                # 删除“收起”后拼出“查看更多”
+    "复制链接：www.example.com",
+    "分享链接：http://b23.tv/abc 点击展开全部 收起",
+    "xhttp://a@b.c foo@https://a.b.c BV BV1 av avx Java8",
+    "关注我们 订阅频道 网址： 地址： 官网：",
+    "",
+]
+
+def test_phrases_are_prefix_free():
+    """单次扫描依赖于没有短语是另一个短语的前缀"""
+    print("🧪 测试无用短语互不为前缀")
+    for phrase in UNWANTED_PHRASES:
+        assert not any(other != phrase and other.startswith(phrase) for other in UNWANTED_PHRASES), phrase
+    print("✅ 无用短语互不为前缀")
+
+def test_fast_paths_cover_patterns():
+    """str.split 的空白与 \\s 一致；emoji 外包范围覆盖精确模式的所有字符"""
+    print("🧪 测试快速路径与原正则的字符集一致")
+    whitespace = re.compile(r'\s')
+    for code in range(0x110000):
+        char = chr(code)
+        assert char.isspace() == bool(whitespace.match(char)), hex(code)
+    for code in list(range(0x2000, 0x3000)) + list(range(0x1EF00, 0x1FC00)):
+        char = chr(code)
+        if content_summarizer._EMOJI_PATTERN.match(char):
+            assert content_summarizer._EMOJI_CANDIDATE_PATTERN.match(char), hex(code)
+    print("✅ 快速路径与原正则的字符集一致")
+
+def test_matches_legacy():
+    """固定用例与随机拼接的文本清理结果与原实现逐字相同"""
+    print("🧪 测试清理结果与原实现一致")
+    for case in CASES:
+        assert clean_description_text(case) == legacy_clean(case), case
+    
+    atoms = list(UNWANTED_PHRASES) + [
+        '查看', '更多', '点击', '链接', '复制', '展开', '收', '起', '：', ' ', '\n', '\t', 'https://a.b/c', 'http://',
+        'www.', 'me@a.com', '@', '.', 'BV1x', 'BV', 'av1', 'av', 'Java8', '😀', '✅', '⭐', '⬛',
+        '\u3000', '\xa0', 'AI早报', ': 10:15', '9月23日'
+    ]
+    rng = random.Random(2024)
+    for _ in range(5000):
+        text = ''.join(rng.choice(atoms) for _ in range(rng.randrange(1, 30)))
+        assert clean_description_text(text) == legacy_clean(text), repr(text)
+    print("✅ 清理结果与原实现一致")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试描述清理引擎")
+    print("=" * 50)
+    
+    tests = [test_phrases_are_prefix_free, test_fast_paths_cover_patterns, test_matches_legacy]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
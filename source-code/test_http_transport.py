@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+测试共享HTTP传输层（使用本地HTTP服务）
+"""
+
+import sys
+import os
+import gzip
+import json
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import http_transport
+from http_transport import HttpTransport, AsyncHttpTransport
+
+class CompressingServer:
+    """支持 keep-alive 的本地服务：客户端接受 gzip 时压缩响应，可预设若干次 503"""
+    
+    def __init__(self):
+        self.clients = []
+        self.encodings = []
+        self.failures = 0
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                server.clients.append(self.client_address)
+                server.encodings.append(self.headers.get('Accept-Encoding', ''))
+                if server.failures > 0:
+                    server.failures -= 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                
+                payload = json.dumps({'code': 0, 'data': ['AI早报'] * 200}, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    payload = gzip.compress(payload)
+                    self.send_header('Content-Encoding', 'gzip')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+    
+    def acquire(self):
+        self.acquired += 1
+    
+    def reserve(self):
+        self.acquired += 1
+        return 0.0
+
+def test_pooled_compressed_requests():
+    """同一主机复用会话和连接，协商gzip并统计压缩前后的字节数"""
+    print("🧪 测试连接复用与压缩协商")
+    with CompressingServer() as server:
+        transport = HttpTransport(retries=0)
+        limiter = CountingLimiter()
+        transport.set_rate_limiter(server.base_url, limiter)
+        
+        for path in ('/a', '/b', '/c'):
+            response = transport.get(f"{server.base_url}{path}")
+            assert response.json()['data'][0] == 'AI早报'
+        
+        assert transport.session_for(f"{server.base_url}/a") is transport.session_for(f"{server.base_url}/b")
+        assert len(set(server.clients)) == 1, server.clients  # keep-alive：三个请求走同一个连接
+        assert all('gzip' in encoding for encoding in server.encodings)
+        assert limiter.acquired == 3
+        
+        stats = transport.get_stats()[server.base_url]
+        assert stats['requests'] == 3 and stats['errors'] == 0
+        assert stats['wire_bytes'] < stats['body_bytes'] / 5, stats
+        transport.close()
+    print("✅ 连接复用与压缩协商正常")
+
+def test_retries_and_timeouts():
+    """5xx 时由连接池适配器重试，超时按主机配置"""
+    print("🧪 测试重试与按主机超时")
+    with CompressingServer() as server:
+        server.failures = 1
+        transport = HttpTransport(retries=2, host_timeouts={'127.0.0.1': (1.0, 2.0)})
+        response = transport.get(f"{server.base_url}/retry")
+        assert response.status_code == 200
+        assert len(server.clients) == 2
+        assert transport.get_stats()[server.base_url]['retries'] == 1
+        
+        assert transport.timeout_for(f"{server.base_url}/x") == (1.0, 2.0)
+        assert transport.timeout_for('https://api.bilibili.com/x') == transport.timeout
+        transport.close()
+    print("✅ 重试与按主机超时正常")
+
+def test_limited_retries_take_tokens():
+    """限流主机的每次尝试（包括重试）都获取一个令牌，令牌数等于实际请求数"""
+    print("🧪 测试限流主机的重试计入令牌")
+    saved = http_transport.RETRY_BACKOFF
+    http_transport.RETRY_BACKOFF = 0
+    try:
+        _check_limited_retries()
+    finally:
+        http_transport.RETRY_BACKOFF = saved
+    print("✅ 限流主机的重试计入令牌")
+
+def _check_limited_retries():
+    with CompressingServer() as server:
+        transport = HttpTransport(retries=2)
+        transport.get(f"{server.base_url}/warm")  # 绑定限流器前创建的会话带着连接池重试
+        retrying = transport.session_for(server.base_url)
+        limiter = CountingLimiter()
+        assert transport.set_rate_limiter(server.base_url, limiter) is limiter
+        session = transport.session_for(server.base_url)
+        assert session is not retrying
+        assert len(retrying.get_adapter(server.base_url).poolmanager.pools) == 1  # 旧会话只是移出，没有被关闭
+        
+        # 再次绑定（例如新建的监控器）沿用已有的限流器和会话
+        assert transport.set_rate_limiter(server.base_url, CountingLimiter()) is limiter
+        assert transport.session_for(server.base_url) is session
+        
+        server.clients.clear()
+        server.failures = 2
+        response = transport.get(f"{server.base_url}/retry")
+        assert response.status_code == 200
+        assert len(server.clients) == limiter.acquired == 3
+        assert transport.get_stats()[server.base_url]['retries'] == 2
+        
+        # 重试用尽时返回最后一次的5xx响应，上游请求数仍不超过令牌数
+        server.clients.clear()
+        server.failures = 5
+        assert transport.get(f"{server.base_url}/down").status_code == 503
+        assert len(server.clients) == 3 and limiter.acquired == 6
+        
+        # 异步封装遵循相同的规则
+        server.clients.clear()
+        server.failures = 1
+        async_transport = AsyncHttpTransport(transport, max_workers=2)
+        response = asyncio.run(async_transport.get(f"{server.base_url}/async"))
+        assert response.status_code == 200
+        assert len(server.clients) == 2 and limiter.acquired == 8
+        async_transport.close()
+        transport.close()
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试HTTP传输层")
+    print("=" * 50)
+    
+    tests = [test_pooled_compressed_requests, test_retries_and_timeouts, test_limited_retries_take_tokens]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
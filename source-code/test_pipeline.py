@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+测试分阶段处理流水线
+"""
+
+import sys
+import os
+import time
+import threading
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline import Pipeline, Stage
+
+def test_stages_overlap_in_order():
+    """各阶段重叠执行，有序阶段仍按输入顺序处理"""
+    print("🧪 测试阶段重叠与有序输出")
+    sent = []
+    
+    def fetch(n):
+        time.sleep(0.05 if n % 2 else 0.1)  # 详情耗时不一，完成顺序会乱
+        return n
+    
+    def notify(n):
+        time.sleep(0.05)
+        sent.append(n)
+        return n * 10
+    
+    pipeline = Pipeline([
+        Stage('detail', fetch, workers=3, queue_size=2),
+        Stage('summarize', lambda n: n + 1, queue_size=2),
+        Stage('notify', notify, queue_size=2, ordered=True)
+    ])
+    start = time.perf_counter()
+    results = pipeline.run(range(8))
+    elapsed = time.perf_counter() - start
+    
+    assert results == [(n + 1) * 10 for n in range(8)]
+    assert sent == [n + 1 for n in range(8)]
+    assert elapsed < 0.9, elapsed  # 串行约需 8×(0.075+0.05) = 1.0 秒
+    
+    stats = pipeline.get_stats()
+    assert stats['runs'] == 1
+    assert stats['stages']['detail']['processed'] == 8
+    assert stats['stages']['notify']['throughput'] > 0
+    for stage in stats['stages'].values():
+        assert stage['queue_max_depth'] <= stage['queue_size']
+    print("✅ 阶段重叠与有序输出正常")
+
+def test_failures_and_backpressure():
+    """失败的条目结果为 None 且不阻塞后续条目；下游慢时上游被队列容量限制"""
+    print("🧪 测试失败处理与背压")
+    in_flight = []
+    lock = threading.Lock()
+    started = []
+    
+    def fetch(n):
+        if n == 2:
+            raise ValueError("detail failed")
+        with lock:
+            started.append(n)
+            in_flight.append(len(started) - len(done))
+        return n
+    
+    done = []
+    
+    def notify(n):
+        time.sleep(0.02)
+        done.append(n)
+        return n
+    
+    pipeline = Pipeline([
+        Stage('detail', fetch, workers=2, queue_size=1),
+        Stage('notify', notify, queue_size=1, ordered=True)
+    ])
+    results = pipeline.run(range(10))
+    
+    assert results[2] is None
+    assert [r for r in results if r is not None] == [n for n in range(10) if n != 2]
+    assert done == [n for n in range(10) if n != 2]
+    # 已获取但尚未通知的条目数不超过：下游队列 + 重排缓冲 + 上游线程数
+    assert max(in_flight) <= 4, in_flight
+    
+    stats = pipeline.get_stats()['stages']
+    assert stats['detail']['errors'] == 1 and stats['detail']['processed'] == 9
+    assert stats['notify']['processed'] == 9
+    print("✅ 失败处理与背压正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试处理流水线")
+    print("=" * 50)
+    
+    tests = [test_stages_overlap_in_order, test_failures_and_backpressure]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
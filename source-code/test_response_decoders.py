@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+测试基于接口契约的响应解码器
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from response_decoders import ARC_SEARCH, COLLECTION, VIDEO_DETAIL, DecodeError, Schema
+from test_bilibili_monitor import FakeBilibiliServer, WbiRoutes, _make_monitor
+
+CONTRACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api-contracts', 'bilibili')
+
+def _encode(document):
+    return json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+def test_view_decoder():
+    """详情只保留用到的字段，丢弃 owner、rights、honor_reply 等子树"""
+    print("🧪 测试视频详情解码")
+    body = _encode({'code': 0, 'message': '0', 'ttl': 1, 'data': {
+        'aid': 1, 'bvid': 'BV1aaa', 'title': 'AI早报', 'desc': '内容', 'duration': 300,
+        'owner': {'mid': 1, 'name': 'up', 'face': ''}, 'stat': {'aid': 1, 'view': 10, 'like': 3},
+        'rights': {'bp': 0}, 'honor_reply': {'honor': []}, 'pages': [{'cid': 9, 'page': 1, 'part': 'P1', 'duration': 300}]
+    }})
+    code, message, data = VIDEO_DETAIL.decode(body)
+    assert code == 0
+    assert data == {'aid': 1, 'bvid': 'BV1aaa', 'title': 'AI早报', 'desc': '内容', 'duration': 300,
+                    'stat': {'view': 10}, 'pages': [{'cid': 9, 'part': 'P1', 'duration': 300}]}
+    
+    # 错误码直接返回，不解析 data
+    assert VIDEO_DETAIL.decode(_encode({'code': -404, 'message': '啥都木有'})) == (-404, '啥都木有', None)
+    print("✅ 视频详情解码正常")
+
+def test_shape_validation():
+    """结构与契约不符时抛出 DecodeError，并指出字段路径"""
+    print("🧪 测试响应结构校验")
+    cases = [
+        (ARC_SEARCH, b'not json'),
+        (ARC_SEARCH, _encode({'message': 'no code'})),
+        (ARC_SEARCH, _encode({'code': 0, 'message': '0', 'data': {'vlist': []}})),
+        (ARC_SEARCH, _encode({'code': 0, 'message': '0', 'data': {'list': {'vlist': [{'title': 'x'}]}}})),
+        (ARC_SEARCH, _encode({'code': 0, 'message': '0', 'data': {'list': {'vlist': [{'bvid': 1}]}}})),
+        (COLLECTION, _encode({'code': 0, 'message': '0', 'data': {'archives': {}}})),
+        (COLLECTION, _encode({'code': 0, 'message': '0', 'data': {'archives': [{'aid': 1, 'bvid': 'BV1', 'title': 't'}]}})),
+        (VIDEO_DETAIL, _encode({'code': 0, 'message': '0', 'data': {'aid': 1, 'bvid': 'BV1', 'stat': {}}}))
+    ]
+    for decoder, body in cases:
+        try:
+            decoder.decode(body)
+        except DecodeError as e:
+            assert decoder.name in str(e) or 'list' in str(e) or 'data' in str(e), e
+        else:
+            raise AssertionError(f"{decoder.name} accepted {body!r}")
+    
+    # "--" 形式的播放数是契约允许的
+    body = _encode({'code': 0, 'message': '0', 'data': {'list': {'vlist': [{'bvid': 'BV1', 'play': '--'}]}}})
+    assert ARC_SEARCH.decode(body)[2]['list']['vlist'] == [{'bvid': 'BV1', 'play': '--'}]
+    print("✅ 响应结构校验正常")
+
+def test_drift_is_tolerated():
+    """代码不依赖的字段类型变化时只丢弃该字段，整页仍然可用，也不计入熔断"""
+    print("🧪 测试非关键字段的接口变动")
+    item = {'bvid': 'BV1aaa', 'aid': 1, 'title': 'AI早报', 'created': 1700000000,
+            'comment': '12', 'review': None, 'typeid': '188', 'play': 3.5, 'length': 300}
+    body = _encode({'code': 0, 'message': '0', 'data': {'list': {'vlist': [item]}}})
+    assert ARC_SEARCH.decode(body)[2]['list']['vlist'] == [
+        {'bvid': 'BV1aaa', 'aid': 1, 'title': 'AI早报', 'created': 1700000000}]
+    
+    archive = {'aid': 1, 'bvid': 'BV1aaa', 'title': 't', 'pubdate': 1700000000, 'duration': '5:00', 'stat': []}
+    body = _encode({'code': 0, 'message': '0', 'data': {'archives': [archive], 'page': {'total': '1'}}})
+    assert COLLECTION.decode(body)[2] == {'archives': [{'aid': 1, 'bvid': 'BV1aaa', 'title': 't', 'pubdate': 1700000000}],
+                                          'page': {}}
+    
+    body = _encode({'code': 0, 'message': '0', 'data': {
+        'aid': '1', 'bvid': 'BV1aaa', 'title': 'AI早报', 'stat': {'view': '10万'}, 'pages': [None]}})
+    assert VIDEO_DETAIL.decode(body)[2] == {'bvid': 'BV1aaa', 'title': 'AI早报', 'stat': {}}
+    
+    # 通过监控器拉取：变动字段使用默认值，接口保持健康
+    now = int(time.time())
+    vlist = [dict(item, created=now - 60, title='AI早报 今日')]
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+        server.routes['/x/space/wbi/arc/search'] = lambda params: {
+            'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+        monitor = _make_monitor(server, tmp)
+        videos = list(monitor.iter_videos())
+        assert [(video.bvid, video.comment, video.typeid) for video in videos] == [('BV1aaa', 0, None)]
+        stats = monitor.breakers.get_stats()
+        assert all(breaker['consecutive_failures'] == 0 for breaker in stats.values()), stats
+    print("✅ 非关键字段的接口变动不会拒绝整页")
+
+def _resolve(contracts, ref):
+    """将 'file.yml#Schema.prop.prop' 解析为契约中的 schema 节点"""
+    file_name, path = ref.split('#')
+    document = contracts[file_name]
+    parts = path.split('.')
+    node = document['components']['schemas'][parts[0]]
+    for part in parts[1:]:
+        node = _follow(document, node)['properties'][part]
+    return document, _follow(document, node)
+
+def _follow(document, node):
+    if '$ref' in node:
+        return document['components']['schemas'][node['$ref'].rsplit('/', 1)[-1]]
+    return node
+
+def _check_schema(contracts, schema, seen):
+    document, node = _resolve(contracts, schema.contract)
+    properties = node.get('properties', {})
+    for key in schema.required:
+        assert key in node.get('required', []), f"{schema.contract}: {key} is not required in contract"
+    for key, spec in schema.fields.items():
+        assert key in properties, f"{schema.contract}: {key} not in contract"
+        prop = _follow(document, properties[key])
+        if isinstance(spec, Schema):
+            assert prop.get('type', 'object') == 'object', f"{schema.contract}.{key}"
+            _check_schema(contracts, spec, seen)
+        elif isinstance(spec, list):
+            assert prop.get('type') == 'array', f"{schema.contract}.{key}"
+            _check_schema(contracts, spec[0], seen)
+        else:
+            types = spec if isinstance(spec, tuple) else (spec,)
+            declared = {option['type'] for option in prop['oneOf']} if 'oneOf' in prop else {prop.get('type')}
+            expected = {{int: 'integer', str: 'string'}[t] for t in types}
+            assert declared == expected, f"{schema.contract}.{key}: {declared} != {expected}"
+    seen.append(schema.contract)
+
+def test_decoders_match_contracts():
+    """解码器声明的字段、类型和必填项与 api-contracts 中的契约一致"""
+    print("🧪 测试解码器与接口契约一致")
+    try:
+        import yaml
+    except ImportError:
+        print("⏭️  未安装 PyYAML，跳过契约比对")
+        return
+    
+    contracts = {}
+    for file_name in ('arc_search.yml', 'collection.yml', 'view.yml'):
+        with open(os.path.join(CONTRACTS_DIR, file_name), 'r', encoding='utf-8') as f:
+            contracts[file_name] = yaml.safe_load(f)
+    
+    seen = []
+    for decoder in (ARC_SEARCH, COLLECTION, VIDEO_DETAIL):
+        _check_schema(contracts, decoder.data_schema, seen)
+    assert len(seen) == 10
+    print("✅ 解码器与接口契约一致")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试响应解码器")
+    print("=" * 50)
+    
+    tests = [test_view_decoder, test_shape_validation, test_drift_is_tolerated, test_decoders_match_contracts]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+测试视频列表快照的变更捕获
+"""
+
+import sys
+import os
+import time
+import tempfile
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import AINewsScheduler
+from sources import BilibiliSource
+from snapshot_diff import (ADDED, REMOVED, METADATA_CHANGED, STATS_CHANGED, SnapshotTracker, added_videos,
+                           diff_snapshots)
+from subscriptions import Source, Subscription
+from test_bilibili_monitor import FakeBilibiliServer, WbiRoutes, _make_monitor, _view_response
+from test_subscriptions import RecordingNotifier
+from video import Video
+
+def test_diff_snapshots():
+    """按 bvid 输出新增、删除、描述变化和计数变化事件"""
+    print("🧪 测试快照对比")
+    previous = {
+        'BV1a': Video('BV1a', title='AI早报 1', pubdate=100, play=10),
+        'BV1b': Video('BV1b', title='AI早报 2', pubdate=200, play=20),
+        'BV1old': Video('BV1old', title='AI早报 0', pubdate=50)
+    }
+    current = {
+        'BV1c': Video('BV1c', title='AI早报 3', pubdate=300),
+        'BV1b': Video('BV1b', title='AI早报 2（修正）', pubdate=200, play=25),
+        'BV1a': Video('BV1a', title='AI早报 1', pubdate=100, play=10)
+    }
+    events = diff_snapshots(previous, current, since=60)
+    kinds = [(event.kind, event.video.bvid) for event in events]
+    # BV1old 早于 since，是移出了拉取范围而不是被删除
+    assert kinds == [(ADDED, 'BV1c'), (METADATA_CHANGED, 'BV1b'), (STATS_CHANGED, 'BV1b')], kinds
+    assert events[1].fields == ('title',) and events[2].fields == ('play',)
+    assert [event.kind for event in diff_snapshots(previous, current)][-1] == REMOVED
+    assert diff_snapshots(current, dict(current)) == []
+    print("✅ 快照对比正常")
+
+def test_tracker_stats():
+    """首次拉取全部为新增，列表不变时没有事件，reset 后重新输出全部视频"""
+    print("🧪 测试快照跟踪统计")
+    tracker = SnapshotTracker()
+    videos = [Video('BV1a', title='a', pubdate=1), Video('BV1b', title='b', pubdate=2)]
+    assert [video.bvid for video in added_videos(tracker.update(videos))] == ['BV1a', 'BV1b']
+    assert tracker.update(videos) == []
+    assert len(tracker.update(videos[:1])) == 1
+    tracker.reset()
+    assert len(added_videos(tracker.update(videos))) == 2
+    stats = tracker.get_stats()
+    assert stats['polls'] == 4 and stats['unchanged_polls'] == 1
+    assert stats['events'][ADDED] == 4 and stats['events'][REMOVED] == 1
+    assert stats['last_events'][ADDED] == 2
+    print("✅ 快照跟踪统计正常")
+
+def test_unchanged_list_skips_processing():
+    """列表没有变化的检查不请求详情、不生成摘要；标题或计数变化只产生事件"""
+    print("🧪 测试无变化时跳过处理")
+    now = int(time.time())
+    vlist = [{'bvid': 'BV1ai1', 'aid': 1, 'title': 'AI早报 今日', 'created': now - 1, 'play': 5}]
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)  # 状态库位于相对路径 data/ 下
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/space/wbi/arc/search'] = lambda params: {
+                'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+            server.routes['/x/web-interface/view'] = _view_response
+            
+            scheduler = AINewsScheduler(Subscription('cdc', 'https://example.com/a', Source('1')),
+                                        _make_monitor(server, tmp))
+            notifier = scheduler.wechat_notifier = RecordingNotifier()
+            
+            assert [video.bvid for video in scheduler.check_for_new_videos()] == ['BV1ai1']
+            assert scheduler.check_for_new_videos() == []
+            vlist[0] = dict(vlist[0], title='AI早报 今日（更正）', play=50)
+            assert scheduler.check_for_new_videos() == []
+            assert server.count('/x/space/wbi/arc/search') == 3
+            assert server.count('/x/web-interface/view') == 1 and len(notifier.summaries) == 1
+            
+            stats = scheduler.get_status()['change_stats']
+            assert stats['polls'] == 3 and stats['unchanged_polls'] == 1
+            assert stats['last_events'] == {ADDED: 0, REMOVED: 0, METADATA_CHANGED: 1, STATS_CHANGED: 1}
+        finally:
+            os.chdir(cwd)
+    print("✅ 无变化时跳过处理正常")
+
+def test_fetch_failure_keeps_snapshot():
+    """拉取失败与空列表不同：快照保持不变，故障期间没有删除事件，恢复后也不会重新产生新增事件"""
+    print("🧪 测试拉取失败时保留快照")
+    now = int(time.time())
+    vlist = [{'bvid': f'BV1ai{i}', 'aid': i, 'title': f'AI早报 {i}', 'created': now - i} for i in (1, 2)]
+    ok = lambda params: {'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+    failing = lambda params: {'code': -799, 'message': '请求过于频繁', 'ttl': 1}
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)  # 状态库位于相对路径 data/ 下
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/web-interface/view'] = _view_response
+            
+            # 来源层面：失败返回 None，快照不变
+            source = BilibiliSource(_make_monitor(server, tmp))
+            server.routes['/x/space/wbi/arc/search'] = server.routes['/x/space/arc/search'] = ok
+            assert [(event.kind, event.video.bvid) for event in source.poll_changes()] == [
+                (ADDED, 'BV1ai1'), (ADDED, 'BV1ai2')]
+            server.routes['/x/space/wbi/arc/search'] = server.routes['/x/space/arc/search'] = failing
+            assert source.poll_changes() is None
+            server.routes['/x/space/wbi/arc/search'] = server.routes['/x/space/arc/search'] = ok
+            assert source.poll_changes() == []
+            stats = source.changes.get_stats()
+            assert stats['events'][ADDED] == 2 and stats['events'][REMOVED] == 0
+            
+            # 调度器层面：失败的检查不重置快照，也不发送错误通知
+            scheduler = AINewsScheduler(Subscription('cdc', 'https://example.com/a', Source('1')),
+                                        _make_monitor(server, tmp))
+            notifier = scheduler.wechat_notifier = RecordingNotifier()
+            assert len(scheduler.check_for_new_videos()) == 2
+            server.routes['/x/space/wbi/arc/search'] = server.routes['/x/space/arc/search'] = failing
+            assert scheduler.check_for_new_videos() == []
+            server.routes['/x/space/wbi/arc/search'] = server.routes['/x/space/arc/search'] = ok
+            assert scheduler.check_for_new_videos() == []
+            assert scheduler.source.changes.get_stats()['events'][ADDED] == 2
+            assert notifier.texts == [] and len(notifier.summaries) == 2
+        finally:
+            os.chdir(cwd)
+    print("✅ 拉取失败时保留快照正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试列表变更捕获")
+    print("=" * 50)
+    
+    tests = [test_diff_snapshots, test_tracker_stats, test_unchanged_list_skips_processing,
+             test_fetch_failure_keeps_snapshot]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+测试信息源插件与并发轮询
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sources import VideoSource, RssSource, JsonFileSource, SourceRegistry, create_source
+from subscriptions import Source
+from test_bilibili_monitor import FakeBilibiliServer
+from video import Video
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>AI</title>
+<item><title>AI早报 2024-06-01</title><link>https://www.bilibili.com/video/BV1xx411c7mD</link>
+<description>今日要点</description><pubDate>Sat, 01 Jun 2024 01:00:00 GMT</pubDate></item>
+<item><title>旧闻</title><link>https://example.com/old</link><guid>old-1</guid>
+<pubDate>Fri, 01 Mar 2024 01:00:00 GMT</pubDate></item>
+<item><title>没有链接</title></item>
+</channel></rss>"""
+
+ATOM = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Blog</title>
+<entry><id>tag:example.com,2024:1</id><title>Release notes</title>
+<link rel="alternate" href="https://example.com/posts/1"/><updated>2024-06-01T02:00:00Z</updated>
+<summary>New model</summary><author><name>team</name></author></entry>
+</feed>"""
+
+class SlowSource(VideoSource):
+    """固定耗时的测试来源"""
+    
+    def __init__(self, name, delay, timeout=5.0):
+        super().__init__(None, timeout)
+        self.name = name
+        self.delay = delay
+    
+    @property
+    def key(self):
+        return 'slow', self.name
+    
+    def fetch(self, since=None):
+        time.sleep(self.delay)
+        return [{'id': f'{self.name}-1', 'pubdate': 1717200000}]
+    
+    def normalize(self, entry):
+        return Video(entry['id'], title=self.name, pubdate=entry['pubdate'])
+
+def test_feed_sources():
+    """RSS/Atom/JSON 条目规范化为 Video，B站链接使用BV号去重"""
+    print("🧪 测试订阅源解析")
+    with tempfile.TemporaryDirectory() as tmp:
+        rss_path = os.path.join(tmp, 'feed.xml')
+        atom_path = os.path.join(tmp, 'atom.xml')
+        json_path = os.path.join(tmp, 'items.json')
+        with open(rss_path, 'w', encoding='utf-8') as f:
+            f.write(RSS)
+        with open(atom_path, 'w', encoding='utf-8') as f:
+            f.write(ATOM)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'items': [{'id': 7, 'title': 'AI早报', 'pubdate': '2024-06-01T10:00:00+08:00', 'url': 'https://example.com/7'},
+                                 {'title': 'no id'}]}, f)
+        
+        rss = create_source(Source(type='rss', url=rss_path))
+        assert isinstance(rss, RssSource) and rss.key == ('rss', rss_path)
+        videos = rss.poll(since=1714521600)  # 2024-05-01，旧闻被跳过，缺少链接的条目被忽略
+        assert [video.bvid for video in videos] == ['BV1xx411c7mD']
+        assert videos[0].pubdate == 1717203600 and videos[0].description == '今日要点'
+        assert videos[0].video_url == 'https://www.bilibili.com/video/BV1xx411c7mD'
+        assert [video.bvid for video in rss.poll(is_known=lambda bvid: bvid.startswith('BV'))] == ['old-1']
+        
+        atom = RssSource(atom_path, rate_limit=None)
+        entry = atom.poll()[0]
+        assert entry.bvid == 'tag:example.com,2024:1' and entry.video_url == 'https://example.com/posts/1'
+        assert entry.author == 'team' and entry.pubdate == 1717207200
+        
+        items = JsonFileSource(json_path, rate_limit=None).poll(predicate=lambda video: 'AI' in video.title)
+        assert [(video.bvid, video.pubdate) for video in items] == [('7', 1717207200)]
+    print("✅ 订阅源解析正常")
+
+def test_json_source_over_http():
+    """URL 来源经共享HTTP传输层获取"""
+    print("🧪 测试HTTP订阅源")
+    with FakeBilibiliServer() as server:
+        server.routes['/items.json'] = lambda params: [{'bvid': 'BV1ab411c7mD', 'title': 't', 'pubdate': 1}]
+        source = JsonFileSource(f'{server.base_url}/items.json', rate_limit=None)
+        assert [video.bvid for video in source.poll()] == ['BV1ab411c7mD']
+        assert server.count('/items.json') == 1
+    print("✅ HTTP订阅源正常")
+
+def test_concurrent_poll_and_timeout():
+    """各来源并发拉取，一轮耗时约等于最慢的来源；超时的来源本轮结果为 None 且不阻塞其他来源"""
+    print("🧪 测试并发轮询与超时")
+    fast, medium, slow = SlowSource('a', 0.2), SlowSource('b', 0.3), SlowSource('c', 0.3)
+    registry = SourceRegistry([fast, medium, slow])
+    start = time.monotonic()
+    results = registry.poll()
+    elapsed = time.monotonic() - start
+    assert all(len(videos) == 1 for videos in results.values())
+    assert elapsed < 0.6, elapsed  # 串行需要0.8秒
+    
+    stuck = SlowSource('stuck', 0.6, timeout=0.1)
+    registry.add(stuck)
+    start = time.monotonic()
+    results = registry.poll()
+    assert results[stuck.key] is None and results[fast.key] is not None
+    assert time.monotonic() - start < 0.5
+    
+    # 上一轮仍在运行的来源被跳过，不会堆积线程
+    results = registry.poll(filters={stuck.key: (None, None)})
+    assert results == {stuck.key: None}
+    stats = registry.get_stats()
+    assert stats['slow:stuck']['timeouts'] == 1 and stats['slow:stuck']['skipped'] == 1
+    assert stats['slow:a']['polls'] == 2
+    registry.close()
+    print("✅ 并发轮询与超时正常")
+
+def test_bounded_workers():
+    """来源多于线程数时排队拉取，线程数不超过上限；排队超时的拉取被取消，不会在之后占用线程"""
+    print("🧪 测试有界线程池")
+    sources = [SlowSource(str(i), 0.2) for i in range(6)]
+    registry = SourceRegistry(sources, workers=2)
+    start = time.monotonic()
+    results = registry.poll()
+    elapsed = time.monotonic() - start
+    assert all(len(videos) == 1 for videos in results.values())
+    assert 0.55 < elapsed < 0.9, elapsed  # 三批，每批两个
+    assert len(registry._executor._threads) == 2
+    
+    stuck = SlowSource('stuck', 0.5, timeout=0.1)
+    queued = SlowSource('queued', 0.0, timeout=0.1)
+    single = SourceRegistry([stuck, queued], workers=1)
+    results = single.poll()
+    assert results == {stuck.key: None, queued.key: None}
+    time.sleep(0.6)
+    stats = single.get_stats()
+    assert stats['slow:queued']['polls'] == 0 and stats['slow:queued']['timeouts'] == 1  # 已取消，没有在之后运行
+    assert stats['slow:stuck']['polls'] == 1  # 超时的拉取在后台完成
+    stuck.delay = 0
+    assert all(videos is not None for videos in single.poll().values())
+    registry.close()
+    single.close()
+    print("✅ 有界线程池正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试信息源插件")
+    print("=" * 50)
+    
+    tests = [test_feed_sources, test_json_source_over_http, test_concurrent_poll_and_timeout, test_bounded_workers]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
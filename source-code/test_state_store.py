@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+测试状态存储后端（SQLite / 文本文件）
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from data_manager import DataManager
+from state_store import FileStateStore, SQLiteStateStore
+from bvid_codec import av_to_bv, bv_to_av, try_bv_to_av
+from dedup_index import AvidIndex
+from video import Video
+
+def _videos(*bvids):
+    return [Video(bvid, aid=i + 1, pubdate=1700000000 + i) for i, bvid in enumerate(bvids)]
+
+def _check_store(store):
+    """两种后端共享的行为检查"""
+    assert not store.contains('BV1aaa')
+    
+    store.add_videos(_videos('BV1aaa', 'BV1bbb', 'BV1aaa'))
+    assert store.contains('BV1aaa') and store.contains('BV1bbb')
+    assert store.count() == 2
+    
+    store.add_videos(_videos('BV1ccc', 'BV1ddd'))
+    assert store.processed_ids() == ['BV1aaa', 'BV1bbb', 'BV1ccc', 'BV1ddd']
+    
+    removed = store.keep_last(2)
+    assert removed == 2
+    assert store.processed_ids() == ['BV1ccc', 'BV1ddd']
+    assert not store.contains('BV1aaa')
+    
+    assert not store.is_push_done('2025-09-25')
+    store.record_push_run(datetime(2025, 9, 25, 9, 30), video_count=1)
+    assert store.is_push_done('2025-09-25')
+    assert not store.is_push_done('2025-09-26')
+    assert store.push_run_count() == 1
+    
+    store.reset()
+    assert store.count() == 0
+
+def test_file_store():
+    """测试文本文件后端"""
+    print("🧪 测试文本文件后端")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FileStateStore(os.path.join(tmp, 'processed_videos.txt'), os.path.join(tmp, 'daily_push_log.txt'))
+        _check_store(store)
+        
+        # 其他进程追加的记录在下次查询时可见
+        store.add_videos(_videos('BV1eee'))
+        with open(store.processed_videos_file, 'a', encoding='utf-8') as f:
+            f.write('BV1fff\n')
+        assert store.contains('BV1fff')
+    print("✅ 文本文件后端正常")
+
+def test_file_store_log():
+    """测试追加日志：重启后回放、压缩、未写完的行和批量fsync"""
+    print("🧪 测试追加日志")
+    with tempfile.TemporaryDirectory() as tmp:
+        processed_file = os.path.join(tmp, 'processed_videos.txt')
+        push_log_file = os.path.join(tmp, 'daily_push_log.txt')
+        
+        # 每批只fsync一次
+        store = FileStateStore(processed_file, push_log_file)
+        fsync_calls = []
+        saved_fsync = os.fsync
+        os.fsync = lambda fd: fsync_calls.append(fd)
+        try:
+            store.add_videos(_videos('BV1aaa', 'BV1bbb', 'BV1ccc'))
+        finally:
+            os.fsync = saved_fsync
+        assert len(fsync_calls) == 1
+        
+        # 模拟重启：新实例从日志回放（镜像之后追加的部分也回放）
+        store.IMAGE_SAVE_LINES = 1
+        store.add_videos(_videos('BV1ddd'))
+        assert os.path.exists(store.index_file)
+        with open(processed_file, 'a', encoding='utf-8') as f:
+            f.write('BV1eee\n')
+        restarted = FileStateStore(processed_file, push_log_file)
+        assert all(restarted.contains(bvid) for bvid in ('BV1aaa', 'BV1ddd', 'BV1eee'))
+        assert restarted.count() == 5
+        
+        # 未写完的最后一行在补全换行之前不可见
+        with open(processed_file, 'a', encoding='utf-8') as f:
+            f.write('BV1fff')
+        assert not restarted.contains('BV1fff') and restarted.count() == 5
+        with open(processed_file, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        assert restarted.contains('BV1fff') and restarted.count() == 6
+        
+        # 保留最新的N条
+        assert restarted.keep_last(2) == 4
+        assert restarted.processed_ids() == ['BV1eee', 'BV1fff']
+        assert not restarted.contains('BV1aaa') and restarted.contains('BV1fff')
+        
+        # 重复行过多时启动即压缩，保留写入顺序
+        with open(processed_file, 'a', encoding='utf-8') as f:
+            f.write('BV1eee\nBV1fff\n' * 10)
+        compacting = FileStateStore(processed_file, push_log_file)
+        compacting.COMPACT_MIN_LINES = 10
+        assert compacting.count() == 2
+        with open(processed_file, encoding='utf-8') as f:
+            assert f.read() == 'BV1eee\nBV1fff\n'
+    print("✅ 追加日志正常")
+
+def test_bvid_codec():
+    """测试BV/AV互转"""
+    print("🧪 测试BV/AV互转")
+    assert av_to_bv(170001) == 'BV17x411w7KC'
+    assert bv_to_av('BV17x411w7KC') == 170001
+    assert bv_to_av('BV1xx411c7mD') == 2
+    assert try_bv_to_av('BV1test1') is None
+    print("✅ BV/AV互转正常")
+
+def test_dedup_index_image():
+    """测试去重索引的mmap镜像"""
+    print("🧪 测试去重索引镜像")
+    with tempfile.TemporaryDirectory() as tmp:
+        image_file = os.path.join(tmp, 'processed_videos.idx')
+        index = AvidIndex()
+        index.update([av_to_bv(aid) for aid in (5, 170001, 3)] + ['BV1test1'])
+        index.log_offset = 123
+        index.save(image_file)
+        index.close()
+        
+        loaded = AvidIndex.load(image_file)
+        assert 'BV17x411w7KC' in loaded and 'BV1test1' in loaded
+        assert av_to_bv(4) not in loaded
+        assert len(loaded) == 4 and loaded.log_offset == 123
+        loaded.add(av_to_bv(4))
+        assert av_to_bv(4) in loaded
+        loaded.close()
+    print("✅ 去重索引镜像正常")
+
+def test_sqlite_store():
+    """测试SQLite后端"""
+    print("🧪 测试SQLite后端")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteStateStore(os.path.join(tmp, 'state.db'))
+        _check_store(store)
+        
+        # 不同频道的去重状态互相独立
+        other = SQLiteStateStore(store.db_file, channel='team-b')
+        store.add_videos(_videos('BV1aaa'))
+        assert not other.contains('BV1aaa')
+        other.close()
+        store.close()
+    print("✅ SQLite后端正常")
+
+def test_sqlite_migration():
+    """测试从旧文本文件迁移"""
+    print("🧪 测试旧数据迁移")
+    with tempfile.TemporaryDirectory() as tmp:
+        processed_file = os.path.join(tmp, 'processed_videos.txt')
+        push_log_file = os.path.join(tmp, 'daily_push_log.txt')
+        cache_file = os.path.join(tmp, 'video_cache.json')
+        with open(processed_file, 'w', encoding='utf-8') as f:
+            f.write('BV1aaa\nBV1bbb\nBV1aaa\n')
+        with open(push_log_file, 'w', encoding='utf-8') as f:
+            f.write('2025-09-24 09:30:01 - Daily push completed\n2025-09-25 09:30:02 - Daily push completed\n')
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            f.write('[{"bvid": "BV1aaa", "aid": 42, "created": 1700000000}]')
+        
+        store = SQLiteStateStore(os.path.join(tmp, 'state.db'))
+        result = store.migrate_from_files(processed_file, push_log_file, cache_file)
+        assert result == {'videos': 2, 'push_runs': 2}
+        assert store.processed_ids() == ['BV1aaa', 'BV1bbb']
+        assert store.is_push_done('2025-09-25')
+        
+        # 迁移只执行一次
+        assert store.migrate_from_files(processed_file, push_log_file, cache_file) == {}
+        assert store.count() == 2
+        store.close()
+    print("✅ 旧数据迁移正常")
+
+def test_data_manager_save_processed_video():
+    """DataManager 逐个保存的视频在两种后端上都能查到"""
+    print("🧪 测试 DataManager 保存已处理视频")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # 状态文件位于相对路径 data/ 下
+        try:
+            for backend in ('file', 'sqlite'):
+                dm = DataManager(backend=backend)
+                assert dm.store.backend == backend
+                dm.save_processed_video('BV1aaa')
+                assert dm.is_video_processed('BV1aaa'), backend
+                assert not dm.is_video_processed('BV1bbb'), backend
+                assert dm.load_processed_videos() == {'BV1aaa'}, backend
+                dm.store.close()
+        finally:
+            os.chdir(cwd)
+    print("✅ DataManager 保存已处理视频正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试状态存储")
+    print("=" * 50)
+    
+    tests = [test_file_store, test_file_store_log, test_bvid_codec, test_dedup_index_image, test_sqlite_store,
+             test_sqlite_migration, test_data_manager_save_processed_video]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
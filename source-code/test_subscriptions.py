@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+测试多订阅调度（使用本地模拟的Bilibili API服务）
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import subprocess
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import MultiTenantScheduler
+from subscriptions import Source, Subscription, load_subscriptions, DEFAULT_SUBSCRIPTION
+from test_bilibili_monitor import FakeBilibiliServer, WbiRoutes, _make_monitor, _view_response, _season_route
+
+class RecordingNotifier:
+    """记录发送内容的通知器"""
+    
+    def __init__(self):
+        self.summaries = []
+        self.texts = []
+    
+    def send_ai_news_notification(self, summary, is_new=True):
+        self.summaries.append(summary)
+        return True
+    
+    def send_text_message(self, content):
+        self.texts.append(content)
+        return True
+    
+    def send_error_notification(self, error_message):
+        self.texts.append(error_message)
+        return True
+    
+    def validate_webhook_url(self):
+        return True
+    
+    def sent(self, bvids):
+        return [bvid for bvid in bvids if any(bvid in summary for summary in self.summaries)]
+
+def test_load_subscriptions():
+    """订阅文件解析、默认值与格式校验"""
+    print("🧪 测试订阅配置加载")
+    with tempfile.TemporaryDirectory() as tmp:
+        assert [s.name for s in load_subscriptions(os.path.join(tmp, 'missing.json'))] == [DEFAULT_SUBSCRIPTION]
+        
+        path = os.path.join(tmp, 'subscriptions.json')
+        entries = [
+            {'name': 'team-a', 'webhook_url': 'https://example.com/a', 'source': {'uid': 1}},
+            {'name': 'team-b', 'webhook_url': 'https://example.com/b', 'source': {'uid': '1', 'season_id': 42},
+             'exclude_keywords': ['广告'], 'push_time': '08:00', 'daily_push': False}
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'subscriptions': entries}, f)
+        team_a, team_b = load_subscriptions(path)
+        assert team_a.source.key == ('bilibili', '1', '', '') and team_a.keywords  # 投稿来源默认按关键词过滤
+        assert team_b.source.key == ('bilibili', '1', '42', '') and team_b.keywords == []
+        assert team_b.push_time == '08:00' and team_b.daily_push is False and team_b.channel == 'team-b'
+        
+        bad_configs = (
+            [entries[0], entries[0]], [{'name': 'x', 'source': {'uid': 1}}], [{'name': 'x', 'webhook_url': 'u'}], [],
+            [{'name': 'x', 'webhook_url': 'u', 'source': {'type': 'rss'}}],
+            [{'name': 'x', 'webhook_url': 'u', 'source': {'type': 'gopher', 'url': 'u'}}],
+            # 订阅名会拼进状态文件路径
+            [{'name': '../x', 'webhook_url': 'u', 'source': {'uid': 1}}],
+            [{'name': 'a/b', 'webhook_url': 'u', 'source': {'uid': 1}}],
+            [{'name': 'x' * 65, 'webhook_url': 'u', 'source': {'uid': 1}}],
+            [{'name': 'x', 'webhook_url': 'u', 'source': {'uid': 1}, 'push_time': '9:30'}],
+            [{'name': 'x', 'webhook_url': 'u', 'source': {'uid': 1}, 'push_time': '24:00'}],
+            [{'name': 'x', 'webhook_url': 'u', 'source': {'uid': 1}, 'push_time': 930}]
+        )
+        for bad in bad_configs:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'subscriptions': bad}, f)
+            try:
+                load_subscriptions(path)
+            except ValueError:
+                continue
+            raise AssertionError(f"invalid config accepted: {bad}")
+    print("✅ 订阅配置加载正常")
+
+def test_shared_fetch_and_channel_dedup():
+    """三个订阅两个来源：每个周期每个来源只请求一次，各订阅独立去重"""
+    print("🧪 测试共享来源拉取与分订阅去重")
+    now = int(time.time())
+    vlist = [
+        {'bvid': 'BV1ai1', 'aid': 1, 'title': 'AI早报 今日', 'created': now - 1},
+        {'bvid': 'BV1vlog', 'aid': 2, 'title': '日常Vlog', 'created': now - 2},
+        {'bvid': 'BV1ad', 'aid': 3, 'title': 'AI早报 广告', 'created': now - 3}
+    ]
+    archives = [{'aid': 9, 'bvid': 'BV1col', 'title': '第1期', 'pubdate': now - 1, 'duration': 60, 'stat': {'view': 1}}]
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)  # 状态库位于相对路径 data/ 下
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/space/wbi/arc/search'] = lambda params: {
+                'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+            server.routes['/x/polymer/web-space/seasons_archives_list'] = _season_route(archives)
+            server.routes['/x/web-interface/view'] = _view_response
+            
+            subscriptions = [
+                Subscription('team-a', 'https://example.com/a', Source('1')),
+                Subscription('team-b', 'https://example.com/b', Source('1'), exclude_keywords=['广告']),
+                Subscription('team-c', 'https://example.com/c', Source('1', season_id='42'))
+            ]
+            scheduler = MultiTenantScheduler(subscriptions, _make_monitor(server, tmp))
+            notifiers = {}
+            for tenant in scheduler.tenants:
+                notifiers[tenant.subscription.name] = tenant.wechat_notifier = RecordingNotifier()
+            team_a = scheduler.tenants[0]
+            team_a.data_manager.mark_videos_as_processed(team_a.bilibili_monitor._format_videos(vlist[:1]))
+            
+            scheduler.check_for_new_videos()
+            assert server.count('/x/space/wbi/arc/search') == 1
+            assert server.count('/x/polymer/web-space/seasons_archives_list') == 1
+            bvids = ['BV1ai1', 'BV1vlog', 'BV1ad', 'BV1col']
+            assert notifiers['team-a'].sent(bvids) == ['BV1ad']  # BV1ai1 已在 team-a 的频道中处理过
+            assert notifiers['team-b'].sent(bvids) == ['BV1ai1']
+            assert notifiers['team-c'].sent(bvids) == ['BV1col']
+            
+            # 第二个周期：请求数随来源数增长，没有重复通知
+            scheduler.check_for_new_videos()
+            assert server.count('/x/space/wbi/arc/search') == 2
+            assert server.count('/x/polymer/web-space/seasons_archives_list') == 2
+            assert [len(n.summaries) for n in notifiers.values()] == [1, 1, 1]
+            
+            status = scheduler.get_status()
+            assert status['sources'] == 2 and status['source_fetches'] == 4
+            assert set(status['subscriptions']) == {'team-a', 'team-b', 'team-c'}
+        finally:
+            os.chdir(cwd)
+    print("✅ 共享来源拉取与分订阅去重正常")
+
+def test_multi_tenant_modes():
+    """多个订阅时 test/force/test-daily 作用于全部订阅，run-async 报错退出"""
+    print("🧪 测试多订阅的其他运行模式")
+    now = int(time.time())
+    vlist = [{'bvid': 'BV1ai1', 'aid': 1, 'title': 'AI早报 今日', 'created': now - 1}]
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeBilibiliServer() as server:
+        os.chdir(tmp)
+        try:
+            WbiRoutes('7cd084941338484aae1ad9425b84077c', '4932caff0ff746eab6f01bf08b70ac45').install(server)
+            server.routes['/x/space/wbi/arc/search'] = lambda params: {
+                'code': 0, 'message': '0', 'ttl': 1, 'data': {'list': {'vlist': vlist}}}
+            server.routes['/x/web-interface/view'] = _view_response
+            
+            subscriptions = [
+                Subscription('team-a', 'https://example.com/a', Source('1'), push_time='08:00'),
+                Subscription('team-b', 'https://example.com/b', Source('1'), push_time='09:00'),
+                Subscription('team-c', 'https://example.com/c', Source('1'), daily_push=False)
+            ]
+            scheduler = MultiTenantScheduler(subscriptions, _make_monitor(server, tmp))
+            notifiers = [RecordingNotifier() for _ in scheduler.tenants]
+            pushed = []
+            for tenant, notifier in zip(scheduler.tenants, notifiers):
+                tenant.wechat_notifier = notifier
+                tenant.daily_push_check = lambda videos=None, name=tenant.subscription.name: pushed.append(name)
+            
+            scheduler.send_test_notification()
+            assert [len(notifier.summaries) for notifier in notifiers] == [1, 1, 1]
+            scheduler.force_check_all_videos()
+            assert [notifier.sent(['BV1ai1']) for notifier in notifiers] == [['BV1ai1']] * 3
+            scheduler.daily_push_check()
+            assert sorted(pushed) == ['team-a', 'team-b']
+        finally:
+            os.chdir(cwd)
+        
+        path = os.path.join(tmp, 'subscriptions.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'subscriptions': [
+                {'name': name, 'webhook_url': 'https://example.com/' + name, 'source': {'uid': 1}}
+                for name in ('team-a', 'team-b')]}, f)
+        result = subprocess.run(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py'), '--mode', 'run-async'],
+            cwd=tmp, env={**os.environ, 'SUBSCRIPTIONS_FILE': path}, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 1 and 'supports a single subscription' in result.stdout, result.stdout[-500:]
+    print("✅ 多订阅的其他运行模式正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试多订阅调度")
+    print("=" * 50)
+    
+    tests = [test_load_subscriptions, test_shared_fetch_and_channel_dedup, test_multi_tenant_modes]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
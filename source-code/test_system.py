@@ -28,7 +28,7 @@ def test_bilibili_connection():
         videos = monitor.get_latest_videos(3)
         if videos:
             print(f"✅ 成功获取到 {len(videos)} 个视频")
-            print(f"   最新视频: {videos[0].get('title', '未知')}")
+            print(f"   最新视频: {videos[0].title or '未知'}")
             return True
         else:
             print("❌ 未获取到任何视频")
@@ -46,7 +46,7 @@ def test_ai_news_detection():
         if ai_videos:
             print(f"✅ 找到 {len(ai_videos)} 个AI早报视频")
             for i, video in enumerate(ai_videos[:3]):
-                print(f"   {i+1}. {video.get('title', '未知')}")
+                print(f"   {i+1}. {video.title or '未知'}")
             return True
         else:
             print("⚠️  未找到AI早报视频（可能UP主最近没有发布）")
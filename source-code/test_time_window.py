@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+测试发布时间窗口的批量筛选
+"""
+
+import sys
+import os
+import random
+from datetime import date, datetime
+
+import pytz
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from config import CHINA_TIMEZONE
+from time_window import day_bounds, select_in_window
+from video import Video
+
+CHINA_TZ = pytz.timezone(CHINA_TIMEZONE)
+
+def _legacy_window(videos, start_time, end_time):
+    """旧的逐条实现：每个视频构造一个中国时区的 datetime 再比较"""
+    return [video for video in videos
+            if video.pubdate and start_time <= datetime.fromtimestamp(video.pubdate, tz=CHINA_TZ) <= end_time]
+
+def test_day_bounds():
+    """一天的边界按中国时区计算"""
+    print("🧪 测试按时区计算一天的边界")
+    start, end = day_bounds(date(2025, 9, 25), CHINA_TZ)
+    assert datetime.fromtimestamp(start, CHINA_TZ).strftime('%Y-%m-%d %H:%M') == '2025-09-25 00:00'
+    assert end - start == 86400
+    # 夏令时切换日不是 24 小时
+    start, end = day_bounds(date(2025, 3, 9), pytz.timezone('America/New_York'))
+    assert end - start == 23 * 3600
+    print("✅ 一天的边界计算正常")
+
+def test_select_matches_legacy():
+    """批量筛选与逐条构造 datetime 的结果一致（含边界与缺少发布时间的视频）"""
+    print("🧪 测试批量筛选与旧实现一致")
+    start_time = CHINA_TZ.localize(datetime(2025, 9, 24, 18, 0))
+    end_time = CHINA_TZ.localize(datetime(2025, 9, 25, 9, 30))
+    start, end = int(start_time.timestamp()), int(end_time.timestamp())
+    rng = random.Random(7)
+    pubdates = [start - 1, start, end, end + 1, None, 0] + [start + rng.randrange(-86400, 86400) for _ in range(2000)]
+    videos = [Video(f'BV{i:010d}', pubdate=pubdate) for i, pubdate in enumerate(pubdates)]
+    expected = _legacy_window(videos, start_time, end_time)
+    
+    assert select_in_window(videos, start, end, inclusive_end=True) == expected
+    assert select_in_window(videos[:6], start, end) == [videos[1]]  # 默认不含结束时刻
+    print("✅ 批量筛选与旧实现一致")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试发布时间窗口筛选")
+    print("=" * 50)
+    
+    tests = [test_day_bounds, test_select_matches_legacy]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+测试基于最小堆的定时器
+"""
+
+import sys
+import os
+import time
+import signal
+import threading
+from datetime import datetime
+
+import pytz
+
+# 添加项目路径
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from timer_scheduler import TimerScheduler, next_daily_run
+
+def test_daily_time_uses_timezone():
+    """每日时刻按指定时区计算，与主机时区无关"""
+    print("🧪 测试每日任务时区")
+    china = pytz.timezone('Asia/Shanghai')
+    before = datetime(2024, 6, 1, 1, 0, tzinfo=pytz.utc)  # 北京时间 09:00
+    assert next_daily_run('09:30', china, before) == datetime(2024, 6, 1, 1, 30, tzinfo=pytz.utc)
+    after = datetime(2024, 6, 1, 2, 0, tzinfo=pytz.utc)  # 北京时间 10:00，取次日
+    assert next_daily_run('09:30', china, after) == datetime(2024, 6, 2, 1, 30, tzinfo=pytz.utc)
+    
+    timer = TimerScheduler(clock=lambda: before.timestamp())
+    job = timer.daily_at('09:30', 'Asia/Shanghai', lambda: None)
+    assert job.due == before.timestamp() + 1800
+    assert timer.next_run().strftime('%H:%M') == '09:30'
+    print("✅ 每日任务时区正常")
+
+def test_sleeps_until_due():
+    """只在任务到期时唤醒，触发延迟在毫秒级；任务异常不影响调度"""
+    print("🧪 测试按到期时间休眠")
+    timer = TimerScheduler()
+    fired = []
+    
+    def tick():
+        fired.append(time.time())
+    
+    def broken():
+        raise RuntimeError("boom")
+    
+    job = timer.every(0.1, tick)
+    timer.every(0.15, broken)
+    threading.Timer(0.55, timer.stop).start()
+    timer.run()
+    
+    assert 4 <= len(fired) <= 6, fired
+    # 休眠次数与到期次数相当，而不是按固定频率轮询
+    assert timer.wakeups <= timer.executed + 3, timer.get_stats()
+    assert timer.max_lateness < 0.05, timer.get_stats()
+    assert job.runs == len(fired)
+    print("✅ 按到期时间休眠正常")
+
+def test_new_job_wakes_sleeper():
+    """休眠期间添加更早到期的任务会立即生效；取消的任务不再执行"""
+    print("🧪 测试添加任务唤醒")
+    timer = TimerScheduler()
+    timer.every(3600, lambda: None, name='hourly')
+    fired = []
+    
+    def add_job():
+        job = timer.every(0.05, lambda: fired.append(time.time()))
+        time.sleep(0.2)
+        timer.cancel(job)
+        count = len(fired)
+        time.sleep(0.15)
+        fired.append(count)
+        timer.stop()
+    
+    threading.Thread(target=add_job).start()
+    start = time.time()
+    timer.run()
+    assert time.time() - start < 1.0
+    count = fired.pop()
+    assert count >= 2 and len(fired) == count
+    assert [job.name for job in timer.jobs] == ['hourly']
+    print("✅ 添加任务唤醒正常")
+
+def test_signal_stops_run():
+    """主线程中运行时，SIGTERM 让 run() 返回并恢复原信号处理函数"""
+    print("🧪 测试信号停止")
+    if threading.current_thread() is not threading.main_thread():
+        print("⏭️  非主线程，跳过")
+        return
+    previous = signal.getsignal(signal.SIGTERM)
+    timer = TimerScheduler()
+    timer.every(3600, lambda: None)
+    threading.Timer(0.1, os.kill, (os.getpid(), signal.SIGTERM)).start()
+    start = time.time()
+    timer.run()
+    assert time.time() - start < 1.0
+    assert signal.getsignal(signal.SIGTERM) is previous
+    print("✅ 信号停止正常")
+
+def main():
+    """主测试函数"""
+    print("🚀 开始测试定时器")
+    print("=" * 50)
+    
+    tests = [test_daily_time_uses_timezone, test_sleeps_until_due, test_new_job_wakes_sleeper, test_signal_stops_run]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__} 失败: {e}")
+    
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"⚠️  {failed} 项测试失败")
+        return 1
+    print("🎉 所有测试通过！")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
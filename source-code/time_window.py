@@ -0,0 +1,23 @@
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import List, Sequence, Tuple
+
+from video import Video
+
+logger = logging.getLogger(__name__)
+
+def day_bounds(day: date, tz) -> Tuple[int, int]:
+    """tz 时区中 day 这一天的 [开始, 结束) Unix时间戳（按时区规则处理夏令时）"""
+    start = tz.localize(datetime.combine(day, time.min))
+    end = tz.localize(datetime.combine(day + timedelta(days=1), time.min))
+    return int(start.timestamp()), int(end.timestamp())
+
+def select_in_window(videos: Sequence[Video], start: int, end: int, inclusive_end: bool = False) -> List[Video]:
+    """筛选发布时间在 [start, end)（inclusive_end 时为 [start, end]）内的视频，保持原顺序
+    
+    窗口边界由调用方按时区计算一次，这里只做整数比较，不再为每条视频构造 datetime。
+    没有发布时间的视频不入选。
+    """
+    if inclusive_end:
+        return [video for video in videos if video.pubdate and start <= video.pubdate <= end]
+    return [video for video in videos if video.pubdate and start <= video.pubdate < end]
@@ -0,0 +1,212 @@
+import time
+import heapq
+import signal
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# 单次休眠的上限（秒）：防止主机挂起或系统时间被调整后错过每日任务
+MAX_SLEEP = 3600
+
+def next_daily_run(time_str: str, tz, now: Optional[datetime] = None) -> datetime:
+    """下一次 tz 时区的 time_str（HH:MM）时刻；今天的时刻已过时取明天"""
+    at = datetime.strptime(time_str, "%H:%M").time()
+    now = now.astimezone(tz) if now is not None else datetime.now(tz)
+    target = tz.localize(datetime.combine(now.date(), at))
+    if target <= now:
+        target = tz.localize(datetime.combine(now.date() + timedelta(days=1), at))
+    return target
+
+class Job:
+    """一个定时任务：按固定间隔（interval 秒）或每天在 tz 时区的 at 时刻执行；两者都未设置时只执行一次"""
+    
+    __slots__ = ('name', 'fn', 'args', 'interval', 'at', 'tz', 'due', 'runs', 'cancelled')
+    
+    def __init__(self, name: str, fn: Callable, args: tuple = (), interval: Optional[float] = None,
+                 at: Optional[str] = None, tz=None):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.interval = interval
+        self.at = at
+        self.tz = tz
+        self.due = 0.0
+        self.runs = 0
+        self.cancelled = False
+    
+    def schedule_next(self, now: float, previous_due: Optional[float] = None) -> float:
+        """计算下一次执行的时间戳（Unix时间）"""
+        if self.at is not None:
+            self.due = next_daily_run(self.at, self.tz, datetime.fromtimestamp(now, pytz.utc)).timestamp()
+        elif previous_due is None:
+            self.due = now + self.interval
+        else:
+            # 按原计划的节拍顺延；任务执行过久错过的节拍直接跳过，不连续补跑
+            self.due = previous_due + self.interval
+            if self.due <= now:
+                self.due = now + self.interval - (now - previous_due) % self.interval
+        return self.due
+    
+    @property
+    def repeats(self) -> bool:
+        return self.interval is not None or self.at is not None
+    
+    def next_run(self) -> datetime:
+        return datetime.fromtimestamp(self.due, self.tz or pytz.utc)
+    
+    def __repr__(self):
+        return f"Job({self.name!r}, due={self.next_run().isoformat()})"
+
+class TimerScheduler:
+    """基于最小堆的定时器：休眠到最早的到期时间，而不是定时轮询
+    
+    任务在调用 run() 的线程中依次执行。添加任务或调用 stop() 会立即唤醒休眠，
+    在主线程中运行时 SIGINT/SIGTERM 也会让 run() 返回。每日任务按指定时区计算时刻。
+    """
+    
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._heap: List = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self.wakeups = 0
+        self.executed = 0
+        self.max_lateness = 0.0
+        self.last_lateness = 0.0
+    
+    def _push(self, job: Job):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._heap, (job.due, self._seq, job))
+            # 新任务可能比当前休眠的目标更早到期
+            self._cond.notify_all()
+    
+    def every(self, seconds: float, fn: Callable, *args, name: Optional[str] = None) -> Job:
+        """每隔 seconds 秒执行一次（首次在 seconds 秒后）"""
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        job = Job(name or getattr(fn, '__name__', 'job'), fn, args, interval=seconds)
+        job.schedule_next(self._clock())
+        self._push(job)
+        return job
+    
+    def after(self, seconds: float, fn: Callable, *args, name: Optional[str] = None) -> Job:
+        """seconds 秒后执行一次（任务可在执行时再次调用 after 安排下一次，用于间隔不固定的轮询）"""
+        job = Job(name or getattr(fn, '__name__', 'job'), fn, args)
+        job.due = self._clock() + max(0.0, seconds)
+        self._push(job)
+        return job
+    
+    def daily_at(self, time_str: str, tz, fn: Callable, *args, name: Optional[str] = None) -> Job:
+        """每天在 tz 时区（时区名或 pytz 时区）的 time_str（HH:MM）执行"""
+        tz = pytz.timezone(tz) if isinstance(tz, str) else tz
+        job = Job(name or getattr(fn, '__name__', 'job'), fn, args, at=time_str, tz=tz)
+        job.schedule_next(self._clock())
+        self._push(job)
+        return job
+    
+    def cancel(self, job: Job):
+        """取消任务（堆中的条目在到期时丢弃）"""
+        with self._cond:
+            job.cancelled = True
+            self._cond.notify_all()
+    
+    def clear(self):
+        with self._cond:
+            for _, _, job in self._heap:
+                job.cancelled = True
+            self._heap.clear()
+            self._cond.notify_all()
+    
+    @property
+    def jobs(self) -> List[Job]:
+        with self._cond:
+            return sorted((job for _, _, job in self._heap if not job.cancelled), key=lambda job: job.due)
+    
+    def next_run(self) -> Optional[datetime]:
+        jobs = self.jobs
+        return jobs[0].next_run() if jobs else None
+    
+    def _next_due_job(self) -> Optional[Job]:
+        """等待最早的任务到期并将其弹出；停止时返回 None（需持有锁）"""
+        while self._running:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+            now = self._clock()
+            if self._heap and self._heap[0][0] <= now:
+                return heapq.heappop(self._heap)[2]
+            timeout = min(self._heap[0][0] - now, MAX_SLEEP) if self._heap else MAX_SLEEP
+            self._cond.wait(timeout)
+            self.wakeups += 1
+        return None
+    
+    def run(self):
+        """执行到期任务直到 stop()；任务抛出的异常记录日志后继续调度"""
+        with self._cond:
+            self._running = True
+        previous = self._install_signal_handlers()
+        try:
+            while True:
+                with self._cond:
+                    job = self._next_due_job()
+                if job is None:
+                    return
+                due = job.due
+                self.last_lateness = max(0.0, self._clock() - due)
+                self.max_lateness = max(self.max_lateness, self.last_lateness)
+                logger.debug(f"Running job {job.name} ({self.last_lateness * 1000:.1f} ms after its due time)")
+                try:
+                    job.fn(*job.args)
+                except Exception as e:
+                    logger.error(f"Error in scheduled job {job.name}: {e}")
+                finally:
+                    job.runs += 1
+                    self.executed += 1
+                if job.repeats and not job.cancelled:
+                    job.schedule_next(self._clock(), due)
+                    self._push(job)
+        finally:
+            self._restore_signal_handlers(previous)
+            with self._cond:
+                self._running = False
+    
+    def stop(self):
+        """让 run() 在当前任务结束后返回（可在信号处理函数或其他线程中调用）"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+    
+    def _install_signal_handlers(self) -> Dict:
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                previous[sig] = signal.signal(sig, self._on_signal)
+            except (ValueError, OSError):  # 不支持的平台
+                pass
+        return previous
+    
+    def _restore_signal_handlers(self, previous: Dict):
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+    
+    def _on_signal(self, signum, frame):
+        logger.info(f"Received signal {signum}, stopping scheduler")
+        self.stop()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """唤醒次数、已执行任务数、触发延迟和各任务的下次执行时间"""
+        return {
+            'wakeups': self.wakeups,
+            'executed': self.executed,
+            'last_lateness_ms': round(self.last_lateness * 1000, 1),
+            'max_lateness_ms': round(self.max_lateness * 1000, 1),
+            'jobs': {job.name: job.next_run().isoformat() for job in self.jobs}
+        }
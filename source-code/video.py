@@ -0,0 +1,83 @@
+from typing import Dict, Optional
+
+def _as_int(value, default=0) -> int:
+    """接口里的计数偶尔是 '--' 之类的字符串，无法解析时取默认值"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+class Video:
+    """一条投稿记录（__slots__，不为每个实例分配 __dict__）
+    
+    pubdate 是唯一的发布时间字段（Unix时间戳），接口中的 created 在 from_api 中映射到它。
+    来自其他信息源（RSS、JSON文件）的条目以条目ID作为 bvid，url 为条目原始链接。
+    """
+    
+    __slots__ = ('bvid', 'aid', 'title', 'description', 'pubdate', 'length', 'play', 'pic',
+                 'author', 'mid', 'typeid', 'typename', 'comment', 'review', 'url')
+    
+    def __init__(self, bvid: str, aid: Optional[int] = None, title: str = '', description: str = '',
+                 pubdate: Optional[int] = None, length: str = '', play: int = 0, pic: str = '',
+                 author: str = '', mid: str = '', typeid: Optional[int] = None, typename: str = '',
+                 comment: int = 0, review: int = 0, url: str = ''):
+        self.bvid = bvid
+        self.aid = aid
+        self.title = title
+        self.description = description
+        self.pubdate = pubdate
+        self.length = length
+        self.play = play
+        self.pic = pic
+        self.author = author
+        self.mid = mid
+        self.typeid = typeid
+        self.typename = typename
+        self.comment = comment
+        self.review = review
+        self.url = url
+    
+    @property
+    def video_url(self) -> str:
+        return self.url or f"https://www.bilibili.com/video/{self.bvid}"
+    
+    @classmethod
+    def from_api(cls, item: Dict, default_mid: str = '') -> 'Video':
+        """从投稿列表接口（vlist）的条目构造"""
+        pubdate = item.get('created', item.get('pubdate'))
+        return cls(
+            bvid=item['bvid'],
+            aid=item.get('aid'),
+            title=item.get('title') or '',
+            description=item.get('description') or '',
+            pubdate=_as_int(pubdate, None),
+            length=item.get('length') or '',
+            play=_as_int(item.get('play')),
+            pic=item.get('pic') or '',
+            author=item.get('author') or '',
+            mid=str(item.get('mid') or default_mid),
+            typeid=item.get('typeid'),
+            typename=item.get('typename') or '',
+            comment=_as_int(item.get('comment')),
+            review=_as_int(item.get('review'))
+        )
+    
+    def to_json(self) -> Dict:
+        """转换为可JSON序列化的字典（用于缓存）"""
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    @classmethod
+    def from_json(cls, data: Dict) -> 'Video':
+        """从 to_json 的结果还原；兼容旧缓存中的 created 字段"""
+        fields = {name: data[name] for name in cls.__slots__ if name in data}
+        if fields.get('pubdate') is None and data.get('created') is not None:
+            fields['pubdate'] = data['created']
+        return cls(**fields)
+    
+    def __eq__(self, other):
+        if not isinstance(other, Video):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self):
+        return f"Video(bvid={self.bvid!r}, title={self.title!r}, pubdate={self.pubdate!r})"
@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import logging
+from hashlib import md5
+from urllib.parse import urlencode
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 从 img_key + sub_key 中重排出 mixin key 的下标表
+MIXIN_KEY_ENC_TAB = [
+    46, 47, 18, 2, 53, 8, 23, 32, 15, 50, 10, 31, 58, 3, 45, 35, 27, 43, 5, 49,
+    33, 9, 42, 19, 29, 28, 14, 39, 12, 38, 41, 13, 37, 48, 7, 16, 24, 55, 40,
+    61, 26, 17, 0, 1, 60, 51, 30, 4, 22, 25, 54, 21, 56, 59, 6, 63, 57, 62, 11,
+    36, 20, 34, 44, 52
+]
+_FILTERED_CHARS = str.maketrans('', '', "!'()*")
+
+# 签名错误时接口返回的错误码
+SIGNATURE_ERROR_CODES = (-352, -403)
+
+def get_mixin_key(img_key: str, sub_key: str) -> str:
+    """由 img_key 和 sub_key 计算 mixin key"""
+    orig = img_key + sub_key
+    return ''.join(orig[i] for i in MIXIN_KEY_ENC_TAB)[:32]
+
+def sign_params(params: Dict, mixin_key: str, wts: Optional[int] = None) -> Dict:
+    """为请求参数添加 wts 和 w_rid 签名"""
+    signed = dict(params)
+    signed['wts'] = int(wts if wts is not None else time.time())
+    signed = {
+        key: str(value).translate(_FILTERED_CHARS)
+        for key, value in sorted(signed.items())
+    }
+    query = urlencode(signed)
+    signed['w_rid'] = md5((query + mixin_key).encode('utf-8')).hexdigest()
+    return signed
+
+class WbiSigner:
+    """WBI请求签名器：从nav接口获取密钥，mixin key缓存到磁盘直到密钥轮换"""
+    
+    def __init__(self, transport, api_base: str, keys_file: Optional[str] = None, key_ttl: int = 6 * 3600):
+        self.transport = transport
+        self.api_base = api_base
+        self.keys_file = keys_file or None
+        self.key_ttl = key_ttl
+        self._mixin_key: Optional[str] = None
+        self._fetched_at = 0.0
+        self.key_fetches = 0
+        self._load_keys()
+    
+    def _load_keys(self):
+        """从磁盘加载缓存的mixin key"""
+        if not self.keys_file or not os.path.exists(self.keys_file):
+            return
+        try:
+            with open(self.keys_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            self._mixin_key = cached['mixin_key']
+            self._fetched_at = float(cached['fetched_at'])
+        except Exception as e:
+            logger.warning(f"Failed to load WBI keys: {e}")
+    
+    def _save_keys(self, img_key: str, sub_key: str):
+        """原子地保存mixin key"""
+        if not self.keys_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.keys_file) or '.', exist_ok=True)
+            tmp_file = f"{self.keys_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'img_key': img_key,
+                    'sub_key': sub_key,
+                    'mixin_key': self._mixin_key,
+                    'fetched_at': self._fetched_at
+                }, f)
+            os.replace(tmp_file, self.keys_file)
+        except Exception as e:
+            logger.warning(f"Failed to save WBI keys: {e}")
+    
+    def _fetch_keys(self):
+        """从nav接口获取 img_key / sub_key（未登录时接口返回-101，但仍包含wbi_img）"""
+        response = self.transport.get(f"{self.api_base}/x/web-interface/nav")
+        response.raise_for_status()
+        wbi_img = (response.json().get('data') or {}).get('wbi_img') or {}
+        img_url = wbi_img.get('img_url', '')
+        sub_url = wbi_img.get('sub_url', '')
+        img_key = img_url.rsplit('/', 1)[-1].split('.')[0]
+        sub_key = sub_url.rsplit('/', 1)[-1].split('.')[0]
+        if not img_key or not sub_key:
+            raise ValueError("nav response missing wbi_img keys")
+        
+        self._mixin_key = get_mixin_key(img_key, sub_key)
+        self._fetched_at = time.time()
+        self.key_fetches += 1
+        self._save_keys(img_key, sub_key)
+        logger.debug("Fetched new WBI keys")
+    
+    def get_mixin_key(self) -> str:
+        """获取mixin key，过期或缺失时重新获取"""
+        if not self._mixin_key or time.time() - self._fetched_at > self.key_ttl:
+            self._fetch_keys()
+        return self._mixin_key
+    
+    def invalidate(self):
+        """密钥已轮换（签名被拒绝）时丢弃缓存"""
+        self._mixin_key = None
+        self._fetched_at = 0.0
+    
+    def sign(self, params: Dict) -> Dict:
+        """返回带签名的请求参数"""
+        return sign_params(params, self.get_mixin_key())
@@ -1,17 +1,17 @@
-import requests
 import json
 import logging
 from typing import Optional
 from config import WECHAT_WEBHOOK_URL
+from http_transport import HttpTransport, get_transport
 
 logger = logging.getLogger(__name__)
 
 class WeChatNotifier:
     """企业微信通知器"""
     
-    def __init__(self, webhook_url: str = WECHAT_WEBHOOK_URL):
+    def __init__(self, webhook_url: str = WECHAT_WEBHOOK_URL, transport: Optional[HttpTransport] = None):
         self.webhook_url = webhook_url
-        self.session = requests.Session()
+        self.transport = transport or get_transport()
     
     def validate_webhook_url(self) -> bool:
         """验证webhook URL"""
@@ -42,11 +42,7 @@ class WeChatNotifier:
                 }
             }
             
-            response = self.session.post(
-                self.webhook_url,
-                json=payload,
-                timeout=10
-            )
+            response = self.transport.post(self.webhook_url, json=payload)
             response.raise_for_status()
             
             result = response.json()
@@ -74,11 +70,7 @@ class WeChatNotifier:
                 }
             }
             
-            response = self.session.post(
-                self.webhook_url,
-                json=payload,
-                timeout=10
-            )
+            response = self.transport.post(self.webhook_url, json=payload)
             response.raise_for_status()
             
             result = response.json()